@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+Benchmarks of the decorator hot paths: memo hits, backend hits, misses,
+bound method access, property reads and key generation.
+
+Reports the time (ns/op, best of several runs) and the memory allocated
+(peak bytes/op, measured with ``tracemalloc`` on Python 3) by each case.
+Results can be saved and compared with a previous run, e.g. before and
+after a change::
+
+    python benchmarks/suite.py --save before.json
+    python benchmarks/suite.py --compare before.json
+
+The comparison exits with status 1 if a case got slower than
+``--threshold`` (10% by default); ``-k`` selects the cases by name.
+"""
+from __future__ import print_function, unicode_literals
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import timeit
+import django
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+if not settings.configured:
+    settings.configure(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'dict': {'BACKEND': '%s.DictCache' % __name__},
+        },
+        CACHED_RESULT_STATS_SAMPLE_RATE=0,
+    )
+    if hasattr(django, 'setup'):
+        django.setup()
+
+
+class DictCache(BaseCache):
+    """
+    A stand-in backend storing values in a dict, without pickling nor
+    expiration, so that the overhead of the decorators is measured alone.
+    """
+
+    def __init__(self, location, params):
+        super(DictCache, self).__init__(params)
+        self._data = {}
+
+    def get(self, key, default=None, version=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value, timeout=None, version=None):
+        self._data[key] = value
+
+    def add(self, key, value, timeout=None, version=None):
+        return self._data.setdefault(key, value) is value
+
+    def delete(self, key, version=None):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+class User(object):
+    def __init__(self, id):
+        self.id = id
+
+
+def get_cases():
+    """
+    Returns a list of ``(name, fn)`` pairs, ``fn`` performing one operation.
+    """
+    from cached_result.decorators import cached_function, cached_property
+
+    def fn(*args):
+        return args
+
+    class Obj(object):
+        @cached_function
+        def method(self, x):
+            return x
+
+        @cached_property
+        def prop(self):
+            return 1
+
+    memoized = cached_function(fn)
+    locmem = cached_function(memoize=False)(fn)
+    stand_in = cached_function(memoize=False, using='dict')(fn)
+    missed = cached_function(memoize=False, using='dict', key='miss_{0}', hash_algorithm=None)(fn)
+    counter = itertools.count()
+    obj = Obj()
+    user = User(42)
+
+    for cached in (memoized, locmem, stand_in):
+        cached(1)
+    obj.method(1)
+    obj.prop
+
+    attribute = cached_function(key='user_{0.id}_page_{1}')(fn)
+    attribute_unhashed = cached_function(key='user_{0.id}_page_{1}', hash_algorithm=None)(fn)
+    plain = cached_function(key='user_{0}_page_{1}')(fn)
+    plain_key_cache = cached_function(key='user_{0}_page_{1}', key_cache=1000)(fn)
+
+    return [
+        ('memo hit', lambda: memoized(1)),
+        ('backend hit, locmem', lambda: locmem(1)),
+        ('backend hit, stand-in', lambda: stand_in(1)),
+        ('miss, stand-in', lambda: missed(next(counter))),
+        ('bound method access', lambda: obj.method),
+        ('bound method memo hit', lambda: obj.method(1)),
+        ('property read', lambda: obj.prop),
+        ('key, attribute template', lambda: attribute.get_cache_key(user, 3)),
+        ('key, attribute template, no hashing', lambda: attribute_unhashed.get_cache_key(user, 3)),
+        ('key, plain template', lambda: plain.get_cache_key(42, 3)),
+        ('key, plain template, key cache hit', lambda: plain_key_cache.get_cache_key(42, 3)),
+        ('key, generated (arguments hashing)', lambda: memoized.get_cache_key(42, 3)),
+    ]
+
+
+def measure_time(fn, number, repeat=5):
+    """
+    Returns the best time of ``fn`` over ``repeat`` runs, in ns/op.
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9
+
+
+def measure_allocations(fn, number=100):
+    """
+    Returns the median of the peak memory allocated by ``fn``, in bytes/op,
+    or ``None`` if ``tracemalloc`` isn't available.
+    """
+    if tracemalloc is None:
+        return None
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(number):
+            tracemalloc.reset_peak() if hasattr(tracemalloc, 'reset_peak') else tracemalloc.clear_traces()
+            current = tracemalloc.get_traced_memory()[0]
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return sorted(peaks)[len(peaks) // 2]
+
+
+def run(number, names=None):
+    results = {}
+    for name, fn in get_cases():
+        if names and not any(part in name for part in names):
+            continue
+        results[name] = {'ns': measure_time(fn, number), 'bytes': measure_allocations(fn)}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints ``results`` next to ``baseline``.
+
+    :returns: The names of the cases slower than ``baseline`` by more than
+        ``threshold`` (a ratio).
+    """
+    regressions = []
+    print('%-42s %10s %10s %8s %10s' % ('', 'ns/op', 'before', 'change', 'B/op'))
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None:
+            print('%-42s %10.1f %10s %8s %10s' % (name, result['ns'], '-', '-', _format_bytes(result['bytes'])))
+            continue
+        change = result['ns'] / before['ns'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = ' !'
+        print('%-42s %10.1f %10.1f %+7.1f%% %10s%s' % (
+            name, result['ns'], before['ns'], change * 100, _format_bytes(result['bytes']), flag))
+    return regressions
+
+
+def _format_bytes(size):
+    return '-' if size is None else '%d' % size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the decorator hot paths.')
+    parser.add_argument('-n', '--number', type=int, default=100000, help='operations per run')
+    parser.add_argument('-k', dest='names', action='append', help='only run the cases whose name contains this')
+    parser.add_argument('--save', metavar='FILE', help='save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='compare with results saved by --save')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slowdown ratio reported as a regression')
+    options = parser.parse_args(argv)
+
+    results = run(options.number, options.names)
+
+    if options.save:
+        with open(options.save, 'w') as fp:
+            json.dump({
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'results': results,
+            }, fp, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as fp:
+            baseline = json.load(fp)['results']
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print('\n%d regression(s): %s' % (len(regressions), ', '.join(regressions)))
+            return 1
+    else:
+        print('%-42s %10s %10s' % ('', 'ns/op', 'B/op'))
+        for name, result in sorted(results.items()):
+            print('%-42s %10.1f %10s' % (name, result['ns'], _format_bytes(result['bytes'])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+from __future__ import unicode_literals
+from cached_result.compat import string_types
+from cached_result.utils import MISSING
+
+try:
+    from django.core.cache import caches
+except ImportError:  # Django < 1.7
+    caches = None
+    from django.core.cache import get_cache as _get_cache
+
+
+__all__ = ['get_cache', 'TieredCache']
+
+
+_backends = {}
+
+
+def get_cache(alias):
+    """
+    Returns the cache backend configured as ``alias`` in ``settings.CACHES``
+    (the one of the current thread on Django >= 1.7).
+    """
+    if caches is not None:
+        return caches[alias]
+    try:
+        return _backends[alias]
+    except KeyError:
+        backend = _backends[alias] = _get_cache(alias)
+        return backend
+
+
+def _min_timeout(timeout, tier_timeout):
+    if tier_timeout is None:
+        return timeout
+    if timeout is None:
+        return tier_timeout
+    return min(timeout, tier_timeout)
+
+
+class TieredCache(object):
+    """
+    Chains several cache backends, the fastest (e.g. a local memory one)
+    first and the shared one last.
+
+    Reads go through the tiers in order; a value found in a slower tier is
+    copied into the faster ones, for at most ``timeout`` seconds (or the
+    timeout of the tier, if lower): the remaining lifetime of the value
+    isn't known, so it's never copied without a timeout, which would keep
+    it there forever. Writes and deletions go to all of them.
+    Each tier can be given a timeout capping the one of the values stored
+    in it, e.g.::
+
+        TieredCache(['locmem', 'redis'], timeouts=[10, None])
+
+    keeps values for at most 10 seconds in ``locmem``. Since deleting a
+    value only affects the local tiers of the current process, such a cap
+    bounds how long other processes may serve a stale copy.
+
+    Atomic operations (``add``, used for locking) only involve the shared
+    tier.
+    """
+
+    def __init__(self, aliases, timeouts=None, timeout=None):
+        if not aliases:
+            raise ValueError('At least one cache alias is required')
+        self.aliases = list(aliases)
+        self.timeouts = list(timeouts) if timeouts is not None else [None] * len(self.aliases)
+        if len(self.timeouts) != len(self.aliases):
+            raise ValueError('Expected %d timeouts, got %d' % (len(self.aliases), len(self.timeouts)))
+        self.timeout = timeout
+
+    @classmethod
+    def from_tiers(cls, tiers, timeout=None):
+        """
+        Builds a :class:`TieredCache` from a list of aliases and/or
+        ``(alias, timeout)`` pairs.
+        """
+        aliases, timeouts = [], []
+        for tier in tiers:
+            if isinstance(tier, string_types):
+                tier = (tier, None)
+            aliases.append(tier[0])
+            timeouts.append(tier[1])
+        return cls(aliases, timeouts, timeout)
+
+    @property
+    def backends(self):
+        return [get_cache(alias) for alias in self.aliases]
+
+    @property
+    def shared(self):
+        """
+        The last (shared) tier.
+        """
+        return get_cache(self.aliases[-1])
+
+    def get(self, key, default=None):
+        backends = self.backends
+        for i, backend in enumerate(backends):
+            value = backend.get(key, MISSING)
+            if value is not MISSING:
+                for j in range(i):
+                    timeout = _min_timeout(self.timeout, self.timeouts[j])
+                    if timeout is not None:
+                        backends[j].set(key, value, timeout=timeout)
+                return value
+        return default
+
+    def get_many(self, keys):
+        backends = self.backends
+        found = {}
+        missing = list(keys)
+        for i, backend in enumerate(backends):
+            if not missing:
+                break
+            values = backend.get_many(missing)
+            if values:
+                for j in range(i):
+                    timeout = _min_timeout(self.timeout, self.timeouts[j])
+                    if timeout is not None:
+                        backends[j].set_many(values, timeout=timeout)
+                found.update(values)
+                missing = [key for key in missing if key not in values]
+        return found
+
+    def set(self, key, value, timeout=None):
+        for backend, tier_timeout in zip(self.backends, self.timeouts):
+            backend.set(key, value, timeout=_min_timeout(timeout, tier_timeout))
+
+    def set_many(self, data, timeout=None):
+        for backend, tier_timeout in zip(self.backends, self.timeouts):
+            backend.set_many(data, timeout=_min_timeout(timeout, tier_timeout))
+
+    def add(self, key, value, timeout=None):
+        return self.shared.add(key, value, timeout=timeout)
+
+    def delete(self, key):
+        for backend in self.backends:
+            backend.delete(key)
+
+    def delete_many(self, keys):
+        for backend in self.backends:
+            backend.delete_many(keys)
@@ -0,0 +1,25 @@
+from __future__ import unicode_literals
+import sys
+
+
+PY2 = sys.version_info[0] == 2
+
+if PY2:
+    string_types = (basestring,)  # NOQA
+    text_type = unicode  # NOQA
+    binary_type = str
+    integer_types = (int, long)  # NOQA
+else:
+    string_types = (str,)
+    text_type = str
+    binary_type = bytes
+    integer_types = (int,)
+
+
+def force_bytes(s):
+    """
+    Encodes text to UTF-8 bytes; returns bytes as is.
+    """
+    if isinstance(s, text_type):
+        return s.encode('utf-8')
+    return s
@@ -0,0 +1,63 @@
+from __future__ import unicode_literals
+from contextlib import contextmanager
+import threading
+
+try:
+    import contextvars
+except ImportError:  # Python < 3.7
+    contextvars = None
+
+
+__all__ = ['get_request_cache', 'set_request_cache', 'request_cache']
+
+
+if contextvars is not None:
+    _request_cache = contextvars.ContextVar('cached_result_request_cache', default=None)
+
+    def get_request_cache():
+        """
+        Returns the dict used as the request-scoped cache, or ``None`` if no
+        request cache is active.
+        """
+        return _request_cache.get()
+
+    def set_request_cache(value):
+        """
+        Sets the dict used as the request-scoped cache (``None`` deactivates it).
+        """
+        _request_cache.set(value)
+else:
+    _local = threading.local()
+
+    def get_request_cache():
+        """
+        Returns the dict used as the request-scoped cache, or ``None`` if no
+        request cache is active.
+        """
+        return getattr(_local, 'value', None)
+
+    def set_request_cache(value):
+        """
+        Sets the dict used as the request-scoped cache (``None`` deactivates it).
+        """
+        _local.value = value
+
+
+@contextmanager
+def request_cache():
+    """
+    Activates a fresh request-scoped cache for the duration of the block,
+    e.g. for a management command or a task running outside a request.
+
+    Example::
+
+        with request_cache():
+            for order in orders:
+                order.customer.discount  # computed once per customer
+    """
+    previous = get_request_cache()
+    set_request_cache({})
+    try:
+        yield
+    finally:
+        set_request_cache(previous)
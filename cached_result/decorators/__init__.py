@@ -1,4 +1,5 @@
 from __future__ import absolute_import
 
 from cached_result.decorators.cached_function import *
-from cached_result.decorators.cached_property import *
\ No newline at end of file
+from cached_result.decorators.cached_property import *
+from cached_result.decorators.cached_queryset import *
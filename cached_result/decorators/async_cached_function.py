@@ -0,0 +1,393 @@
+from __future__ import unicode_literals
+import asyncio
+import inspect
+from cached_result.context import get_request_cache
+from cached_result.decorators.cached_function import CachedFunction
+from cached_result.envelope import Envelope, CachedError
+from cached_result.locks import CacheLock
+from cached_result.refresh import get_scheduler, logger
+from cached_result.signals import cache_hit
+from cached_result.tags import get_all_tag_keys, group_tag_versions, new_version
+from cached_result.utils import MISSING, now
+
+
+__all__ = ['AsyncCachedFunction']
+
+
+async def _run(backend, name, *args, **kwargs):
+    """
+    Calls the async variant of the ``name`` method of ``backend``
+    (``aget`` for ``get``, etc.), falling back to the sync one on Django
+    versions without the async cache API.
+    """
+    method = getattr(backend, 'a' + name, None)
+    if method is None:
+        return getattr(backend, name)(*args, **kwargs)
+    return await method(*args, **kwargs)
+
+
+class AsyncCachedLock(CacheLock):
+    """
+    A :class:`CacheLock` driven through the async cache API.
+    """
+
+    async def acquire(self):
+        token = self._new_token()
+        if await _run(self.backend, 'add', self.key, token, timeout=self.timeout):
+            self._token = token
+            return True
+        return False
+
+    async def release(self):
+        if self._token is not None:
+            if await _run(self.backend, 'get', self.key) == self._token:
+                await _run(self.backend, 'delete', self.key)
+            self._token = None
+
+
+class AsyncCachedFunction(CachedFunction):
+    """
+    The :class:`CachedFunction` counterpart for coroutine functions, which
+    :func:`cached_function` returns when decorating an ``async def``.
+
+    Calling it (as well as :meth:`reset_cache`, :meth:`delete_cache` and
+    :meth:`many`) returns an awaitable, and Django's cache is accessed with
+    its async API. Concurrent awaits of the same key share a single
+    computation.
+
+    Example::
+
+        @cached_function(id='{0}', timeout=60)
+        async def get_rates(currency):
+            return await fetch_rates(currency)
+
+        >>> await get_rates('EUR')
+    """
+
+    def __init__(self, fn, **kwargs):
+        CachedFunction.__init__(self, fn, **kwargs)
+        if self._max_size and self._oversize == 'chunk':
+            # chunks are stored and fetched with the sync API
+            raise ValueError('oversize=\'chunk\' isn\'t supported for coroutine functions')
+        self._inflight = {}
+        self._refreshing = {}
+
+    async def __call__(self, *args, **kwargs):
+        if self._is_method and self._obj is None and args:
+            return await self._bind(args[0])(*args[1:], **kwargs)
+
+        key = None
+        value = MISSING
+        stale = MISSING
+        memoization_key = None
+        request_cache = None
+
+        if self._memoize:
+            if self._tags:
+                self._check_memo_generation()
+            memoization_key = self._get_memoization_key(*args, **kwargs)
+            value = self._cached_results.get(memoization_key, MISSING)
+            if value is not MISSING:
+                self._stats.memo_hits += 1
+                if cache_hit.receivers:
+                    cache_hit.send(sender=self, key=None, source='memo')
+                if value.__class__ is CachedError:
+                    raise value.exception
+                return value
+
+        if self._cache:
+            key = self._get_call_key(args, kwargs)
+        if key is not None:
+            if self._refresh_every:
+                get_scheduler().touch(self, key, args, kwargs, asyncio.get_event_loop())
+
+            if self._request_cache:
+                request_cache = get_request_cache()
+                if request_cache is not None:
+                    value = request_cache.get(key, MISSING)
+                    if value is not MISSING:
+                        self._record_hit(key, 'request')
+                        return self._unwrap(value)
+
+            value = await self._aget_from_backend(key, args, kwargs)
+            if isinstance(value, Envelope):
+                value, stale = self._open_envelope(key, value, args, kwargs)
+
+            if value is not MISSING:
+                self._record_hit(key, 'cache')
+
+        if value is MISSING:
+            self._record_miss(key)
+            flight_key = self._get_flight_key(key, memoization_key, args, kwargs)
+            if self._lock:
+                value = await self._collapse(flight_key, self._acompute_locked, key, args, kwargs, stale)
+            else:
+                value = await self._collapse(flight_key, self._acompute, key, args, kwargs)
+
+            if self._memoize and value is not stale:
+                self._memoize_value(memoization_key, value)
+
+        if request_cache is not None:
+            request_cache[key] = value
+
+        return self._unwrap(value)
+
+    async def many(self, args_list):
+        """
+        The async counterpart of :meth:`CachedFunction.many`; ``batch_fn``
+        may be a coroutine function.
+        """
+        call = self._start_many(args_list)
+
+        if self._cache and call.pending:
+            if self._tags:
+                found = await self._aget_many_tagged(call.tag_keys)
+            else:
+                found = await _run(self._cache_backend, 'get_many', list(set(call.get_keys(call.pending))))
+            self._take_found(call, found)
+
+        if call.pending:
+            todo = self._get_todo(call)
+            versions = [None] * len(todo)
+            if self._cache and self._tags:
+                versions = await self._aget_tag_versions(call.get_tag_keys(todo))
+
+            computed, delta = await self._acompute_many(call.get_args(todo))
+
+            if self._cache:
+                await self._astore_many(call.get_keys(todo), computed, delta, versions)
+            self._take_computed(call, todo, computed)
+
+        return self._finish_many(call)
+
+    async def map(self, iterable):
+        return await self.many((arg,) for arg in iterable)
+
+    async def warm(self, args_list, force=False):
+        """
+        The async counterpart of :meth:`CachedFunction.warm`.
+        """
+        keys, tag_keys = self._get_warm_keys(args_list)
+
+        if not force:
+            if self._tags:
+                found = await self._aget_many_tagged(tag_keys)
+            else:
+                found = await _run(self._cache_backend, 'get_many', list(keys))
+            self._drop_fresh(keys, found)
+
+        if not keys:
+            return 0
+
+        keys = list(keys.items())
+        versions = [None] * len(keys)
+        if self._tags:
+            versions = await self._aget_tag_versions([tag_keys[key] for key, _ in keys])
+
+        computed, delta = await self._acompute_many([args for _, args in keys])
+        await self._astore_many([key for key, _ in keys], computed, delta, versions)
+        return len(keys)
+
+    async def reset_cache(self, *args, **kwargs):
+        if self._is_method and self._obj is None and args:
+            return await self._bind(args[0]).reset_cache(*args[1:], **kwargs)
+
+        key = self._get_call_key(args, kwargs) if self._cache else None
+        value = await self._acompute(key, args, kwargs)
+
+        if self._memoize:
+            memoization_key = self._get_memoization_key(*args, **kwargs)
+            self._memoize_value(memoization_key, value)
+
+        if key is not None and self._request_cache:
+            request_cache = get_request_cache()
+            if request_cache is not None:
+                request_cache[key] = value
+
+        return self._unwrap(value)
+
+    async def delete_cache(self, *args, **kwargs):
+        if self._is_method and self._obj is None and args:
+            return await self._bind(args[0]).delete_cache(*args[1:], **kwargs)
+
+        key = self._get_call_key(args, kwargs) if self._cache else None
+        if key is not None:
+            await _run(self._cache_backend, 'delete', key)
+
+            request_cache = get_request_cache()
+            if request_cache is not None:
+                request_cache.pop(key, None)
+
+        if self._memoize:
+            memoization_key = self._get_memoization_key(*args, **kwargs)
+            self._cached_results.delete(memoization_key)
+
+    async def _collapse(self, key, coroutine_fn, *args):
+        """
+        Awaits ``coroutine_fn(*args)``, sharing its result with all the
+        concurrent awaits for ``key`` through a single future.
+        """
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = loop.create_future()
+        try:
+            value = await coroutine_fn(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark it as retrieved when nobody else awaits it
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        return value
+
+    async def _acompute(self, key, args, kwargs):
+        versions = None
+        if key is not None and self._tags:
+            versions = (await self._aget_tag_versions([self._get_tag_keys(args, kwargs)]))[0]
+
+        started = now()
+        try:
+            value = await self._fn(*self._inject_obj(args), **kwargs)
+        except self._cache_exceptions as e:
+            value = CachedError(e)
+
+        delta = now() - started
+        self._stats.add_compute_time(delta)
+
+        if key is not None:
+            stored, timeout = self._pack(key, value, delta, versions)
+            if stored is not MISSING:
+                await _run(self._cache_backend, 'set', key, stored, timeout=timeout)
+                self._record_set(key, stored, timeout, delta)
+
+        return value
+
+    async def _astore_many(self, keys, values, delta, versions):
+        for timeout, data in self._pack_many(keys, values, delta, versions).items():
+            await _run(self._cache_backend, 'set_many', data, timeout=timeout)
+
+    async def _acompute_many(self, args_list):
+        started = now()
+        if self._batch_fn is not None:
+            values = self._batch_fn(*self._inject_obj((args_list,)))
+            if inspect.isawaitable(values):
+                values = await values
+            values = list(values)
+            if len(values) != len(args_list):
+                raise ValueError('batch_fn returned %d results for %d calls' % (len(values), len(args_list)))
+        else:
+            values = []
+            for args in args_list:
+                try:
+                    values.append(await self._fn(*self._inject_obj(args)))
+                except self._cache_exceptions as e:
+                    values.append(CachedError(e))
+        duration = now() - started
+        self._stats.add_compute_time(duration, len(args_list))
+        return values, duration / len(args_list)
+
+    async def _acompute_locked(self, key, args, kwargs, stale=MISSING):
+        if key is None:
+            return await self._acompute(key, args, kwargs)
+
+        lock = AsyncCachedLock(self._lock_backend, key, self._lock_timeout)
+        if not await lock.acquire():
+            if stale is not MISSING:
+                return stale
+
+            deadline = now() + self._lock_timeout
+            while not await lock.acquire():
+                await asyncio.sleep(self.lock_poll_interval)
+                value = await self._aget_fresh(key, args, kwargs)
+                if value is not MISSING:
+                    return value
+                if now() >= deadline:
+                    return await self._acompute(key, args, kwargs)
+
+            # The previous holder might have just finished
+            value = await self._aget_fresh(key, args, kwargs)
+            if value is not MISSING:
+                await lock.release()
+                return value
+
+        try:
+            return await self._acompute(key, args, kwargs)
+        finally:
+            await lock.release()
+
+    async def _aget_fresh(self, key, args, kwargs):
+        value = await self._aget_from_backend(key, args, kwargs)
+        if isinstance(value, Envelope):
+            return MISSING if value.is_expired() else value.value
+        return value
+
+    async def _aget_from_backend(self, key, args, kwargs):
+        sampled = self._stats.sample()
+        if sampled:
+            started = now()
+        if self._tags:
+            value = (await self._aget_many_tagged({key: self._get_tag_keys(args, kwargs)})).get(key, MISSING)
+        else:
+            value = await _run(self._cache_backend, 'get', key, MISSING)
+        if sampled:
+            self._stats.add_backend_time(now() - started)
+        if self._codec is not None:
+            value = self._load(value)
+        return value
+
+    async def _aget_many_tagged(self, tag_keys):
+        keys = list(tag_keys)
+        all_tag_keys = get_all_tag_keys(tag_keys.values())
+        if self._tiers is None:
+            found = versions = await _run(self._cache_backend, 'get_many', keys + all_tag_keys)
+        else:
+            found = self._tiers.get_many(keys)
+            versions = await _run(self._tiers.shared, 'get_many', all_tag_keys)
+        return self._check_versions(tag_keys, found, versions)
+
+    async def _aget_tag_versions(self, tag_keys_list):
+        backend = self._tags_backend
+        all_tag_keys = get_all_tag_keys(tag_keys_list)
+        versions = await _run(backend, 'get_many', all_tag_keys)
+        for key in all_tag_keys:
+            if key not in versions:
+                version = new_version()
+                if not await _run(backend, 'add', key, version, timeout=None):
+                    version = await _run(backend, 'get', key)
+                versions[key] = version
+        return group_tag_versions(tag_keys_list, versions)
+
+    def _schedule_refresh(self, key, args, kwargs):
+        if key not in self._refreshing:
+            # keep a reference to the task until it's done
+            self._refreshing[key] = asyncio.ensure_future(self._arefresh(key, args, kwargs))
+
+    async def _arefresh_scheduled(self, key, args, kwargs):
+        lease = AsyncCachedLock(self._lock_backend, '%s:refresh' % key, self._refresh_every * 0.9)
+        if await lease.acquire():
+            try:
+                await self.reset_cache(*args, **kwargs)
+            except Exception:
+                logger.exception('Background refresh of %s failed', key)
+
+    async def _arefresh(self, key, args, kwargs):
+        try:
+            lock = AsyncCachedLock(self._lock_backend, key, self._lock_timeout)
+            if await lock.acquire():
+                try:
+                    await self.reset_cache(*args, **kwargs)
+                finally:
+                    await lock.release()
+        except Exception:
+            logger.exception('Background refresh of %s failed', key)
+        finally:
+            self._refreshing.pop(key, None)
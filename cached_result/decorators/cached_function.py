@@ -1,7 +1,90 @@
 from __future__ import unicode_literals
-from copy import copy
 import hashlib
-from django.core.cache import cache as cache_backend
+import inspect
+import time
+import uuid
+import weakref
+import zlib
+from time import sleep
+from django.core.cache import cache as default_cache
+from django.db.models import Model
+from cached_result.backends import TieredCache, get_cache
+from cached_result.compat import binary_type, force_bytes, integer_types, string_types, text_type
+from cached_result.context import get_request_cache
+from cached_result.envelope import Envelope, CachedError, Chunks, NONE
+from cached_result.keys import (UnsavedInstanceError, compile_key_template, get_code_version, get_hash_algorithm,
+                                hash_args, make_memoization_key, serialize_args)
+from cached_result.locks import CacheLock, SingleFlight
+from cached_result.memo import BaseMemoStore, get_memo_store
+from cached_result.refresh import Refresher, get_scheduler
+from cached_result.registry import get_name, register
+from cached_result.serializers import get_codec
+from cached_result.signals import cache_hit, cache_miss, cache_set
+from cached_result.stats import Stats
+from cached_result.tags import get_all_tag_keys, get_generation, get_tag_key, get_tag_versions, group_tag_versions
+from cached_result.utils import MISSING, now
+
+
+LOCK_MODES = (False, True, 'wait', 'stale')
+
+OVERSIZE_MODES = ('skip', 'chunk', 'compress')
+
+# Argument types whose equal values always give the same key
+KEY_CACHE_TYPES = frozenset(integer_types + string_types + (binary_type, float, bool, type(None)))
+
+# Number of keys whose cache hits are counted for adaptive timeouts (the
+# counts are all cleared when it's reached)
+KEY_HITS_SIZE = 10000
+
+# Argument types used as is for memoization keys
+FAST_TYPES = frozenset(integer_types + string_types)
+
+# Name of the instance attribute holding the bound wrappers of an object
+BOUND_ATTR = '_cached_result_bound'
+
+
+class _BoundWrappers(dict):
+    """
+    The per-instance state of the wrappers bound to an object, keyed by
+    their unbound counterpart: a list of the memo store (or ``None``) and a
+    weak reference to the bound wrapper in use, if any. As the wrappers
+    reference the object (like bound methods), neither they nor the object
+    itself are referenced strongly, so that it's freed without the cyclic
+    GC. They're dropped when the object is pickled or copied.
+    """
+
+    def __init__(self, owner=None):
+        super(_BoundWrappers, self).__init__()
+        self.owner_id = id(owner) if owner is not None else None
+
+    def __reduce__(self):
+        return _BoundWrappers, ()
+
+
+class _ManyCall(object):
+    """
+    The state of a :meth:`CachedFunction.many` call between its I/O steps,
+    which are the only parts differing between the sync and async variants.
+    Items are referred to by their index in ``args_list``.
+    """
+
+    def __init__(self, args_list):
+        self.args_list = args_list
+        self.results = [MISSING] * len(args_list)
+        self.memoization_keys = [None] * len(args_list)
+        self.keys = {}
+        self.tag_keys = {}
+        self.pending = self.not_memoized = list(range(len(args_list)))
+        self.request_cache = None
+
+    def get_args(self, indexes):
+        return [self.args_list[i] for i in indexes]
+
+    def get_keys(self, indexes):
+        return [self.keys[i] for i in indexes]
+
+    def get_tag_keys(self, indexes):
+        return [self.tag_keys[self.keys[i]] for i in indexes]
 
 
 class CachedFunction(object):
@@ -30,7 +113,16 @@ class CachedFunction(object):
         16
     """
 
-    def __init__(self, fn, key=None, id=None, timeout=None, cache=True, memoize=True, hash_algorithm=hashlib.md5):
+    #: How often (in seconds) callers waiting for a locked key poll the cache.
+    lock_poll_interval = 0.05
+
+    def __init__(self, fn, key=None, id=None, timeout=None, cache=True, memoize=True, hash_algorithm=hashlib.md5,
+                 maxsize=None, memo_store=None, lock=False, lock_timeout=30, stale_ttl=None, early_recompute=None,
+                 cache_exceptions=(), exception_timeout=None, batch_fn=None, request_cache=True, key_cache=None,
+                 memoization_key=None, using=None, tiers=None, tags=None, serializer=None, compression=None,
+                 compression_threshold=1024, jitter=None, max_timeout=None, single_flight=True,
+                 version=None, refresh_every=None, refresh_idle=None, max_size=None, oversize='skip',
+                 memo_max_bytes=None):
         """
         Initializes a wrapper of ``fn``.
 
@@ -56,7 +148,140 @@ class CachedFunction(object):
         :param cache: Specifies whether the cache used
         :param memoize: Specifies whether the memoization used
         :param hash_algorithm: Specifies the hash algorithm for
-            cache key or None if do nothing
+            cache key or None if do nothing; it can be a callable (e.g.
+            ``hashlib.md5``) or the name of an algorithm (e.g. ``'blake2b'``,
+            ``'xxhash'``).
+        :param maxsize: The maximum number of memoized results; the least
+            recently (or frequently, see ``memo_store``) used one is evicted
+            when it's exceeded. ``None`` means unbounded.
+        :param memo_store: The in-process store used for memoization: ``'lru'``
+            (the default), ``'lfu'``, a :class:`~cached_result.memo.BaseMemoStore`
+            subclass or instance. Memoized results expire after ``timeout``.
+            The results of methods (and properties) are memoized on each
+            instance, in a store of its own (so ``maxsize`` applies per
+            instance) which is freed along with it; a store instance is
+            shared by all of them though.
+        :param lock: Enables the dogpile protection on cache misses; it can be:
+
+            - ``False``: Every caller that misses computes the value.
+            - ``True`` or ``'wait'``: A single caller (across all processes
+              sharing the cache) computes the value while the others poll
+              the cache until it's available.
+            - ``'stale'``: Like ``'wait'``, but the others get the expired
+              value (if any) instead of waiting; unless ``stale_ttl`` is
+              given, expired values are kept for another ``timeout`` to that
+              end.
+
+            Concurrent callers within a process always share a single
+            computation when locking is enabled.
+        :param lock_timeout: The number of seconds after which the lock
+            expires; callers that have been waiting that long compute the
+            value themselves.
+        :param stale_ttl: If given, expired values are kept for that many
+            seconds more, during which they're still returned while being
+            recomputed in a background thread. Requires ``timeout``.
+        :param early_recompute: If given, values are recomputed in a background
+            thread with a probability increasing as their expiration time
+            approaches (XFetch); the value (``True`` means ``1.0``) is the beta
+            parameter, the greater the earlier. Requires ``timeout``.
+        :param cache_exceptions: An exception class or a tuple of them; if
+            ``fn`` raises one of them, the exception is cached and raised
+            again on subsequent calls instead of calling ``fn``.
+        :param exception_timeout: The timeout used for cached exceptions;
+            defaults to ``timeout``.
+        :param batch_fn: An optional callable used by :meth:`many` to compute
+            all the missing results at once; it's given the list of ``args``
+            tuples (after the bound object, if any) and must return the list
+            of the corresponding results.
+        :param request_cache: Specifies whether the request-scoped cache (see
+            :class:`~cached_result.middleware.RequestCacheMiddleware`) is
+            checked before Django's cache, when it's active.
+        :param key_cache: If given, up to that many final cache keys are kept
+            in memory (the whole key cache is cleared when it's full), so that
+            repeated calls skip building and hashing them.
+            Only calls of unbound functions whose arguments are all plain
+            values (numbers, strings, ``None``) are concerned.
+        :param memoization_key: An optional callable returning a hashable
+            memoization key for a call, given the same arguments as ``fn``.
+            By default, the arguments themselves are used (like
+            :func:`functools.lru_cache`), lists, dicts and sets being
+            converted to hashable equivalents; the object of bound methods
+            is identified by its pk for model instances.
+        :param using: The alias of the cache (in ``settings.CACHES``) used;
+            defaults to ``'default'``.
+        :param tiers: Instead of ``using``, a list of cache aliases which are
+            read in order (e.g. a local memory cache, then a shared one) and
+            all written to; an item may be an ``(alias, timeout)`` pair, the
+            timeout capping the one of the values stored in that tier. Values
+            found in a slower tier are only copied into the faster ones if
+            ``timeout`` (or the cap) is given. See
+            :class:`~cached_result.backends.TieredCache`.
+        :param tags: A list of tags, so that all the cached results of the
+            function tagged with one of them can be invalidated at once with
+            :func:`~cached_result.tags.invalidate_tags`. Like ``key``, an item
+            can be a callable or a format string given the call arguments
+            (e.g. ``'user:{0.pk}'``). The current versions of the tags are
+            fetched along with the value, in a single ``get_many``. Memoized
+            results are only invalidated within the process which invalidates
+            the tags.
+        :param serializer: If given, values are serialized to bytes before
+            being stored, with ``'pickle'`` (the highest protocol), ``'json'``
+            or ``'msgpack'``; otherwise they're left to the cache backend.
+            See :func:`~cached_result.serializers.get_codec`.
+        :param compression: If given, serialized values (pickled by default)
+            larger than ``compression_threshold`` bytes are compressed with
+            ``'zlib'``, ``'lz4'`` or ``'zstd'``.
+        :param compression_threshold: The minimum size (in bytes) of the
+            values which are compressed.
+        :param jitter: If given, up to that many seconds (or that percentage
+            of the timeout, e.g. ``'10%'``) are added to the timeout of each
+            value, so that values stored together don't all expire together.
+            The amount is derived from the key, thus the same on every store.
+            Requires ``timeout``.
+        :param max_timeout: If given, the timeout of the values which saved
+            computations before expiring is extended, up to ``max_timeout``:
+            it's multiplied by 1 plus the computation time saved (the number
+            of cache hits of the previous value in the current process, times
+            its computation time, in seconds). Requires ``timeout``.
+        :param single_flight: Specifies whether concurrent calls with the
+            same arguments within the process (i.e. from several threads)
+            share a single computation; the others wait for its result.
+            Always the case with ``lock``.
+        :param version: If given, it's part of the cache keys, so that
+            changing it invalidates the results cached so far (and only the
+            ones of this function). ``True`` derives it from the code of
+            ``fn`` once, when decorating it (see
+            :func:`~cached_result.keys.get_code_version`), so that deploying
+            a change of its code invalidates its results.
+        :param refresh_every: If given, the results accessed (through the
+            cache, memoized results expiring after that many seconds) are
+            recomputed every ``refresh_every`` seconds in the background (see
+            :class:`~cached_result.refresh.Scheduler`), so that no call
+            ever has to compute them once they're cached. A lease in the
+            cache makes sure only one process refreshes a given result per
+            period. Requires ``timeout`` (greater than it).
+        :param refresh_idle: The number of seconds after which results which
+            haven't been accessed are no longer refreshed; defaults to
+            ``timeout``.
+        :param max_size: If given, the maximum size (in bytes) of the values
+            stored in the cache, e.g. a bit less than the 1 MB memcached
+            silently rejects. Values are serialized (pickled by default) to
+            be measured; see ``oversize`` for the larger ones.
+        :param oversize: What's done with the values larger than
+            ``max_size``:
+
+            - ``'skip'``: They aren't cached (but still memoized).
+            - ``'chunk'``: They're split into chunks of ``max_size`` bytes
+              stored under keys of their own, and fetched back with a
+              single ``get_many``. Deleting the value leaves its chunks
+              until they expire.
+            - ``'compress'``: They're compressed (with ``compression``,
+              ``'zlib'`` by default), and skipped if they're still too large.
+
+            The outcome is counted in :meth:`stats`.
+        :param memo_max_bytes: If given, the maximum number of bytes of
+            memoized results (per store, like ``maxsize``), as estimated by
+            pickling them; larger results aren't memoized at all.
         """
         self._fn = fn
         self._key = key
@@ -64,57 +289,142 @@ class CachedFunction(object):
         self._timeout = timeout
         self._cache = cache
         self._memoize = memoize
-        self._hash_algorithm = hash_algorithm
+        self._hash_algorithm = get_hash_algorithm(hash_algorithm)
+        self._lock = lock
+        self._lock_timeout = lock_timeout
+        self._stale_ttl = stale_ttl
+        self._early_recompute = 1.0 if early_recompute is True else early_recompute
+        self._cache_exceptions = cache_exceptions
+        self._exception_timeout = exception_timeout if exception_timeout is not None else timeout
+        self._batch_fn = batch_fn
+        self._request_cache = request_cache
+        self._memoization_key = memoization_key
+        self._using = using
+        self._tiers = TieredCache.from_tiers(tiers, timeout) if tiers else None
+
+        if using and tiers:
+            raise ValueError('using and tiers are mutually exclusive')
+
+        self._tags = []
+        for tag in tags or ():
+            if isinstance(tag, string_types):
+                tag = compile_key_template(tag)
+            elif not callable(tag):
+                raise TypeError('%s tags are invalid' % tag.__class__.__name__)
+            self._tags.append(tag)
+        self._codec = get_codec(serializer, compression, compression_threshold)
+
+        if oversize not in OVERSIZE_MODES:
+            raise ValueError('%r is not a valid oversize mode' % (oversize,))
+        self._max_size = max_size
+        self._oversize = oversize
+        self._oversize_codec = None
+        if max_size:
+            if self._codec is None:  # values have to be serialized to be measured
+                self._codec = get_codec('pickle')
+            if oversize == 'compress':
+                self._oversize_codec = get_codec(serializer, compression or 'zlib', 0)
+
+        if lock not in LOCK_MODES:
+            raise ValueError('%r is not a valid lock mode' % (lock,))
+
+        if (stale_ttl or early_recompute or jitter or max_timeout or refresh_every) and not timeout:
+            raise ValueError('stale_ttl, early_recompute, jitter, max_timeout and refresh_every require a timeout')
+
+        if refresh_every and (refresh_every >= timeout or not cache):
+            raise ValueError('refresh_every must be lower than timeout, and requires the cache')
+        self._refresh_every = refresh_every
+        self._refresh_idle = refresh_idle or timeout
+
+        self._jitter = self._jitter_ratio = None
+        if isinstance(jitter, string_types) and jitter.endswith('%'):
+            self._jitter_ratio = float(jitter[:-1]) / 100
+        elif jitter:
+            self._jitter = float(jitter)
+
+        self._max_timeout = max_timeout
+        self._key_hits = {} if max_timeout else None  # cache hits per key, for adaptive timeouts
+
+        if lock == 'stale' and stale_ttl is None:
+            self._stale_ttl = timeout
+
+        # Envelopes keep the metadata needed for serving stale values
+        self._use_envelope = bool(self._stale_ttl or self._early_recompute or self._tags)
 
         self._obj = None  # for bound methods' im_self object
-        self._cached_results = {}
+        self._is_method = False  # set once accessed through a class
+        # memoized results of refreshed functions expire with each refresh,
+        # so that the ones refreshed by other processes are picked up
+        memo_timeout = refresh_every or timeout
+        self._cached_results = get_memo_store(memo_store, maxsize=maxsize, timeout=memo_timeout,
+                                              max_bytes=memo_max_bytes)
+        self._memo_store_args = (memo_store, maxsize, memo_timeout, memo_max_bytes)
+        self._memo_per_instance = False  # whether _cached_results belongs to _obj
+        self._single_flight = SingleFlight() if single_flight or lock else None
+        self._refresher = Refresher()
+        self._key_cache = {} if key_cache else None
+        self._key_cache_size = key_cache
 
         self.__name__ = fn.__name__
         self.__doc__ = fn.__doc__
+        self.name = get_name(fn)
+        self._stats = Stats()
+        register(self)
+
+        if version is True:
+            version = get_code_version(fn)
+        self.version = version = text_type(version) if version is not None else None
 
         if key:
-            if callable(key):
+            if callable(key) and version is not None:
+                self._key = lambda *args, **kwargs: '%s@%s' % (key(*args, **kwargs), version)
+            elif callable(key):
                 self._key = key
-            elif isinstance(key, basestring):
-                self._key = str(key).format
+            elif isinstance(key, string_types):
+                if version is not None:
+                    key += '@' + version.replace('{', '{{').replace('}', '}}')
+                self._key = compile_key_template(key)
             else:
                 raise TypeError('%s keys are invalid' % key.__class__.__name__)
         else:
+            if id and not callable(id):
+                if isinstance(id, string_types):
+                    id = compile_key_template(id)
+                else:
+                    raise TypeError('%s keys are invalid' % id.__class__.__name__)
+
+            parts = [fn.__module__]
+            if hasattr(fn, '__self__'):
+                parts.append(fn.__self__.__class__.__name__)
+            parts.append(fn.__name__)
+            prefix = '.'.join(parts)
+            if version is not None:
+                prefix += '@' + version
+            prefix += '.'
+
             def generate_key(*args, **kwargs):
                 """
                 Generates the cache key based on ``fn.__module__``, ``fn.__name__``.
-                Also it includes class name (if any) and specified id (if any).
+                Also it includes class name (if any) and specified id (if any);
+                unless an id is specified, it includes a hash of the arguments.
+
+                The object of bound methods (and properties) isn't part of the
+                hashed arguments, unless it's a model instance (its pk is used).
 
                 :returns: formatted string
                 :rtype: str or unicode
                 """
-                parts = []
-
-                parts.append(fn.__module__)
-
-                if hasattr(fn, '__self__'):
-                    parts.append(fn.__self__.__class__.__name__)
-
-                parts.append(fn.__name__)
-
                 if id:
-                    if callable(id):
-                        _id = id
-                    elif isinstance(id, basestring):
-                        _id = str(id).format
-                    else:
-                        raise TypeError('%s keys are invalid' % id.__class__.__name__)
-
-                    parts.append(_id(*args, **kwargs))
+                    return prefix + id(*args, **kwargs)
 
-                ## TODO Implement args hashing
-                #if args:
-                #    parts.append(pickle.dumps(args))
-                #
-                #if kwargs:
-                #    parts.append(pickle.dumps(sorted(kwargs.items())))
-
-                return '.'.join(parts)
+                if self._is_method and args and not isinstance(args[0], Model):
+                    args = args[1:]
+                if args or kwargs:
+                    # the whole key is hashed anyway when there's a hash algorithm
+                    if self._hash_algorithm:
+                        return prefix + serialize_args(args, kwargs)
+                    return prefix + hash_args(args, kwargs)
+                return prefix[:-1]
 
             self._key = generate_key
 
@@ -128,29 +438,318 @@ class CachedFunction(object):
 
         :returns: The cached or computed result.
         """
+        if self._is_method and self._obj is None and args:
+            return self._bind(args[0])(*args[1:], **kwargs)
+
         key = None
-        value = None
+        value = MISSING
+        stale = MISSING
         memoization_key = None
+        request_cache = None
 
         if self._memoize:
+            if self._tags:
+                self._check_memo_generation()
             memoization_key = self._get_memoization_key(*args, **kwargs)
-            if memoization_key in self._cached_results:
-                return self._cached_results[memoization_key]
+            value = self._cached_results.get(memoization_key, MISSING)
+            if value is not MISSING:
+                self._stats.memo_hits += 1
+                if cache_hit.receivers:
+                    cache_hit.send(sender=self, key=None, source='memo')
+                if value.__class__ is CachedError:
+                    raise value.exception
+                return value
 
         if self._cache:
-            key = self.get_cache_key(*args, **kwargs)
-            value = cache_backend.get(key)
+            key = self._get_call_key(args, kwargs)
+        if key is not None:
+            if self._refresh_every:
+                get_scheduler().touch(self, key, args, kwargs)
 
-        if value is None:
-            value = self._fn(*self._inject_obj(args), **kwargs)
+            if self._request_cache:
+                request_cache = get_request_cache()
+                if request_cache is not None:
+                    value = request_cache.get(key, MISSING)
+                    if value is not MISSING:
+                        self._record_hit(key, 'request')
+                        return self._unwrap(value)
+
+            value = self._get_from_backend(key, args, kwargs)
+            if isinstance(value, Envelope):
+                value, stale = self._open_envelope(key, value, args, kwargs)
+
+            if value is not MISSING:
+                self._record_hit(key, 'cache')
+
+        if value is MISSING:
+            self._record_miss(key)
+            if self._single_flight is not None:
+                flight_key = self._get_flight_key(key, memoization_key, args, kwargs)
+                value = self._single_flight.do(flight_key, self._compute_once, key, memoization_key, args, kwargs,
+                                               stale)
+            else:
+                value = self._compute_once(key, memoization_key, args, kwargs, stale)
+
+        if request_cache is not None:
+            request_cache[key] = value
+
+        return self._unwrap(value)
+
+    def many(self, args_list):
+        """
+        Returns the list of the cached results of ``fn(*args)`` for every
+        ``args`` tuple of ``args_list``, computing and caching the missing ones.
+
+        Unlike calling the function in a loop, all the results are fetched
+        with a single ``get_many`` and the missing ones are stored with a
+        single ``set_many``; they're computed by ``batch_fn`` (if given) in a
+        single call. Locking isn't used here.
+
+        :returns: The list of the cached or computed results.
+        """
+        call = self._start_many(args_list)
+
+        if self._cache and call.pending:
+            if self._tags:
+                found = self._get_many_tagged(call.tag_keys)
+            else:
+                found = self._cache_backend.get_many(list(set(call.get_keys(call.pending))))
+            self._take_found(call, found)
+
+        if call.pending:
+            todo = self._get_todo(call)
+            versions = [None] * len(todo)
+            if self._cache and self._tags:
+                versions = self._get_tag_versions(call.get_tag_keys(todo))
+
+            computed, delta = self._compute_many(call.get_args(todo))
 
             if self._cache:
-                cache_backend.set(key, value, timeout=self._timeout)
+                self._store_many(call.get_keys(todo), computed, delta, versions)
+            self._take_computed(call, todo, computed)
+
+        return self._finish_many(call)
+
+    def _start_many(self, args_list):
+        """
+        Starts a :meth:`many` call: looks up the memo and the request-scoped
+        cache, and computes the keys of the other items, left ``pending``.
+
+        :returns: The :class:`_ManyCall` state.
+        """
+        call = _ManyCall([tuple(args) for args in args_list])
+
+        if self._memoize:
+            if self._tags:
+                self._check_memo_generation()
+            for i, args in enumerate(call.args_list):
+                call.memoization_keys[i] = self._get_memoization_key(*args)
+                call.results[i] = self._cached_results.get(call.memoization_keys[i], MISSING)
+            call.pending = call.not_memoized = [i for i, value in enumerate(call.results) if value is MISSING]
+            self._stats.memo_hits += len(call.args_list) - len(call.pending)
+
+        if self._cache and call.pending:
+            call.keys = dict((i, self.get_cache_key(*call.args_list[i])) for i in call.pending)
+            if self._request_cache:
+                call.request_cache = get_request_cache()
+            if call.request_cache is not None:
+                for i in call.pending:
+                    call.results[i] = call.request_cache.get(call.keys[i], MISSING)
+                count = len(call.pending)
+                call.pending = [i for i in call.pending if call.results[i] is MISSING]
+                self._stats.request_hits += count - len(call.pending)
+            if self._tags:
+                call.tag_keys = dict((call.keys[i], self._get_tag_keys(call.args_list[i], {})) for i in call.pending)
+
+        return call
+
+    def _take_found(self, call, found):
+        """
+        Sets the results of the ``pending`` items of ``call`` from the dict
+        of the values ``found`` in the cache; the missing ones stay pending.
+        """
+        for i in call.pending:
+            value = found.get(call.keys[i], MISSING)
+            if self._codec is not None:
+                value = self._load(value)
+            if isinstance(value, Envelope):
+                value, _ = self._open_envelope(call.keys[i], value, call.args_list[i], {})
+            call.results[i] = value
+        if self._key_hits is not None:
+            self._count_key_hits(call.keys[i] for i in call.pending if call.results[i] is not MISSING)
+        count = len(call.pending)
+        call.pending = [i for i in call.pending if call.results[i] is MISSING]
+        self._stats.hits += count - len(call.pending)
+
+    def _get_todo(self, call):
+        """
+        Returns the indexes of the ``pending`` items of ``call`` to compute:
+        one per distinct key.
+        """
+        self._stats.misses += len(call.pending)
+        if not call.keys:
+            return call.pending
+        todo, seen = [], set()
+        for i in call.pending:
+            if call.keys[i] not in seen:
+                seen.add(call.keys[i])
+                todo.append(i)
+        return todo
+
+    def _take_computed(self, call, todo, computed):
+        """
+        Sets the results of the ``pending`` items of ``call`` from the values
+        ``computed`` for the ``todo`` ones.
+        """
+        if call.keys:
+            computed = dict((call.keys[i], value) for i, value in zip(todo, computed))
+            for i in call.pending:
+                call.results[i] = computed[call.keys[i]]
+        else:
+            for i, value in zip(todo, computed):
+                call.results[i] = value
+        call.pending = []
 
+    def _finish_many(self, call):
+        """
+        Memoizes the results of ``call`` and fills the request-scoped cache
+        with them.
+
+        :returns: The list of the results.
+        """
+        if self._memoize:
+            for i in call.not_memoized:
+                self._memoize_value(call.memoization_keys[i], call.results[i])
+
+        if call.request_cache is not None:
+            for i in call.not_memoized:
+                call.request_cache[call.keys[i]] = call.results[i]
+
+        return [self._unwrap(value) for value in call.results]
+
+    def prefetch(self, objs):
+        """
+        Fetches the cached results of the method (called without arguments)
+        or property for all of ``objs`` with a single ``get_many``, and
+        preloads them into the memo of each object (or the request-scoped
+        cache, when active, if memoization is disabled), so that accessing
+        them doesn't hit the cache again. Missing results are computed as
+        usual, one by one, when accessed.
+
+        :returns: The number of results found.
+        """
+        if not self._cache:
+            return 0
+        request_cache = get_request_cache() if self._request_cache else None
+        if not self._memoize and request_cache is None:
+            return 0  # nowhere to preload them
+
+        pending = {}
+        for obj in objs:
+            bound = self._bind(obj)
             if self._memoize:
-                self._cached_results[memoization_key] = value
+                if self._tags:
+                    bound._check_memo_generation()
+                memoization_key = bound._get_memoization_key()
+                if bound._cached_results.get(memoization_key, MISSING) is not MISSING:
+                    continue
+            else:
+                memoization_key = None
+            key = bound._get_call_key((), {})
+            if key is not None:  # unsaved instances are computed on access
+                pending.setdefault(key, []).append((bound, memoization_key))
+        if not pending:
+            return 0
 
-        return value
+        if self._tags:
+            tag_keys = dict((key, bounds[0][0]._get_tag_keys((), {})) for key, bounds in pending.items())
+            found = self._get_many_tagged(tag_keys)
+        else:
+            found = self._cache_backend.get_many(list(pending))
+
+        count = 0
+        for key, value in found.items():
+            if self._codec is not None:
+                value = self._load(value)
+            if isinstance(value, Envelope):
+                if value.is_expired():
+                    continue  # served and refreshed on access
+                value = value.value
+            if value is MISSING:
+                continue
+            for bound, memoization_key in pending[key]:
+                if self._memoize:
+                    bound._memoize_value(memoization_key, value)
+                count += 1
+            if request_cache is not None:
+                request_cache[key] = value
+        self._stats.hits += count
+        return count
+
+    def warm(self, args_list, force=False):
+        """
+        Computes and caches the results of ``fn(*args)`` for every ``args``
+        tuple of ``args_list`` which aren't cached yet (or all of them if
+        ``force``), e.g. after a deploy or a cache flush. Unlike :meth:`many`,
+        nothing is memoized nor returned.
+
+        :returns: The number of results computed.
+        """
+        keys, tag_keys = self._get_warm_keys(args_list)
+
+        if not force:
+            if self._tags:
+                found = self._get_many_tagged(tag_keys)
+            else:
+                found = self._cache_backend.get_many(list(keys))
+            self._drop_fresh(keys, found)
+
+        if not keys:
+            return 0
+
+        keys = list(keys.items())
+        versions = [None] * len(keys)
+        if self._tags:
+            versions = self._get_tag_versions([tag_keys[key] for key, _ in keys])
+
+        computed, delta = self._compute_many([args for _, args in keys])
+        self._store_many([key for key, _ in keys], computed, delta, versions)
+        return len(keys)
+
+    def _get_warm_keys(self, args_list):
+        """
+        Returns the dicts mapping the cache keys of the calls with
+        ``args_list`` to their arguments and to their tag keys (or ``None``
+        without tags).
+        """
+        if not self._cache:
+            raise ValueError('Only cached results can be warmed')
+
+        keys = {}
+        for args in args_list:
+            keys.setdefault(self.get_cache_key(*args), tuple(args))
+
+        tag_keys = None
+        if self._tags:
+            tag_keys = dict((key, self._get_tag_keys(args, {})) for key, args in keys.items())
+        return keys, tag_keys
+
+    def _drop_fresh(self, keys, found):
+        """
+        Removes from ``keys`` the ones whose value ``found`` is still fresh.
+        """
+        for key, value in found.items():
+            if self._codec is not None:
+                value = self._load(value)
+            if value is not MISSING and not (isinstance(value, Envelope) and value.is_expired()):
+                del keys[key]
+
+    def map(self, iterable):
+        """
+        Like :meth:`many`, for single argument functions: returns the list
+        of the cached results of ``fn(arg)`` for every ``arg`` of ``iterable``.
+        """
+        return self.many((arg,) for arg in iterable)
 
     def reset_cache(self, *args, **kwargs):
         """"
@@ -162,31 +761,499 @@ class CachedFunction(object):
 
         :returns: The newly computed (and cached) result.
         """
-        value = self._fn(*self._inject_obj(args), **kwargs)
+        if self._is_method and self._obj is None and args:
+            return self._bind(args[0]).reset_cache(*args[1:], **kwargs)
 
-        if self._cache:
-            key = self.get_cache_key(*args, **kwargs)
-            cache_backend.set(key, value, timeout=self._timeout)
+        key = self._get_call_key(args, kwargs) if self._cache else None
+        value = self._compute(key, args, kwargs)
 
         if self._memoize:
             memoization_key = self._get_memoization_key(*args, **kwargs)
-            self._cached_results[memoization_key] = value
+            self._memoize_value(memoization_key, value)
 
-        return value
+        if key is not None and self._request_cache:
+            request_cache = get_request_cache()
+            if request_cache is not None:
+                request_cache[key] = value
+
+        return self._unwrap(value)
 
     def delete_cache(self, *args, **kwargs):
         """
         Deletes the cached and memoized result (if any) corresponding to a call
         with ``args`` and ``kwargs``.
         """
-        if self._cache:
-            key = self.get_cache_key(*args, **kwargs)
-            cache_backend.delete(key)
+        if self._is_method and self._obj is None and args:
+            return self._bind(args[0]).delete_cache(*args[1:], **kwargs)
+
+        key = self._get_call_key(args, kwargs) if self._cache else None
+        if key is not None:
+            self._cache_backend.delete(key)
 
+            request_cache = get_request_cache()
+            if request_cache is not None:
+                request_cache.pop(key, None)
+
+        if self._memoize:
+            memoization_key = self._get_memoization_key(*args, **kwargs)
+            self._cached_results.delete(memoization_key)
+
+    @property
+    def _cache_backend(self):
+        if self._tiers is not None:
+            return self._tiers
+        if self._using is None:
+            return default_cache
+        return get_cache(self._using)
+
+    @property
+    def _lock_backend(self):
+        if self._tiers is not None:
+            return self._tiers.shared
+        return self._cache_backend
+
+    def _compute_once(self, key, memoization_key, args, kwargs, stale=MISSING):
+        """
+        Computes (see :meth:`_compute`) and memoizes the result of a call
+        which missed, unless a concurrent call has memoized it meanwhile.
+        The ``stale`` value returned while another caller holds the lock
+        isn't memoized.
+        """
         if self._memoize:
+            value = self._cached_results.get(memoization_key, MISSING)
+            if value is not MISSING:
+                return value
+
+        if self._lock:
+            value = self._compute_locked(key, args, kwargs, stale)
+        else:
+            value = self._compute(key, args, kwargs)
+
+        if self._memoize and value is not stale:
+            self._memoize_value(memoization_key, value)
+        return value
+
+    def _get_flight_key(self, key, memoization_key, args, kwargs):
+        """
+        Returns the key identifying a call among the concurrent ones.
+        """
+        if key is not None:
+            return key
+        if memoization_key is None:
             memoization_key = self._get_memoization_key(*args, **kwargs)
-            if memoization_key in self._cached_results:
-                del self._cached_results[memoization_key]
+        if self._memo_per_instance:  # the key doesn't include the object
+            return id(self._obj), memoization_key
+        return memoization_key
+
+    def _compute(self, key, args, kwargs):
+        """
+        Computes ``fn(*args, **kwargs)`` and stores it under ``key`` (unless
+        it's ``None``, e.g. when caching is disabled).
+
+        :returns: The computed value or a :class:`CachedError` wrapping the
+            exception raised by ``fn`` (if it's one of ``cache_exceptions``).
+        """
+        versions = None
+        if key is not None and self._tags:
+            # read before computing, so that an invalidation occurring
+            # meanwhile makes the value stale
+            versions = self._get_tag_versions([self._get_tag_keys(args, kwargs)])[0]
+
+        started = now()
+        try:
+            value = self._fn(*self._inject_obj(args), **kwargs)
+        except self._cache_exceptions as e:
+            value = CachedError(e)
+
+        delta = now() - started
+        self._stats.add_compute_time(delta)
+
+        if key is not None:
+            stored, timeout = self._pack(key, value, delta, versions)
+            if stored is not MISSING:
+                self._cache_backend.set(key, stored, timeout=timeout)
+                self._record_set(key, stored, timeout, delta)
+
+        return value
+
+    def _compute_many(self, args_list):
+        """
+        Computes ``fn(*args)`` for every ``args`` tuple of ``args_list``,
+        through ``batch_fn`` if given.
+
+        :returns: The list of the computed values (see :meth:`_compute`) and
+            the average computation time.
+        """
+        started = now()
+        if self._batch_fn is not None:
+            values = list(self._batch_fn(*self._inject_obj((args_list,))))
+            if len(values) != len(args_list):
+                raise ValueError('batch_fn returned %d results for %d calls' % (len(values), len(args_list)))
+        else:
+            values = []
+            for args in args_list:
+                try:
+                    values.append(self._fn(*self._inject_obj(args)))
+                except self._cache_exceptions as e:
+                    values.append(CachedError(e))
+        duration = now() - started
+        self._stats.add_compute_time(duration, len(args_list))
+        return values, duration / len(args_list)
+
+    def _store_many(self, keys, values, delta, versions):
+        """
+        Stores ``values`` under ``keys``, with a ``set_many`` per timeout.
+        """
+        for timeout, data in self._pack_many(keys, values, delta, versions).items():
+            self._cache_backend.set_many(data, timeout=timeout)
+
+    def _pack_many(self, keys, values, delta, versions):
+        """
+        Returns the dict mapping each timeout to the dict of the objects to
+        store for ``values`` under ``keys`` with it (see :meth:`_pack`).
+        """
+        to_store = {}
+        for key, value, value_versions in zip(keys, values, versions):
+            stored, timeout = self._pack(key, value, delta, value_versions)
+            if stored is not MISSING:
+                to_store.setdefault(timeout, {})[key] = stored
+                self._record_set(key, stored, timeout, delta)
+        return to_store
+
+    def _pack(self, key, value, delta=0.0, versions=None):
+        """
+        Returns the object actually stored in the cache under ``key`` for
+        ``value`` (which took ``delta`` seconds to compute, with its tags at
+        ``versions``) along with its timeout; the object is ``MISSING`` if
+        the value is too large to be stored (see ``max_size``).
+        """
+        if isinstance(value, CachedError):
+            timeout = self._exception_timeout
+        else:
+            timeout = self._timeout
+            if timeout and (self._jitter or self._jitter_ratio or self._max_timeout):
+                timeout = self._get_timeout(key, timeout, delta)
+        expires = None
+        if self._use_envelope and timeout is not None:
+            expires = time.time() + timeout
+            timeout += self._stale_ttl or 0
+        if self._codec is not None and not isinstance(value, CachedError):
+            data = self._codec.dumps(value)
+            if self._max_size and len(data) > self._max_size:
+                data = self._pack_oversize(key, value, data, timeout)
+                if data is MISSING:
+                    return MISSING, timeout
+            value = data
+        if self._use_envelope:
+            return Envelope(value, expires, delta, versions), timeout
+        return NONE if value is None else value, timeout
+
+    def _pack_oversize(self, key, value, data, timeout):
+        """
+        Returns the object stored in place of ``data``, the serialized
+        ``value`` larger than ``max_size``: depending on ``oversize``, the
+        compressed value, :class:`~cached_result.envelope.Chunks` (whose
+        chunks are stored meanwhile) or ``MISSING``.
+        """
+        size = self._max_size
+        if self._oversize == 'compress':
+            data = self._oversize_codec.dumps(value)
+            if len(data) <= size:
+                self._stats.oversize_compressed += 1
+                return data
+        elif self._oversize == 'chunk':
+            chunks = Chunks('%s:chunk:%s' % (key, uuid.uuid4().hex[:8]), (len(data) + size - 1) // size)
+            parts = (data[i:i + size] for i in range(0, len(data), size))
+            self._cache_backend.set_many(dict(zip(chunks.get_keys(), parts)), timeout=timeout)
+            self._stats.oversize_chunked += 1
+            return chunks
+        self._stats.oversize_skipped += 1
+        return MISSING
+
+    def _get_timeout(self, key, timeout, delta):
+        """
+        Returns ``timeout`` adjusted for the value stored under ``key``,
+        extended (see ``max_timeout``) and jittered.
+        """
+        if self._max_timeout:
+            hits = self._key_hits.pop(key, 0)
+            timeout = min(timeout * (1 + hits * delta), max(self._max_timeout, timeout))
+        jitter = self._jitter if self._jitter is not None else timeout * (self._jitter_ratio or 0)
+        if jitter:
+            # a fraction in [0, 1) which is the same for the key in every process
+            timeout += jitter * (zlib.crc32(force_bytes(key)) & 0xffffffff) / 4294967296.0
+        return timeout
+
+    def _count_key_hits(self, keys):
+        key_hits = self._key_hits
+        if len(key_hits) >= KEY_HITS_SIZE:
+            key_hits.clear()
+        for key in keys:
+            key_hits[key] = key_hits.get(key, 0) + 1
+
+    def _load(self, value):
+        """
+        Decodes a value serialized by :meth:`_pack` (fetching its chunks if
+        it was split); values which can't be decoded are considered missing.
+        """
+        data = value.value if isinstance(value, Envelope) else value
+        if isinstance(data, Chunks):
+            data = self._join_chunks(data)
+        if isinstance(data, binary_type):
+            try:
+                data = self._codec.loads(data)
+            except ValueError:
+                return MISSING
+        if data is MISSING:
+            return MISSING
+        if isinstance(value, Envelope):
+            value.value = data
+            return value
+        return data
+
+    def _join_chunks(self, chunks):
+        """
+        Returns the data split into ``chunks``, or ``MISSING`` if one of
+        them was evicted.
+        """
+        keys = chunks.get_keys()
+        found = self._cache_backend.get_many(keys)
+        if len(found) < len(keys):
+            return MISSING
+        return b''.join(found[key] for key in keys)
+
+    def _open_envelope(self, key, envelope, args, kwargs):
+        """
+        Returns the value wrapped by ``envelope`` (or ``MISSING`` if it has to
+        be recomputed) and the expired value that can be served meanwhile (or
+        ``MISSING``). Schedules a background refresh if needed.
+        """
+        if envelope.is_expired():
+            if self._lock == 'stale':
+                return MISSING, envelope.value
+            if self._stale_ttl:
+                self._schedule_refresh(key, args, kwargs)
+                return envelope.value, MISSING
+            return MISSING, MISSING
+
+        if self._early_recompute and envelope.should_recompute(self._early_recompute):
+            self._schedule_refresh(key, args, kwargs)
+        return envelope.value, MISSING
+
+    def _schedule_refresh(self, key, args, kwargs):
+        self._refresher.refresh(key, self._refresh, key, args, kwargs)
+
+    def _compute_locked(self, key, args, kwargs, stale=MISSING):
+        """
+        Computes the value under the distributed lock for ``key``; if another
+        caller holds it, waits for its result (or returns the ``stale`` value).
+        """
+        if key is None:
+            return self._compute(key, args, kwargs)
+
+        lock = CacheLock(self._lock_backend, key, self._lock_timeout)
+        if not lock.acquire():
+            if stale is not MISSING:
+                return stale
+
+            deadline = now() + self._lock_timeout
+            while not lock.acquire():
+                sleep(self.lock_poll_interval)
+                value = self._get_fresh(key, args, kwargs)
+                if value is not MISSING:
+                    return value
+                if now() >= deadline:
+                    return self._compute(key, args, kwargs)
+
+            # The previous holder might have just finished
+            value = self._get_fresh(key, args, kwargs)
+            if value is not MISSING:
+                lock.release()
+                return value
+
+        try:
+            return self._compute(key, args, kwargs)
+        finally:
+            lock.release()
+
+    def _get_fresh(self, key, args, kwargs):
+        """
+        Returns the cached value for ``key`` unless it's missing or expired.
+        """
+        value = self._get_from_backend(key, args, kwargs)
+        if isinstance(value, Envelope):
+            return MISSING if value.is_expired() else value.value
+        return value
+
+    def _get_from_backend(self, key, args, kwargs):
+        """
+        Returns the (decoded) value stored under ``key``, or ``MISSING``;
+        the latency is measured for sampled calls.
+        """
+        sampled = self._stats.sample()
+        if sampled:
+            started = now()
+        if self._tags:
+            value = self._get_many_tagged({key: self._get_tag_keys(args, kwargs)}).get(key, MISSING)
+        else:
+            value = self._cache_backend.get(key, MISSING)
+        if sampled:
+            self._stats.add_backend_time(now() - started)
+        if self._codec is not None:
+            value = self._load(value)
+        return value
+
+    def _record_hit(self, key, source):
+        if source == 'cache':
+            self._stats.hits += 1
+            if self._key_hits is not None:
+                self._count_key_hits((key,))
+        else:
+            self._stats.request_hits += 1
+        if cache_hit.receivers:
+            cache_hit.send(sender=self, key=key, source=source)
+
+    def _record_miss(self, key):
+        self._stats.misses += 1
+        if cache_miss.receivers:
+            cache_miss.send(sender=self, key=key)
+
+    def _record_set(self, key, stored, timeout, duration):
+        self._stats.sets += 1
+        self._stats.add_size(stored.value if isinstance(stored, Envelope) else stored)
+        if cache_set.receivers:
+            cache_set.send(sender=self, key=key, timeout=timeout, duration=duration)
+
+    def stats(self):
+        """
+        Returns the counters of the function: hits (memoized, from the
+        request cache or from the cache), misses, sets, computation time,
+        backend latency and value size; see :class:`~cached_result.stats.Stats`.
+        """
+        return self._stats.as_dict()
+
+    def reset_stats(self):
+        """
+        Resets the counters of the function.
+        """
+        self._stats.reset()
+
+    def _refresh(self, key, args, kwargs):
+        """
+        Recomputes the value for ``key`` in the background unless another
+        caller (in any process) is already doing it.
+        """
+        lock = CacheLock(self._lock_backend, key, self._lock_timeout)
+        if lock.acquire():
+            try:
+                self.reset_cache(*args, **kwargs)
+            finally:
+                lock.release()
+
+    def _refresh_scheduled(self, key, args, kwargs):
+        """
+        Recomputes the value for ``key`` on behalf of the scheduler, unless
+        another process holds the lease of the current period.
+        """
+        lease = CacheLock(self._lock_backend, '%s:refresh' % key, self._refresh_every * 0.9)
+        if lease.acquire():  # not released: it expires by itself
+            self.reset_cache(*args, **kwargs)
+
+    def _get_tag_keys(self, args, kwargs):
+        """
+        Returns the cache keys of the versions of the tags of a call.
+        """
+        args = self._inject_obj(args)
+        return [get_tag_key(tag(*args, **kwargs)) for tag in self._tags]
+
+    @property
+    def _tags_backend(self):
+        if self._tiers is not None:
+            return self._tiers.shared
+        return self._cache_backend
+
+    def _get_tags_alias(self):
+        """
+        Returns the alias of the cache holding the versions of the tags.
+        """
+        if self._tiers is not None:
+            return self._tiers.aliases[-1]
+        return self._using or 'default'
+
+    def _get_many_tagged(self, tag_keys):
+        """
+        Fetches the values of the keys of ``tag_keys`` (a dict mapping them
+        to the keys of the versions of their tags) along with these versions,
+        in a single round trip unless tiers are used.
+
+        :returns: A dict of the values whose tags haven't been invalidated.
+        """
+        keys = list(tag_keys)
+        all_tag_keys = get_all_tag_keys(tag_keys.values())
+        if self._tiers is None:
+            found = versions = self._cache_backend.get_many(keys + all_tag_keys)
+        else:
+            found = self._tiers.get_many(keys)
+            versions = self._tiers.shared.get_many(all_tag_keys)
+        return self._check_versions(tag_keys, found, versions)
+
+    def _check_versions(self, tag_keys, found, versions):
+        valid = {}
+        for key, value_tag_keys in tag_keys.items():
+            value = found.get(key)
+            if isinstance(value, Envelope) and value.versions is not None:
+                current = tuple(versions.get(tag_key) for tag_key in value_tag_keys)
+                if value.versions == current and None not in current:
+                    valid[key] = value
+        return valid
+
+    def _get_tag_versions(self, tag_keys_list):
+        """
+        Returns the tuple of the current versions of the tags of every item
+        of ``tag_keys_list``, creating the missing ones.
+        """
+        versions = get_tag_versions(self._tags_backend, get_all_tag_keys(tag_keys_list))
+        return group_tag_versions(tag_keys_list, versions)
+
+    def _check_memo_generation(self):
+        """
+        Drops the memoized results if tags have been invalidated since.
+        """
+        results = self._cached_results
+        generation = get_generation()
+        if results.generation != generation:
+            results.clear()
+            results.generation = generation
+
+    def _memoize_value(self, memoization_key, value):
+        if value is NONE:  # memo hits return values as is
+            value = None
+        if isinstance(value, CachedError):
+            self._cached_results.set(memoization_key, value, timeout=self._exception_timeout)
+        else:
+            self._cached_results.set(memoization_key, value)
+
+    def _unwrap(self, value):
+        """
+        Turns a stored value back into the result of the call: raises cached
+        exceptions and restores ``None``.
+        """
+        if value is NONE:
+            return None
+        if isinstance(value, CachedError):
+            raise value.exception
+        return value
+
+    def _get_call_key(self, args, kwargs):
+        """
+        Returns the cache key of a call, or ``None`` if its result can't be
+        cached: its generated key would include an unsaved model instance
+        (e.g. the object of a property, in a form or a preview).
+        """
+        try:
+            return self.get_cache_key(*args, **kwargs)
+        except UnsavedInstanceError:
+            return None
 
     def get_cache_key(self, *args, **kwargs):
         """
@@ -195,43 +1262,143 @@ class CachedFunction(object):
         This is mainly for debugging and for interfacing with external services;
         clients of this class normally don't need to deal with cache keys explicitly.
         """
+        if self._key_cache is not None and self._obj is None:
+            cached_key = self._get_key_cache_key(args, kwargs)
+            if cached_key is not None:
+                key = self._key_cache.get(cached_key)
+                if key is None:
+                    key = self._build_cache_key(args, kwargs)
+                    if len(self._key_cache) >= self._key_cache_size:
+                        self._key_cache.clear()
+                    self._key_cache[cached_key] = key
+                return key
+
+        return self._build_cache_key(args, kwargs)
+
+    def _build_cache_key(self, args, kwargs):
         key = self._key(*self._inject_obj(args), **kwargs)
 
         if self._hash_algorithm:
-            key = self._hash_algorithm(key).hexdigest()
+            key = self._hash_algorithm(force_bytes(key)).hexdigest()
 
         return key
 
+    def _get_key_cache_key(self, args, kwargs):
+        """
+        Returns the key under which the cache key of a call is kept in the key
+        cache, or ``None`` if the arguments aren't all plain values. Types are
+        part of it since e.g. ``1``, ``1.0`` and ``True`` are equal.
+        """
+        types = tuple(map(type, args))
+        if not KEY_CACHE_TYPES.issuperset(types):
+            return None
+        if kwargs:
+            items = tuple(sorted(kwargs.items()))
+            kwarg_types = tuple(type(value) for _, value in items)
+            if not KEY_CACHE_TYPES.issuperset(kwarg_types):
+                return None
+            return args, types, items, kwarg_types
+        return args, types
+
     def _get_memoization_key(self, *args, **kwargs):
         """
         Returns the memoization key corresponding to a call with ``args`` and ``kwargs``.
         """
-        #result = [id(fn)]
-        #for arg in args:
-        #    result.append(id(arg))
-        #result.append(id(mark))
-        #for key, value in kwargs:
-        #    result.append(key)
-        #    result.append(id(value))
-        #return tuple(result)
-        key = str(self._inject_obj(args)) + str(kwargs)
-        return key
+        if self._memoization_key is not None:
+            return self._memoization_key(*self._inject_obj(args), **kwargs)
+
+        obj = self._obj
+        if obj is None or self._memo_per_instance:
+            if not kwargs:
+                if not args:
+                    return args
+                if len(args) == 1 and type(args[0]) in FAST_TYPES:
+                    return args[0]
+        else:
+            if isinstance(obj, Model) and obj.pk is not None:
+                obj = (obj.__class__, obj.pk)
+            else:
+                try:
+                    hash(obj)
+                except TypeError:
+                    obj = id(obj)
+            args = (obj,) + args
+
+        return make_memoization_key(args, kwargs)
 
     def _inject_obj(self, args):
         if self._obj is not None:
             return (self._obj,) + args
         return args
 
+    def _bind(self, obj):
+        """
+        Returns the wrapper bound to ``obj``. Its memoized results are kept
+        on ``obj`` (see :class:`_BoundWrappers`), so that they're freed with
+        it; the wrapper itself is reused while it's referenced.
+        """
+        binding = None
+        try:
+            wrappers = obj.__dict__.get(BOUND_ATTR)
+            if wrappers is None:
+                # setdefault is atomic: concurrent threads get the same wrappers
+                wrappers = obj.__dict__.setdefault(BOUND_ATTR, _BoundWrappers(obj))
+            if wrappers.owner_id != id(obj):  # a shallow copy's
+                wrappers = obj.__dict__[BOUND_ATTR] = _BoundWrappers(obj)
+        except (AttributeError, TypeError):  # no (writable) __dict__, e.g. __slots__
+            wrappers = None
+        else:
+            binding = wrappers.get(self)
+            if binding is not None:
+                bound = binding[1]()
+                if bound is not None:
+                    return bound
+
+        # a shallow copy (copy() can't handle CachedProperty)
+        bound = self.__class__.__new__(self.__class__)
+        bound.__dict__.update(self.__dict__)
+        bound._obj = obj
+        if wrappers is not None:
+            if binding is None:
+                results = None
+                memo_store, maxsize, timeout, max_bytes = self._memo_store_args
+                if self._memoize and not isinstance(memo_store, BaseMemoStore):
+                    results = get_memo_store(memo_store, maxsize=maxsize, timeout=timeout, max_bytes=max_bytes)
+                binding = wrappers.setdefault(self, [results, None])
+            if binding[0] is not None:
+                bound._cached_results = binding[0]
+                bound._memo_per_instance = True
+            binding[1] = weakref.ref(bound)
+        return bound
+
+    def _get_instance_results(self, obj):
+        """
+        Returns the memo store of ``obj`` for the wrapper, if it has one
+        already, without binding it.
+        """
+        wrappers = getattr(obj, '__dict__', {}).get(BOUND_ATTR)
+        if wrappers is not None and wrappers.owner_id == id(obj):
+            binding = wrappers.get(self)
+            if binding is not None:
+                return binding[0]
+        return None
+
     def __get__(self, obj, type=None):
+        self._is_method = True
         if obj is None:
             return self
-        new = copy(self)
-        new._obj = obj
-        return new
+        return self._bind(obj)
+
+
+def _make_cached_function(fn, **kwargs):
+    if getattr(inspect, 'iscoroutinefunction', None) and inspect.iscoroutinefunction(fn):
+        from cached_result.decorators.async_cached_function import AsyncCachedFunction
+        return AsyncCachedFunction(fn, **kwargs)
+    return CachedFunction(fn, **kwargs)
 
 
 def cached_function(*args, **kwargs):
     if args:  # @cached_property
-        return CachedFunction(args[0])
+        return _make_cached_function(args[0])
     else:     # @cached_property(key=...)
-        return lambda fn: CachedFunction(fn, **kwargs)
+        return lambda fn: _make_cached_function(fn, **kwargs)
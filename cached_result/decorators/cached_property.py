@@ -1,6 +1,11 @@
 from __future__ import unicode_literals
 import hashlib
+from django.db.models import signals
 from cached_result.decorators.cached_function import CachedFunction
+from cached_result.envelope import CachedError
+from cached_result.signals import cache_hit
+from cached_result.tags import get_generation
+from cached_result.utils import MISSING
 
 
 class CachedProperty(property, CachedFunction):
@@ -30,6 +35,12 @@ class CachedProperty(property, CachedFunction):
     """
 
     def __init__(self, fn, key=None, id=None, timeout=None, cache=True, memoize=True, hash_algorithm=hashlib.md5,
+                 maxsize=None, memo_store=None, lock=False, lock_timeout=30,
+                 stale_ttl=None, early_recompute=None, cache_exceptions=(), exception_timeout=None,
+                 request_cache=True, using=None, tiers=None, tags=None, depends_on=None,
+                 serializer=None, compression=None, compression_threshold=1024, jitter=None, max_timeout=None,
+                 single_flight=True, version=None,
+                 refresh_every=None, refresh_idle=None, max_size=None, oversize='skip', memo_max_bytes=None,
                  fset=None, fdel=None, doc=None):
         """
         Initializes a wrapper of ``fn``.
@@ -57,6 +68,64 @@ class CachedProperty(property, CachedFunction):
         :param memoize: Specifies whether the memoization used
         :param hash_algorithm: Specifies the hash algorithm for
             cache key or None if do nothing
+        :param maxsize: The maximum number of memoized results; ``None``
+            means unbounded.
+        :param memo_store: The in-process store used for memoization: ``'lru'``
+            (the default), ``'lfu'``, a :class:`~cached_result.memo.BaseMemoStore`
+            subclass or instance.
+        :param lock: Enables the dogpile protection on cache misses: ``False``,
+            ``True`` (or ``'wait'``) or ``'stale'``; see :class:`CachedFunction`.
+        :param lock_timeout: The number of seconds after which the lock expires.
+        :param stale_ttl: If given, expired values are kept for that many
+            seconds more and returned while being recomputed in the background.
+        :param early_recompute: If given, values are recomputed in the
+            background ahead of their expiration (XFetch); see :class:`CachedFunction`.
+        :param cache_exceptions: An exception class or a tuple of them which
+            are cached (and raised again) like regular values.
+        :param exception_timeout: The timeout used for cached exceptions;
+            defaults to ``timeout``.
+        :param request_cache: Specifies whether the request-scoped cache is
+            checked before Django's cache, when it's active.
+        :param using: The alias of the cache used; defaults to ``'default'``.
+        :param tiers: Instead of ``using``, a list of cache aliases (or
+            ``(alias, timeout)`` pairs) read in order and all written to;
+            see :class:`CachedFunction`.
+        :param tags: A list of tags for bulk invalidation; see :class:`CachedFunction`.
+        :param depends_on: For properties of models, a list of what their
+            values depend on, so that they're invalidated automatically when
+            it's saved, deleted or when its many-to-many relations change
+            (once the current transaction is committed):
+
+            - A model (or ``'app_label.Model'``): All the values are
+              invalidated on changes, unless it's the model of the property.
+            - A lookup (e.g. ``'lines'``, ``'lines__product__price'``): The
+              values of the instances related to the changed ones are
+              invalidated; a trailing field restricts the saves concerned to
+              the ones which may have changed it (according to
+              ``update_fields``).
+        :param serializer: ``'pickle'``, ``'json'`` or ``'msgpack'`` to
+            serialize values before storing them; see :class:`CachedFunction`.
+        :param compression: ``'zlib'``, ``'lz4'`` or ``'zstd'`` to compress
+            the serialized values larger than ``compression_threshold`` bytes.
+        :param jitter: Up to that many seconds (or that percentage of the
+            timeout, e.g. ``'10%'``) added to the timeout of each value,
+            depending on its key; see :class:`CachedFunction`.
+        :param max_timeout: The maximum timeout of the values extended for
+            the computations they saved; see :class:`CachedFunction`.
+        :param single_flight: Specifies whether concurrent reads from several
+            threads share a single computation.
+        :param version: A version which is part of the cache keys, or
+            ``True`` to derive it from the code of ``fn``; see :class:`CachedFunction`.
+        :param refresh_every: If given, the values accessed are recomputed
+            every that many seconds in the background; see :class:`CachedFunction`.
+        :param refresh_idle: The number of seconds after which values which
+            haven't been accessed are no longer refreshed; defaults to ``timeout``.
+        :param max_size: If given, the maximum size (in bytes) of the values
+            stored in the cache; see :class:`CachedFunction`.
+        :param oversize: What's done with the values larger than ``max_size``:
+            ``'skip'``, ``'chunk'`` or ``'compress'``; see :class:`CachedFunction`.
+        :param memo_max_bytes: If given, the maximum number of bytes of
+            memoized values, per instance.
         """
         self._fset = fset
         self._fdel = fdel
@@ -64,9 +133,67 @@ class CachedProperty(property, CachedFunction):
         self.__doc__ = doc or getattr(fn, '__doc__', None)
 
         CachedFunction.__init__(self, fn, key=key, id=id, timeout=timeout, cache=cache, memoize=memoize,
-                                hash_algorithm=hash_algorithm)
+                                hash_algorithm=hash_algorithm, maxsize=maxsize, memo_store=memo_store,
+                                lock=lock, lock_timeout=lock_timeout, stale_ttl=stale_ttl,
+                                early_recompute=early_recompute, cache_exceptions=cache_exceptions,
+                                exception_timeout=exception_timeout, request_cache=request_cache,
+                                using=using, tiers=tiers, tags=tags, serializer=serializer,
+                                compression=compression, compression_threshold=compression_threshold,
+                                jitter=jitter, max_timeout=max_timeout, single_flight=single_flight,
+                                version=version, refresh_every=refresh_every, refresh_idle=refresh_idle,
+                                max_size=max_size, oversize=oversize, memo_max_bytes=memo_max_bytes)
+        self._depends_on = depends_on
 
         property.__init__(self, fget=self.__call__, fset=fset, fdel=fdel)
+        self._is_method = True
+
+    def contribute_to_class(self, cls, name):
+        """
+        Called by Django for the properties of models; registers the
+        dependencies of the property, if any (for each concrete subclass of
+        an abstract model).
+        """
+        setattr(cls, name, self)
+        if self._depends_on:
+            from cached_result.invalidation import register
+
+            label = '%s.%s.%s' % (cls._meta.app_label, cls._meta.object_name, name)
+            self._tags.extend([lambda obj: label, lambda obj: '%s:%s' % (label, obj.pk)])
+            self._use_envelope = True
+            self._owner_label = label
+            if cls._meta.abstract:
+                # the instances saved are the ones of the concrete subclasses
+                def register_subclass(sender, **kwargs):
+                    if issubclass(sender, cls) and not sender._meta.abstract:
+                        register(self, sender)
+
+                signals.class_prepared.connect(register_subclass, weak=False)
+            else:
+                register(self, cls)
+
+    def _get_owner_tags(self, owner_pks):
+        """
+        Returns the tags to invalidate for the instances with ``owner_pks``
+        of the model of the property (``None`` means all of them).
+        """
+        if owner_pks is None:
+            return [self._owner_label]
+        return ['%s:%s' % (self._owner_label, pk) for pk in owner_pks]
+
+    def __get__(self, obj, type=None):
+        if obj is None:
+            return self
+        results = self._get_instance_results(obj) if self._memoization_key is None else None
+        if results is not None:  # fast path for memoized values, without binding
+            if self._tags and results.generation != get_generation():
+                return self._bind(obj)()
+            value = results.get((), MISSING)
+            if value is not MISSING and value.__class__ is not CachedError:
+                self._stats.memo_hits += 1
+                if cache_hit.receivers:
+                    cache_hit.send(sender=self, key=None, source='memo')
+                return value
+        return self._bind(obj)()
 
     def setter(self, fset):
         self._fset = fset
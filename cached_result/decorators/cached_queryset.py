@@ -0,0 +1,207 @@
+from __future__ import unicode_literals
+import functools
+from collections import namedtuple
+from django.db.models import Manager, Model, QuerySet, signals
+from django.db.models.base import ModelState
+from cached_result.decorators.cached_function import CachedFunction
+
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
+
+try:
+    from django.apps import apps
+except ImportError:  # Django < 1.7
+    from django.db.models.loading import get_model
+else:
+    get_model = apps.get_model
+
+
+__all__ = ['CachedQuerySet', 'ModelRows', 'cached_queryset']
+
+
+class ModelRows(Sequence):
+    """
+    The list-like result of a :class:`CachedQuerySet`: the model instances
+    are built from the cached rows (with ``Model.from_db``, like a queryset
+    does) on first access, so that e.g. a template rendering only the first
+    page of the results doesn't pay for the others.
+
+    Unless the model customizes ``from_db`` or ``__init__``, or has
+    ``pre_init``/``post_init`` receivers, ``__init__`` is skipped and the
+    field values are set directly, like unpickling does.
+    """
+
+    def __init__(self, model, db, fields, rows):
+        self.model = model
+        self.db = db
+        self.fields = fields
+        self.rows = rows
+        self._instances = [None] * len(rows)
+        if can_skip_init(model):
+            self._build = self._build_fast
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.rows)))]
+        instance = self._instances[index]
+        if instance is None:
+            instance = self._instances[index] = self._build(self.rows[index])
+        return instance
+
+    def __iter__(self):
+        for i in range(len(self.rows)):
+            yield self[i]
+
+    def __repr__(self):
+        return '<ModelRows: %d %s>' % (len(self.rows), self.model._meta.object_name)
+
+    def _build(self, row):
+        if not hasattr(self.model, 'from_db'):  # Django < 1.8
+            instance = self.model(**dict(zip(self.fields, row)))
+            instance._state.adding = False
+            instance._state.db = self.db
+            return instance
+        return self.model.from_db(self.db, self.fields, row)
+
+    def _build_fast(self, row):
+        instance = self.model.__new__(self.model)
+        instance.__dict__.update(zip(self.fields, row))
+        state = instance._state = ModelState()
+        state.adding = False
+        state.db = self.db
+        return instance
+
+
+def can_skip_init(model):
+    """
+    Returns whether instances of ``model`` can be built without calling
+    ``from_db`` and ``__init__``: neither is overridden, and there are no
+    receivers of the signals sent by ``__init__``.
+    """
+    if model.__init__ is not Model.__init__:
+        return False
+    if signals.pre_init.has_listeners(model) or signals.post_init.has_listeners(model):
+        return False
+    if not hasattr(Model, 'from_db'):  # Django < 1.8
+        return True
+    return getattr(model.from_db, '__func__', None) is Model.from_db.__func__
+
+
+_row_classes = {}
+
+
+def get_row_class(model, fields):
+    """
+    Returns the named tuple class of the rows of ``model`` with ``fields``.
+    """
+    key = model, tuple(fields)
+    row_class = _row_classes.get(key)
+    if row_class is None:
+        row_class = _row_classes[key] = namedtuple(str('%sRow' % model.__name__), fields, rename=True)
+    return row_class
+
+
+class CachedQuerySet(CachedFunction):
+    """
+    A :class:`CachedFunction` for functions returning querysets: instead
+    of pickling model instances, the cached value is the compact list of
+    the rows (tuples of field values, fetched with ``values_list``), which
+    is much smaller and cheaper to load; the instances are rebuilt from it
+    on each call (see :class:`ModelRows`), so callers never share them.
+
+    Example::
+
+        @cached_queryset(timeout=300, tags=['orders'])
+        def get_recent_orders(customer_id):
+            return Order.objects.filter(customer_id=customer_id).order_by('-id')[:500]
+
+        >>> orders = get_recent_orders(42)  # a list-like of Order instances
+
+    ``select_related`` and ``prefetch_related`` aren't applied to cached
+    results, nor are annotations kept.
+    """
+
+    def __init__(self, fn, fields=None, as_rows=False, **kwargs):
+        """
+        Initializes a wrapper of ``fn``, which must return a queryset (or a
+        manager) of model instances.
+
+        :param fields: The names of the fields cached, the others being
+            deferred (Django >= 1.8); defaults to all the concrete fields.
+        :param as_rows: If ``True``, calls return lists of named tuples of
+            the field values (keyed by ``attname``, e.g. ``customer_id``)
+            instead of model instances.
+
+        The other arguments are the ones of :class:`CachedFunction`; values
+        serialized with ``'json'`` get their dates and decimals back as
+        strings, so the default (pickle) is preferable.
+        """
+        if fields is not None and not hasattr(Model, 'from_db'):
+            raise ValueError('Deferring fields requires Django >= 1.8')
+        self._fields = fields
+        self._as_rows = as_rows
+
+        batch_fn = kwargs.get('batch_fn')
+        if batch_fn is not None:
+            kwargs['batch_fn'] = lambda args_list: [self._fetch(queryset) for queryset in batch_fn(args_list)]
+
+        @functools.wraps(fn)
+        def fetch(*args, **kwargs):
+            return self._fetch(fn(*args, **kwargs))
+
+        CachedFunction.__init__(self, fetch, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        if self._is_method and self._obj is None and args:
+            return self._bind(args[0])(*args[1:], **kwargs)
+        return self._rebuild(CachedFunction.__call__(self, *args, **kwargs))
+
+    def many(self, args_list):
+        return [self._rebuild(value) for value in CachedFunction.many(self, args_list)]
+
+    def reset_cache(self, *args, **kwargs):
+        if self._is_method and self._obj is None and args:
+            return self._bind(args[0]).reset_cache(*args[1:], **kwargs)
+        return self._rebuild(CachedFunction.reset_cache(self, *args, **kwargs))
+
+    def _fetch(self, queryset):
+        """
+        Returns the value cached for ``queryset``: the label of its model,
+        its database alias, the attnames of the fields and the rows.
+        """
+        if isinstance(queryset, Manager):
+            queryset = queryset.all()
+        if not isinstance(queryset, QuerySet):
+            raise TypeError('%s must return a QuerySet, not %s' % (self.name, queryset.__class__.__name__))
+
+        opts = queryset.model._meta
+        concrete_fields = getattr(opts, 'concrete_fields', opts.fields)  # Django < 1.6
+        if self._fields is None:
+            fields = [field.attname for field in concrete_fields]
+        else:
+            # in the order of the model fields, as from_db expects them
+            names = set(opts.get_field(name).attname for name in self._fields)
+            names.add(opts.pk.attname)
+            fields = [field.attname for field in concrete_fields if field.attname in names]
+        label = '%s.%s' % (opts.app_label, opts.object_name.lower())
+        return label, queryset.db, fields, list(queryset.values_list(*fields))
+
+    def _rebuild(self, value):
+        label, db, fields, rows = value
+        model = get_model(*label.split('.'))
+        if self._as_rows:
+            row_class = get_row_class(model, fields)
+            return [row_class._make(row) for row in rows]
+        return ModelRows(model, db, fields, rows)
+
+
+def cached_queryset(*args, **kwargs):
+    if args:  # @cached_queryset
+        return CachedQuerySet(args[0])
+    else:     # @cached_queryset(timeout=...)
+        return lambda fn: CachedQuerySet(fn, **kwargs)
@@ -0,0 +1,113 @@
+from __future__ import unicode_literals
+import math
+import random
+import time
+
+
+__all__ = ['Envelope', 'CachedError', 'Chunks', 'NONE']
+
+
+class Envelope(object):
+    """
+    Wraps a cached value together with its (wall clock) expiration time
+    (``None`` means never), the number of seconds it took to compute it and
+    the versions of its tags (if any).
+
+    Envelopes are only stored when a feature needs that metadata, e.g. the
+    stale-while-revalidate or the early recomputation modes of
+    :class:`CachedFunction`, or tags.
+    """
+
+    __slots__ = ('value', 'expires', 'delta', 'versions')
+
+    def __init__(self, value, expires, delta=0.0, versions=None):
+        self.value = value
+        self.expires = expires
+        self.delta = delta
+        self.versions = versions
+
+    def __reduce__(self):
+        return Envelope, (self.value, self.expires, self.delta, self.versions)
+
+    def __repr__(self):
+        return '<Envelope: %r (expires=%r, delta=%r, versions=%r)>' % (
+            self.value, self.expires, self.delta, self.versions)
+
+    def is_expired(self, timestamp=None):
+        """
+        Returns whether the value has expired at ``timestamp`` (now by default).
+        """
+        if self.expires is None:
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        return self.expires <= timestamp
+
+    def should_recompute(self, beta=1.0, timestamp=None):
+        """
+        Decides whether the value should be recomputed ahead of its
+        expiration, as described in "Optimal Probabilistic Cache Stampede
+        Prevention" (XFetch): the closer the expiration and the longer the
+        computation, the more likely it is. A ``beta`` greater than one
+        favors earlier recomputation.
+        """
+        if self.expires is None:
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        return timestamp - self.delta * beta * math.log(1.0 - random.random()) >= self.expires
+
+
+class CachedError(object):
+    """
+    Wraps an exception raised by a cached function, so that it's cached (and
+    raised again on hits) like a regular value.
+    """
+
+    __slots__ = ('exception',)
+
+    def __init__(self, exception):
+        self.exception = exception
+
+    def __reduce__(self):
+        return CachedError, (self.exception,)
+
+    def __repr__(self):
+        return '<CachedError: %r>' % (self.exception,)
+
+
+class Chunks(object):
+    """
+    Stored in place of a serialized value too large for the cache backend,
+    which is split into ``count`` chunks stored under ``prefix:0``,
+    ``prefix:1``, etc. The prefix is unique to each store, so that a value
+    is never reassembled from the chunks of different ones.
+    """
+
+    __slots__ = ('prefix', 'count')
+
+    def __init__(self, prefix, count):
+        self.prefix = prefix
+        self.count = count
+
+    def __reduce__(self):
+        return Chunks, (self.prefix, self.count)
+
+    def __repr__(self):
+        return '<Chunks: %s (%d)>' % (self.prefix, self.count)
+
+    def get_keys(self):
+        return ['%s:%d' % (self.prefix, i) for i in range(self.count)]
+
+
+class _NoneType(object):
+    def __reduce__(self):
+        return 'NONE'
+
+    def __repr__(self):
+        return '<NONE>'
+
+
+#: Stored in place of ``None``, which some backends (e.g. memcached) can't
+#: tell apart from a miss.
+NONE = _NoneType()
@@ -0,0 +1,214 @@
+from __future__ import unicode_literals
+import threading
+from django.db import transaction
+from django.db.models import signals
+from cached_result.compat import string_types
+from cached_result.tags import invalidate_tags
+
+try:
+    from django.apps import apps
+except ImportError:  # Django < 1.7
+    from django.db.models.loading import get_model
+else:
+    get_model = apps.get_model
+
+
+__all__ = ['register']
+
+
+# (property, owner model) pairs with dependencies
+_registry = []
+_registry_lock = threading.Lock()
+
+# Built on the first signal: model -> [(property, owner, lookup, fields)],
+# ``lookup`` leading from the owner to the model (``''`` for the owner
+# itself, ``None`` for all the owners) and ``fields`` restricting the saves
+# concerned (``None`` means any); m2m through model -> [(property, owner,
+# lookup, name, forward)], ``lookup`` leading to the model from which the
+# relation ``name`` is followed, ``forward`` if it declares it
+_dependencies = None
+_through_models = None
+
+_local = threading.local()
+
+
+def register(prop, owner):
+    """
+    Registers the dependencies of ``prop`` (a :class:`CachedProperty` of the
+    model ``owner``): its cached values are invalidated when the instances
+    they depend on are saved, deleted or have their many-to-many relations
+    changed.
+    """
+    global _dependencies
+    with _registry_lock:
+        _registry.append((prop, owner))
+        _dependencies = None
+        if len(_registry) == 1:
+            _connect()
+
+
+def _connect():
+    signals.pre_save.connect(_pre_save, dispatch_uid='cached_result.pre_save')
+    signals.post_save.connect(_post_save, dispatch_uid='cached_result.post_save')
+    signals.pre_delete.connect(_pre_delete, dispatch_uid='cached_result.pre_delete')
+    signals.m2m_changed.connect(_m2m_changed, dispatch_uid='cached_result.m2m_changed')
+
+
+def _related_model(field):
+    model = getattr(field, 'related_model', None)
+    if model is None and getattr(field, 'rel', None) is not None:  # Django < 1.8
+        model = field.rel.to
+    return model
+
+
+def _resolve(prop, owner):
+    """
+    Returns the dependencies of ``prop``: a list of ``(model, lookup,
+    fields)`` triples and a list of ``(through, lookup, name, forward)`` ones.
+    """
+    dependencies, through_models = [], []
+    for dependency in prop._depends_on:
+        if isinstance(dependency, string_types) and '.' in dependency:
+            dependency = get_model(*dependency.split('.', 1))
+
+        if not isinstance(dependency, string_types):
+            dependencies.append((dependency, '' if dependency is owner else None, None))
+            continue
+
+        model, lookup = owner, []
+        parts = dependency.split('__')
+        for i, part in enumerate(parts):
+            field = model._meta.get_field(part)
+            related = _related_model(field)
+            if related is None:
+                if i != len(parts) - 1:
+                    raise ValueError('%r is not a relation in %r' % (part, dependency))
+                dependencies.append((model, '__'.join(lookup), set([part])))
+                break
+
+            if getattr(field, 'many_to_many', False):
+                forward = not getattr(field, 'auto_created', False)
+                if forward:
+                    through = (getattr(field, 'remote_field', None) or field.rel).through
+                else:
+                    through = field.through
+                through_models.append((through, '__'.join(lookup), part, forward))
+            elif getattr(field, 'concrete', True):  # a foreign key, e.g. moving a line to another order
+                dependencies.append((model, '__'.join(lookup), set([part])))
+
+            lookup.append(part)
+            model = related
+        else:
+            dependencies.append((model, '__'.join(lookup), None))
+    return dependencies, through_models
+
+
+def _get_dependencies():
+    global _dependencies, _through_models
+    with _registry_lock:
+        if _dependencies is None:
+            dependencies, through_models = {}, {}
+            for prop, owner in _registry:
+                prop_dependencies, prop_through_models = _resolve(prop, owner)
+                for model, lookup, fields in prop_dependencies:
+                    dependencies.setdefault(model, []).append((prop, owner, lookup, fields))
+                for through, lookup, name, forward in prop_through_models:
+                    through_models.setdefault(through, []).append((prop, owner, lookup, name, forward))
+            _through_models = through_models
+            _dependencies = dependencies
+    return _dependencies, _through_models
+
+
+def _get_owner_pks(owner, lookup, pks, using):
+    if lookup is None:
+        return None
+    if lookup == '':
+        return pks
+    manager = owner._default_manager.db_manager(using)
+    return manager.filter(**{lookup + '__in': pks}).values_list('pk', flat=True).distinct()
+
+
+def _collect(sender, pks, using, update_fields=None, related_only=False):
+    """
+    Schedules the invalidation of the values depending on the instances of
+    ``sender`` with ``pks``.
+    """
+    dependencies = _get_dependencies()[0]
+    entries = dependencies.get(sender, [])
+    concrete_model = getattr(sender._meta, 'concrete_model', sender)
+    if concrete_model is not sender:  # proxy models
+        entries = entries + dependencies.get(concrete_model, [])
+
+    tags = {}
+    for prop, owner, lookup, fields in entries:
+        if fields is not None and update_fields is not None and fields.isdisjoint(update_fields):
+            continue
+        if related_only and not lookup:
+            continue
+        owner_pks = _get_owner_pks(owner, lookup, pks, using)
+        tags.setdefault(prop._get_tags_alias(), set()).update(prop._get_owner_tags(owner_pks))
+    if tags:
+        _schedule(tags, using)
+
+
+def _schedule(tags, using):
+    """
+    Invalidates ``tags`` (a dict mapping cache aliases to sets of tags) once
+    the current transaction of the ``using`` database is committed. The
+    invalidations of a transaction are coalesced into a single
+    ``invalidate_tags`` call per cache.
+    """
+    pending = getattr(_local, 'pending', None)
+    if pending is None:
+        pending = _local.pending = {}
+    for alias, alias_tags in tags.items():
+        pending.setdefault(using, {}).setdefault(alias, set()).update(alias_tags)
+
+    on_commit = getattr(transaction, 'on_commit', None)
+    if on_commit is None:  # Django < 1.9
+        _flush(using)
+    else:
+        # the first callback run flushes all the pending invalidations (the
+        # ones of rolled back transactions included), the others are no-ops
+        on_commit(lambda: _flush(using), using=using)
+
+
+def _flush(using):
+    tags = getattr(_local, 'pending', {}).pop(using, None)
+    for alias, alias_tags in (tags or {}).items():
+        invalidate_tags(*alias_tags, using=alias)
+
+
+def _pre_save(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    # the values depending on the former relations of the instance
+    if not raw and instance.pk is not None and not instance._state.adding:
+        _collect(sender, [instance.pk], using, update_fields, related_only=True)
+
+
+def _post_save(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    if not raw:
+        _collect(sender, [instance.pk], using, update_fields)
+
+
+def _pre_delete(sender, instance, using=None, **kwargs):
+    _collect(sender, [instance.pk], using)
+
+
+def _m2m_changed(sender, instance, action, reverse=False, pk_set=None, using=None, **kwargs):
+    # the relations must still exist when they're cleared from the related
+    # side, for the owners to be found through them
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    tags = {}
+    for prop, owner, lookup, name, forward in _get_dependencies()[1].get(sender, ()):
+        if reverse != forward:  # the instance is the one the relation is followed from
+            pks = [instance.pk]
+        elif pk_set is None:
+            pks = [instance.pk]
+            lookup = '__'.join(filter(None, [lookup, name]))
+        else:
+            pks = list(pk_set)
+        owner_pks = _get_owner_pks(owner, lookup, pks, using)
+        tags.setdefault(prop._get_tags_alias(), set()).update(prop._get_owner_tags(owner_pks))
+    if tags:
+        _schedule(tags, using)
@@ -0,0 +1,402 @@
+from __future__ import unicode_literals
+import datetime
+import decimal
+import hashlib
+import re
+from string import Formatter
+import uuid
+from django.db.models import Model
+from cached_result.compat import binary_type, force_bytes, integer_types, string_types, text_type
+
+try:
+    from _string import formatter_field_name_split
+except ImportError:  # Python 2
+    formatter_field_name_split = str._formatter_field_name_split
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+__all__ = ['UnsavedInstanceError', 'serialize_args', 'hash_args', 'compile_key_template', 'get_hash_algorithm',
+           'make_hashable', 'make_memoization_key', 'get_code_version']
+
+
+class UnsavedInstanceError(TypeError):
+    """
+    Raised when building a key from a model instance without pk.
+    """
+
+
+if hasattr(hashlib, 'blake2b'):
+    def _digest(data):
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+else:  # Python < 3.6
+    def _digest(data):
+        return hashlib.md5(data).hexdigest()
+
+
+def _serialize_text(value, parts):
+    parts.append('s%d:' % len(value))
+    parts.append(value)
+
+
+def _serialize_bytes(value, parts):
+    parts.append('b%d:' % len(value))
+    parts.append(value.decode('latin-1'))
+
+
+def _serialize_sequence(tag):
+    def serialize(value, parts):
+        parts.append('%s%d(' % (tag, len(value)))
+        for item in value:
+            _serialize(item, parts)
+        parts.append(')')
+    return serialize
+
+
+def _serialize_dict(value, parts):
+    parts.append('d%d{' % len(value))
+    for item in sorted(_serialize_to_text(k) + _serialize_to_text(v) for k, v in value.items()):
+        parts.append(item)
+    parts.append('}')
+
+
+def _serialize_set(value, parts):
+    parts.append('e%d{' % len(value))
+    for item in sorted(_serialize_to_text(v) for v in value):
+        parts.append(item)
+    parts.append('}')
+
+
+def _serialize_model(value, parts):
+    if value.pk is None:
+        raise UnsavedInstanceError('Unsaved %r has no pk to build a cache key from' % value)
+    opts = value._meta
+    parts.append('m%s.%s:' % (opts.app_label, opts.object_name.lower()))
+    _serialize(value.pk, parts)
+
+
+def _serialize_repr(tag):
+    def serialize(value, parts):
+        value = repr(value)
+        parts.append('%s%d:' % (tag, len(value)))
+        parts.append(value)
+    return serialize
+
+
+def _serialize_cache_key(value, parts):
+    cls = value.__class__
+    parts.append('k%s.%s:' % (cls.__module__, cls.__name__))
+    _serialize(value.__cache_key__(), parts)
+
+
+def _serialize_isoformat(value, parts):
+    value = '%s:%s' % (value.__class__.__name__, value.isoformat())
+    parts.append('o%d:' % len(value))
+    parts.append(value)
+
+
+_SERIALIZERS = {
+    type(None): lambda value, parts: parts.append('N'),
+    bool: lambda value, parts: parts.append('T' if value else 'F'),
+    float: _serialize_repr('f'),
+    complex: _serialize_repr('c'),
+    decimal.Decimal: _serialize_repr('D'),
+    uuid.UUID: lambda value, parts: parts.append('u%s' % value.hex),
+    datetime.datetime: _serialize_isoformat,
+    datetime.date: _serialize_isoformat,
+    datetime.time: _serialize_isoformat,
+    datetime.timedelta: _serialize_repr('o'),
+    text_type: _serialize_text,
+    binary_type: _serialize_bytes,
+    tuple: _serialize_sequence('t'),
+    list: _serialize_sequence('l'),
+    dict: _serialize_dict,
+    set: _serialize_set,
+    frozenset: _serialize_set,
+}
+for _type in integer_types:
+    _SERIALIZERS[_type] = _serialize_repr('i')
+
+
+def _serialize(value, parts):
+    serializer = _SERIALIZERS.get(type(value))
+    if serializer is None:
+        serializer = _get_serializer(value)
+    serializer(value, parts)
+
+
+def _get_serializer(value):
+    if isinstance(value, Model):
+        return _serialize_model
+
+    for base in type(value).__mro__[1:]:
+        if base in _SERIALIZERS and base is not object:
+            return _SERIALIZERS[base]
+
+    if hasattr(value, '__cache_key__'):
+        return _serialize_cache_key
+
+    raise TypeError('Can\'t build a cache key from %r; define its __cache_key__ method or use the key or '
+                    'id argument' % value)
+
+
+def _serialize_to_text(value):
+    parts = []
+    _serialize(value, parts)
+    return ''.join(parts)
+
+
+def serialize_args(args, kwargs):
+    """
+    Returns a canonical text representation of positional and keyword
+    arguments: equal arguments give equal representations, whatever the
+    keyword arguments order, while values of different types never collide
+    (e.g. ``1``, ``'1'``, ``1.0`` and ``True``).
+
+    Model instances are represented by their model and pk, and instances of
+    classes defining a ``__cache_key__`` method by their class and what it
+    returns (which is serialized in turn). Representations (``repr``) of
+    other objects are never relied on, since they often don't identify them.
+
+    :raises TypeError: If an argument has no canonical representation
+        (:class:`UnsavedInstanceError` for unsaved model instances).
+    """
+    parts = []
+    _serialize(tuple(args), parts)
+    if kwargs:
+        _serialize(kwargs, parts)
+    return ''.join(parts)
+
+
+def hash_args(args, kwargs):
+    """
+    Returns a short hexadecimal digest of :func:`serialize_args`.
+    """
+    return _digest(force_bytes(serialize_args(args, kwargs)))
+
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _field_expression(field_name, index):
+    """
+    Returns the Python expression getting the value of a replacement field
+    (e.g. ``'0._name'`` or ``'user[id]'``) from ``args`` and ``kwargs``.
+    """
+    first, rest = formatter_field_name_split(field_name)
+    if first == '':
+        first = index
+
+    if isinstance(first, integer_types):
+        expression = 'args[%d]' % first
+    else:
+        expression = 'kwargs[%r]' % first
+
+    for is_attr, name in rest:
+        if not is_attr:
+            expression = '%s[%r]' % (expression, name)
+        elif _IDENTIFIER.match(name):
+            expression = '%s.%s' % (expression, name)
+        else:
+            expression = 'getattr(%s, %r)' % (expression, name)
+    return expression
+
+
+_CONVERSIONS = {
+    'r': 'repr',
+    's': 'text_type',
+}
+
+
+def compile_key_template(template):
+    """
+    Parses a format string key template once and returns the fastest callable
+    building the key from the call arguments, equivalent to
+    ``template.format(*args, **kwargs)``.
+
+    ``str.format`` itself is the fastest for plain fields (e.g. ``'bar_{0}'``),
+    but templates with attribute or item lookups are compiled to a dedicated
+    function, e.g. ``lambda *args, **kwargs: 'bar_' + format(args[0].id, '')``
+    for ``'bar_{0.id}'``, which is about 30% faster.
+    """
+    template = text_type(template)
+    parts = []
+    index = 0
+    has_lookups = False
+    has_fields = False
+    try:
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            if literal:
+                parts.append(repr(literal))
+            if field_name is None:
+                continue
+            first, rest = formatter_field_name_split(field_name)
+            has_fields = True
+            has_lookups = has_lookups or any(True for _ in rest)
+            if '{' in format_spec or (conversion and conversion not in _CONVERSIONS):
+                raise ValueError('Unsupported replacement field')
+            if first == '':
+                if index is None:
+                    raise ValueError('Mixed automatic and manual field numbering')
+                expression = _field_expression(field_name, index)
+                index += 1
+            else:
+                if index:
+                    raise ValueError('Mixed automatic and manual field numbering')
+                expression = _field_expression(field_name, None)
+                index = None
+            if conversion:
+                expression = '%s(%s)' % (_CONVERSIONS[conversion], expression)
+            parts.append('format(%s, %r)' % (expression, format_spec))
+    except ValueError:
+        # leave the edge cases (and their errors) to str.format
+        return template.format
+
+    if not has_fields:
+        key = template.format()
+        return lambda *args, **kwargs: key
+
+    if not has_lookups:
+        return template.format
+
+    source = 'lambda *args, **kwargs: %s' % (' + '.join(parts) or repr(''))
+    return eval(source, {'format': format, 'getattr': getattr, 'repr': repr, 'text_type': text_type})
+
+
+def _blake2b(data):
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def _xxhash(data):
+    return xxhash.xxh3_128(data) if hasattr(xxhash, 'xxh3_128') else xxhash.xxh64(data)
+
+
+def get_hash_algorithm(hash_algorithm):
+    """
+    Returns the hash function for ``hash_algorithm``, which can be a callable
+    (e.g. ``hashlib.md5``), ``None`` or the name of an algorithm:
+    ``'blake2b'`` (128 bits), ``'xxhash'`` (requires the xxhash package) or
+    any name supported by :func:`hashlib.new`.
+    """
+    if hash_algorithm is None or callable(hash_algorithm):
+        return hash_algorithm
+    if not isinstance(hash_algorithm, string_types):
+        raise TypeError('%s hash algorithms are invalid' % hash_algorithm.__class__.__name__)
+
+    if hash_algorithm == 'blake2b' and hasattr(hashlib, 'blake2b'):
+        return _blake2b
+    if hash_algorithm == 'xxhash':
+        if xxhash is None:
+            raise ValueError('The xxhash hash algorithm requires the xxhash package')
+        return _xxhash
+    try:
+        hashlib.new(hash_algorithm)
+    except ValueError:
+        raise ValueError('%r is not a valid hash algorithm' % hash_algorithm)
+    return lambda data: hashlib.new(hash_algorithm, data)
+
+
+_KWD_MARK = (object(),)
+_UNHASHABLE_MARK = (object(),)
+_FAST_TYPES = frozenset(integer_types + (text_type,))
+
+
+def make_hashable(value):
+    """
+    Returns a hashable equivalent of ``value``: lists and tuples become
+    tuples, dicts and sets become frozensets (recursively); containers of
+    different types remain distinct.
+
+    :raises TypeError: If ``value`` contains another unhashable object.
+    """
+    if isinstance(value, (list, tuple)):
+        return (value.__class__,) + tuple(make_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return value.__class__, frozenset((make_hashable(k), make_hashable(v)) for k, v in value.items())
+    if isinstance(value, (set, frozenset)):
+        return value.__class__, frozenset(make_hashable(item) for item in value)
+    hash(value)
+    return value
+
+
+def make_memoization_key(args, kwargs):
+    """
+    Returns a hashable key for a call with ``args`` and ``kwargs`` the same
+    way :func:`functools.lru_cache` does: equal arguments give equal keys
+    (so ``f(1)`` and ``f(1.0)`` share one), whatever the keyword arguments
+    order. Unhashable arguments (lists, dicts, sets) are converted with
+    :func:`make_hashable`.
+    """
+    key = args
+    if kwargs:
+        key += _KWD_MARK
+        for item in sorted(kwargs.items()):
+            key += item
+    elif len(key) == 1 and type(key[0]) in _FAST_TYPES:
+        return key[0]
+
+    try:
+        hash(key)
+    except TypeError:
+        return _UNHASHABLE_MARK + make_hashable(key)
+    return key
+
+
+def _update_code_hash(code, hasher, doc=None):
+    hasher.update(code.co_code)
+    hasher.update(force_bytes(' '.join(code.co_names)))
+    for const in code.co_consts:
+        if const is None or (doc is not None and const == doc):  # the docstring (or its None slot)
+            continue
+        if hasattr(const, 'co_code'):  # nested functions, lambdas, comprehensions
+            _update_code_hash(const, hasher)
+        else:
+            hasher.update(force_bytes(_stable_repr(const)))
+
+
+def _stable_repr(value):
+    """
+    Returns the repr of ``value``, but the same in every process: the items
+    of sets are sorted (their order depends on the hash seed), and objects
+    without a repr of their own are represented by their class (rather than
+    their address).
+    """
+    if isinstance(value, (set, frozenset)):
+        return '%s({%s})' % (value.__class__.__name__, ', '.join(sorted(_stable_repr(item) for item in value)))
+    if isinstance(value, (list, tuple)):
+        return '%s(%s)' % (value.__class__.__name__, ', '.join(_stable_repr(item) for item in value))
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join('%s: %s' % (_stable_repr(k), _stable_repr(v)) for k, v in value.items())
+    if type(value).__repr__ is object.__repr__:
+        return '<%s.%s>' % (value.__class__.__module__, value.__class__.__name__)
+    return repr(value)
+
+
+def get_code_version(fn):
+    """
+    Returns a short hash of the bytecode, constants, names and default
+    argument values used by ``fn`` (and the functions defined within it),
+    which changes when its code does (as well as with the Python version),
+    but not when only its docstring, comments or position in the file do,
+    nor from a process to another. Wrappers exposing the
+    wrapped function as ``__wrapped__`` are looked through.
+
+    :raises ValueError: If ``fn`` isn't a Python function.
+    """
+    while hasattr(fn, '__wrapped__'):
+        fn = fn.__wrapped__
+    code = getattr(fn, '__code__', None)
+    if code is None:
+        raise ValueError('Cannot derive a version from %r' % (fn,))
+    hasher = hashlib.md5()
+    _update_code_hash(code, hasher, fn.__doc__)
+    defaults = getattr(fn, '__defaults__', None)
+    if defaults:
+        hasher.update(force_bytes(_stable_repr(defaults)))
+    kwdefaults = getattr(fn, '__kwdefaults__', None)
+    if kwdefaults:
+        hasher.update(force_bytes(_stable_repr(sorted(kwdefaults.items()))))
+    return hasher.hexdigest()[:8]
@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+import threading
+import uuid
+
+try:
+    from threading import get_ident
+except ImportError:  # Python 2
+    from thread import get_ident
+
+
+__all__ = ['CacheLock', 'SingleFlight']
+
+
+class CacheLock(object):
+    """
+    A short-lived distributed lock built on the atomic ``cache.add``.
+
+    The lock expires by itself after ``timeout`` seconds, so a crashed
+    holder can't block the others forever.
+    """
+
+    def __init__(self, backend, key, timeout):
+        self.backend = backend
+        self.key = '%s:lock' % key
+        self.timeout = timeout
+        self._token = None
+
+    def acquire(self):
+        """
+        Tries to acquire the lock without blocking.
+
+        :returns: Whether the lock has been acquired.
+        """
+        token = self._new_token()
+        if self.backend.add(self.key, token, timeout=self.timeout):
+            self._token = token
+            return True
+        return False
+
+    def release(self):
+        """
+        Releases the lock if it's still held by this instance.
+        """
+        if self._token is not None:
+            if self.backend.get(self.key) == self._token:
+                self.backend.delete(self.key)
+            self._token = None
+
+    def _new_token(self):
+        return uuid.uuid4().hex
+
+
+class _Flight(object):
+    __slots__ = ('done', 'value', 'exception', 'thread')
+
+    def __init__(self):
+        # a lock held until the value is computed, only created if another
+        # caller waits for it (under the lock of the shard)
+        self.done = None
+        self.value = None
+        self.exception = None
+        self.thread = get_ident()
+
+
+class SingleFlight(object):
+    """
+    Collapses concurrent in-process calls for the same key onto a single
+    computation: the first caller computes the value while the others wait
+    for it and get the same result (or exception).
+
+    The flights are spread over ``shards`` dicts, each with its own lock,
+    so that calls for different keys hardly ever contend. A recursive call
+    for the key being computed by the same thread computes it again rather
+    than waiting for itself.
+    """
+
+    def __init__(self, shards=16):
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Returns ``fn(*args, **kwargs)``, sharing the result with all the
+        concurrent callers for ``key``.
+        """
+        lock, flights = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            flight = flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = flights[key] = _Flight()
+            elif flight.thread == get_ident():  # a recursive call
+                flight = None
+            elif flight.done is None:
+                flight.done = threading.Lock()
+                flight.done.acquire()
+
+        if flight is None:
+            return fn(*args, **kwargs)
+
+        if not leader:
+            with flight.done:  # released by the leader
+                pass
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.value
+
+        try:
+            flight.value = fn(*args, **kwargs)
+        except Exception as e:
+            flight.exception = e
+            raise
+        finally:
+            with lock:
+                del flights[key]
+            if flight.done is not None:
+                flight.done.release()
+
+        return flight.value
@@ -0,0 +1,76 @@
+from __future__ import unicode_literals
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from cached_result.invalidation import get_model
+from cached_result.registry import get_cached_function
+from cached_result.warming import warm
+
+try:
+    from django.utils.module_loading import import_string
+except ImportError:  # Django < 1.7
+    from django.utils.module_loading import import_by_path as import_string
+
+
+OPTIONS = (
+    (('--args',), dict(
+        dest='args_path',
+        help='Dotted path to an iterable of argument tuples, or to a callable returning one')),
+    (('--queryset',), dict(
+        dest='queryset',
+        help='app_label.Model whose instances are passed as the first argument (for methods and properties)')),
+    (('--workers',), dict(dest='workers', type=int, default=1, help='Number of parallel workers')),
+    (('--processes',), dict(
+        dest='processes', action='store_true', default=False, help='Use processes instead of threads')),
+    (('--chunk-size',), dict(
+        dest='chunk_size', type=int, default=100, help='Number of results stored per set_many')),
+    (('--rate',), dict(dest='rate', type=float, help='Maximum number of results computed per second')),
+    (('--force',), dict(
+        dest='force', action='store_true', default=False, help='Recompute the results already cached')),
+)
+
+
+def _make_option(flags, kwargs):
+    if 'type' in kwargs:  # optparse expects the name of the type
+        kwargs = dict(kwargs, type=kwargs['type'].__name__)
+    return make_option(*flags, **kwargs)
+
+
+class Command(BaseCommand):
+    help = 'Precomputes the cached results of a function, e.g. after a deploy or a cache flush.'
+    args = '<dotted.path.to.function>'
+
+    if hasattr(BaseCommand, 'option_list'):  # Django < 1.8
+        option_list = BaseCommand.option_list + tuple(_make_option(flags, kwargs) for flags, kwargs in OPTIONS)
+
+    def add_arguments(self, parser):
+        parser.add_argument('function')
+        for flags, kwargs in OPTIONS:
+            parser.add_argument(*flags, **kwargs)
+
+    def handle(self, *args, **options):
+        name = options.get('function') or (args[0] if args else None)
+        if not name:
+            raise CommandError('The dotted path of the function is required')
+        try:
+            cached_function = get_cached_function(name)
+        except KeyError:
+            raise CommandError('%s is not a cached function' % name)
+
+        if bool(options['args_path']) == bool(options['queryset']):
+            raise CommandError('Either --args or --queryset is required')
+        if options['args_path']:
+            args_list = import_string(options['args_path'])
+            if callable(args_list):
+                args_list = args_list()
+        else:
+            try:
+                model = get_model(*options['queryset'].split('.', 1))
+            except (LookupError, TypeError):
+                model = None
+            if model is None:
+                raise CommandError('Unknown model %s' % options['queryset'])
+            args_list = model._default_manager.all()
+
+        count = warm(cached_function, args_list, workers=options['workers'], processes=options['processes'],
+                     chunk_size=options['chunk_size'], rate=options['rate'], force=options['force'])
+        self.stdout.write('%d result(s) of %s computed\n' % (count, name))
@@ -0,0 +1,297 @@
+from __future__ import unicode_literals
+import pickle
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from cached_result.utils import MISSING, now
+
+
+__all__ = ['BaseMemoStore', 'LRUMemoStore', 'LFUMemoStore', 'get_memo_store']
+
+
+class BaseMemoStore(object):
+    """
+    Base class for the in-process stores used by :class:`CachedFunction`
+    to memoize results.
+
+    A store keeps at most ``maxsize`` entries and ``max_bytes`` bytes of
+    values (``None`` means unbounded), and expires every entry ``timeout``
+    seconds after it was set (``None`` means never). Subclasses decide which
+    entry is evicted when the store is full.
+
+    The size of the values is estimated by ``sizeof`` (their pickled size by
+    default), only when ``max_bytes`` is given; values larger than the
+    whole budget aren't stored at all.
+
+    Stores are shared by threads: writes are serialized by ``self._lock``,
+    while reads of the built-in stores take no lock on their fast path.
+    """
+
+    #: The tags invalidation generation of the stored values, kept up to
+    #: date by the tagged functions (see :func:`~cached_result.tags.get_generation`).
+    generation = None
+
+    def __init__(self, maxsize=None, timeout=None, max_bytes=None, sizeof=None):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError('maxsize must be a positive integer or None')
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError('max_bytes must be a positive integer or None')
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or get_pickled_size
+        self.size = 0  # bytes of values stored, when max_bytes is given
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored for ``key`` or ``default`` if there is no
+        such entry or it has expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, timeout=MISSING):
+        """
+        Stores ``value`` for ``key``, evicting another entry if the store is
+        full. ``timeout`` overrides the store's default timeout.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Deletes the entry for ``key`` (if any).
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Deletes all entries.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get(key, MISSING) is not MISSING
+
+    def _get_expires(self, timeout):
+        if timeout is MISSING:
+            timeout = self.timeout
+        if timeout is None:
+            return None
+        return now() + timeout
+
+    def _is_full(self, size):
+        """
+        Returns whether an entry must be evicted to store a value of ``size``
+        bytes.
+        """
+        if self.maxsize is not None and len(self) >= self.maxsize:
+            return True
+        return self.max_bytes is not None and self.size + size > self.max_bytes
+
+
+class LRUMemoStore(BaseMemoStore):
+    """
+    Evicts the least recently used entry when full.
+    """
+
+    def __init__(self, maxsize=None, timeout=None, max_bytes=None, sizeof=None):
+        super(LRUMemoStore, self).__init__(maxsize=maxsize, timeout=timeout, max_bytes=max_bytes, sizeof=sizeof)
+        self._data = OrderedDict()  # key -> (value, expires, size)
+
+    def get(self, key, default=None):
+        # lock-free: single dict operations are atomic, and an entry
+        # evicted meanwhile is just not moved
+        try:
+            value, expires, _ = self._data[key]
+        except KeyError:
+            return default
+        if expires is not None and expires <= now():
+            self.delete(key)
+            return default
+        if self.maxsize is not None or self.max_bytes is not None:
+            self._move_to_end(key)
+        return value
+
+    if hasattr(OrderedDict, 'move_to_end'):
+        def _move_to_end(self, key):
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                pass
+    else:  # Python 2
+        def _move_to_end(self, key):
+            with self._lock:
+                entry = self._data.pop(key, None)
+                if entry is not None:
+                    self._data[key] = entry
+
+    def set(self, key, value, timeout=MISSING):
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:  # never admitted
+                self.delete(key)
+                return
+        entry = (value, self._get_expires(timeout), size)
+        with self._lock:
+            self._pop(key)
+            while self._data and self._is_full(size):
+                try:
+                    _, (_, _, evicted_size) = self._data.popitem(last=False)
+                except KeyError:  # emptied meanwhile
+                    break
+                self.size -= evicted_size
+            self._data[key] = entry
+            self.size += size
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LFUMemoStore(BaseMemoStore):
+    """
+    Evicts the least frequently used entry when full; ties are broken by
+    evicting the least recently used one. All operations are O(1); reads
+    take the lock to update the frequencies.
+    """
+
+    def __init__(self, maxsize=None, timeout=None, max_bytes=None, sizeof=None):
+        super(LFUMemoStore, self).__init__(maxsize=maxsize, timeout=timeout, max_bytes=max_bytes, sizeof=sizeof)
+        self._data = {}  # key -> [value, expires, frequency, size]
+        self._frequencies = defaultdict(OrderedDict)  # frequency -> keys
+        self._min_frequency = 0
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[1] is not None and entry[1] <= now():
+            self.delete(key)
+            return default
+        with self._lock:
+            if self._data.get(key) is entry:  # not evicted meanwhile
+                self._touch(key, entry)
+        return entry[0]
+
+    def set(self, key, value, timeout=MISSING):
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:  # never admitted
+                self.delete(key)
+                return
+        expires = self._get_expires(timeout)
+        with self._lock:
+            entry = self._data.get(key)
+            frequency = 1
+            if entry is not None:  # setting counts as a use
+                frequency = entry[2] + 1
+                self._pop(key)
+            while self._data and self._is_full(size):
+                self._evict()
+            self._data[key] = [value, expires, frequency, size]
+            self._frequencies[frequency][key] = None
+            self.size += size
+            if not self._min_frequency or frequency < self._min_frequency:
+                self._min_frequency = frequency
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._frequencies.clear()
+            self._min_frequency = 0
+            self.size = 0
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._remove_from_bucket(key, entry[2])
+            self.size -= entry[3]
+
+    def __len__(self):
+        return len(self._data)
+
+    def _touch(self, key, entry):
+        frequency = entry[2]
+        self._remove_from_bucket(key, frequency)
+        if frequency == self._min_frequency and frequency not in self._frequencies:
+            self._min_frequency = frequency + 1
+        entry[2] = frequency + 1
+        self._frequencies[frequency + 1][key] = None
+
+    def _remove_from_bucket(self, key, frequency):
+        bucket = self._frequencies[frequency]
+        bucket.pop(key, None)
+        if not bucket:
+            del self._frequencies[frequency]
+
+    def _evict(self):
+        if self._min_frequency not in self._frequencies:
+            self._min_frequency = min(self._frequencies)
+        key, _ = self._frequencies[self._min_frequency].popitem(last=False)
+        if not self._frequencies[self._min_frequency]:
+            del self._frequencies[self._min_frequency]
+        self.size -= self._data.pop(key)[3]
+
+
+MEMO_STORES = {
+    'lru': LRUMemoStore,
+    'lfu': LFUMemoStore,
+}
+
+
+def get_pickled_size(value):
+    """
+    Returns the size of ``value`` once pickled, or its shallow size if it
+    can't be pickled.
+    """
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def get_memo_store(memo_store=None, maxsize=None, timeout=None, max_bytes=None):
+    """
+    Returns a memo store instance built from ``memo_store``, which can be:
+
+    - ``None``: An :class:`LRUMemoStore`.
+    - A string: The name of a built-in store (``'lru'`` or ``'lfu'``).
+    - A :class:`BaseMemoStore` subclass: It's instantiated with ``maxsize``,
+      ``timeout`` and ``max_bytes``.
+    - A :class:`BaseMemoStore` instance: It's returned as is.
+    """
+    if memo_store is None:
+        memo_store = LRUMemoStore
+    elif isinstance(memo_store, BaseMemoStore):
+        return memo_store
+    elif not isinstance(memo_store, type):
+        try:
+            memo_store = MEMO_STORES[memo_store]
+        except (KeyError, TypeError):
+            raise ValueError('%r is not a valid memo store' % (memo_store,))
+
+    if max_bytes is not None:
+        return memo_store(maxsize=maxsize, timeout=timeout, max_bytes=max_bytes)
+    return memo_store(maxsize=maxsize, timeout=timeout)
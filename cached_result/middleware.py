@@ -0,0 +1,22 @@
+from __future__ import unicode_literals
+from cached_result.context import set_request_cache
+
+try:
+    from django.utils.deprecation import MiddlewareMixin
+except ImportError:  # Django < 1.10
+    MiddlewareMixin = object
+
+
+class RequestCacheMiddleware(MiddlewareMixin):
+    """
+    Activates a request-scoped cache which :class:`CachedFunction` checks
+    before Django's cache, so that repeated calls within a request cost a
+    dict lookup. The cache is discarded at the end of the request.
+    """
+
+    def process_request(self, request):
+        set_request_cache({})
+
+    def process_response(self, request, response):
+        set_request_cache(None)
+        return response
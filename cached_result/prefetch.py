@@ -0,0 +1,34 @@
+from __future__ import unicode_literals
+from cached_result.decorators.cached_function import CachedFunction
+
+
+__all__ = ['prefetch_cached']
+
+
+def prefetch_cached(objs, *names):
+    """
+    Fetches the cached values of the properties (or methods without
+    arguments) ``names`` for all of ``objs`` (e.g. a queryset or a list
+    about to be rendered) with a single ``get_many`` per property, like
+    ``prefetch_related`` does for relations::
+
+        orders = prefetch_cached(Order.objects.filter(customer=customer), 'total', 'title')
+
+    See :meth:`CachedFunction.prefetch`.
+
+    :returns: The list of ``objs``.
+    :raises ValueError: If a name isn't a cached property or method of one
+        of the objects.
+    """
+    objs = list(objs)
+    by_class = {}
+    for obj in objs:
+        by_class.setdefault(obj.__class__, []).append(obj)
+
+    for cls, cls_objs in by_class.items():
+        for name in names:
+            cached_function = getattr(cls, name, None)
+            if not isinstance(cached_function, CachedFunction):
+                raise ValueError('%s.%s is not a cached property or method' % (cls.__name__, name))
+            cached_function.prefetch(cls_objs)
+    return objs
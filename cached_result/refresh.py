@@ -0,0 +1,195 @@
+from __future__ import unicode_literals
+import heapq
+import itertools
+import logging
+import os
+import threading
+from django.conf import settings
+from cached_result.utils import now
+
+try:
+    import asyncio
+except ImportError:  # Python 2
+    asyncio = None
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Python 2 without the ``futures`` backport
+    ThreadPoolExecutor = None
+
+
+__all__ = ['submit', 'Refresher', 'Scheduler', 'get_scheduler']
+
+logger = logging.getLogger('cached_result')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = getattr(settings, 'CACHED_RESULT_REFRESH_WORKERS', 4)
+                _executor = ThreadPoolExecutor(max_workers=max_workers)
+    return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Runs ``fn(*args, **kwargs)`` in the background refresh thread pool (or in
+    a new daemon thread when ``concurrent.futures`` isn't available).
+    """
+    if ThreadPoolExecutor is not None:
+        _get_executor().submit(fn, *args, **kwargs)
+    else:
+        thread = threading.Thread(target=fn, args=args, kwargs=kwargs)
+        thread.daemon = True
+        thread.start()
+
+
+class Refresher(object):
+    """
+    Schedules background refreshes, making sure that at most one refresh per
+    key is pending within the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def refresh(self, key, fn, *args, **kwargs):
+        """
+        Schedules ``fn(*args, **kwargs)`` unless a refresh for ``key`` is
+        already pending.
+
+        :returns: Whether the refresh has been scheduled.
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+
+        def run():
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                logger.exception('Background refresh of %s failed', key)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        submit(run)
+        return True
+
+
+class _Entry(object):
+    __slots__ = ('cached_function', 'key', 'args', 'kwargs', 'loop', 'accessed')
+
+    def __init__(self, cached_function, key, args, kwargs, loop):
+        self.cached_function = cached_function
+        self.key = key
+        self.args = args
+        self.kwargs = kwargs
+        self.loop = loop
+        self.accessed = now()
+
+
+class Scheduler(object):
+    """
+    Recomputes the results of the functions with ``refresh_every`` in the
+    background, from a daemon thread (started on first use, again in forked
+    processes): each result accessed is refreshed every ``refresh_every``
+    seconds until it hasn't been accessed for ``refresh_idle`` seconds.
+
+    Refreshes run in the refresh thread pool, or as tasks of the event loop
+    of the last access for coroutine functions.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._entries = {}
+        self._heap = []  # (due time, sequence number, entry key)
+        self._sequence = itertools.count()
+        self._pid = None
+
+    def touch(self, cached_function, key, args, kwargs, loop=None):
+        """
+        Records an access to the result of ``cached_function`` for ``key``
+        (and the call arguments), scheduling its refreshes if needed.
+        """
+        entry_key = (cached_function.name, key)
+        # entries inherited from the parent of a forked process aren't run
+        if self._pid == os.getpid():
+            entry = self._entries.get(entry_key)
+            if entry is not None:  # lock-free fast path
+                entry.accessed = now()
+                entry.loop = loop
+                return
+
+        with self._condition:
+            if self._pid != os.getpid():
+                self._start()
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                entry = self._entries[entry_key] = _Entry(cached_function, key, args, kwargs, loop)
+                due = entry.accessed + cached_function._refresh_every
+                heapq.heappush(self._heap, (due, next(self._sequence), entry_key))
+                self._condition.notify()
+            else:
+                entry.accessed = now()
+
+    def clear(self):
+        """
+        Drops all the scheduled refreshes.
+        """
+        with self._condition:
+            self._entries.clear()
+            del self._heap[:]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _start(self):
+        self._pid = os.getpid()
+        del self._heap[:]  # a forked process has no thread to run them
+        self._entries.clear()
+        thread = threading.Thread(target=self._run, name='cached_result.refresh')
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > now():
+                    self._condition.wait(self._heap[0][0] - now() if self._heap else None)
+                due, _, entry_key = heapq.heappop(self._heap)
+                entry = self._entries.get(entry_key)
+                if entry is None:
+                    continue
+                cached_function = entry.cached_function
+                if now() - entry.accessed > cached_function._refresh_idle:
+                    del self._entries[entry_key]
+                    continue
+                # from the due time rather than now, so that it doesn't drift
+                due = max(due + cached_function._refresh_every, now())
+                heapq.heappush(self._heap, (due, next(self._sequence), entry_key))
+
+            if entry.loop is not None:
+                if entry.loop.is_running():
+                    asyncio.run_coroutine_threadsafe(
+                        cached_function._arefresh_scheduled(entry.key, entry.args, entry.kwargs), entry.loop)
+            else:
+                cached_function._refresher.refresh(entry.key, cached_function._refresh_scheduled,
+                                                   entry.key, entry.args, entry.kwargs)
+
+
+_scheduler = Scheduler()
+
+
+def get_scheduler():
+    """
+    Returns the :class:`Scheduler` of the process.
+    """
+    return _scheduler
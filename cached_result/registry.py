@@ -0,0 +1,61 @@
+from __future__ import unicode_literals
+import threading
+import weakref
+from importlib import import_module
+
+
+__all__ = ['register', 'get_cached_functions', 'get_cached_function']
+
+
+_registry = weakref.WeakSet()
+_lock = threading.Lock()
+
+
+def get_name(fn):
+    """
+    Returns the dotted path of ``fn``, e.g. ``'myapp.models.Order.total'``.
+    """
+    return '%s.%s' % (fn.__module__, getattr(fn, '__qualname__', fn.__name__))
+
+
+def register(cached_function):
+    """
+    Adds ``cached_function`` to the registry; it's removed when it's garbage
+    collected.
+    """
+    with _lock:
+        _registry.add(cached_function)
+
+
+def get_cached_functions():
+    """
+    Returns the list of all the (unbound) :class:`CachedFunction` instances,
+    sorted by name.
+    """
+    with _lock:
+        cached_functions = list(_registry)
+    return sorted(cached_functions, key=lambda cached_function: cached_function.name)
+
+
+def get_cached_function(name):
+    """
+    Returns the :class:`CachedFunction` named ``name`` (see :func:`get_name`),
+    importing its module if needed.
+
+    :raises KeyError: If there's no such function.
+    """
+    for cached_function in get_cached_functions():
+        if cached_function.name == name:
+            return cached_function
+
+    parts = name.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        try:
+            import_module('.'.join(parts[:i]))
+        except ImportError:
+            continue
+        for cached_function in get_cached_functions():
+            if cached_function.name == name:
+                return cached_function
+        break
+    raise KeyError(name)
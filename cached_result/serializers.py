@@ -0,0 +1,195 @@
+from __future__ import unicode_literals
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from cached_result.compat import string_types
+
+try:
+    import cPickle as pickle
+except ImportError:  # Python 3
+    import pickle
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+__all__ = ['Codec', 'get_codec']
+
+
+class PickleSerializer(object):
+    """
+    Pickles values with the highest protocol available (5 on Python 3.8+,
+    which handles large buffers more efficiently).
+    """
+    id = 1
+
+    def dumps(self, value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class JSONSerializer(object):
+    """
+    Encodes values as compact JSON; dates, decimals, etc. are encoded the way
+    :class:`~django.core.serializers.json.DjangoJSONEncoder` does and come
+    back as strings, and tuples come back as lists.
+    """
+    id = 2
+
+    def dumps(self, value):
+        return json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8'))
+
+
+class MsgpackSerializer(object):
+    """
+    Encodes values with MessagePack (requires the msgpack package); tuples
+    come back as lists.
+    """
+    id = 3
+
+    def dumps(self, value):
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+class ZlibCompressor(object):
+    id = 1
+
+    def compress(self, data):
+        return zlib.compress(data)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+
+class LZ4Compressor(object):
+    """
+    Requires the lz4 package; much faster than zlib, compresses a bit less.
+    """
+    id = 2
+
+    def compress(self, data):
+        return lz4.compress(data)
+
+    def decompress(self, data):
+        return lz4.decompress(data)
+
+
+class ZstdCompressor(object):
+    """
+    Requires the zstandard package; about as fast as lz4, compresses better
+    than zlib.
+    """
+    id = 3
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor().compress(data)
+
+    def decompress(self, data):
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+SERIALIZERS = {
+    'pickle': (PickleSerializer, None),
+    'json': (JSONSerializer, None),
+    'msgpack': (MsgpackSerializer, 'msgpack' if msgpack is None else None),
+}
+
+COMPRESSORS = {
+    'zlib': (ZlibCompressor, None),
+    'lz4': (LZ4Compressor, 'lz4' if lz4 is None else None),
+    'zstd': (ZstdCompressor, 'zstandard' if zstandard is None else None),
+}
+
+
+def _get(registry, kind, name):
+    try:
+        cls, missing_package = registry[name]
+    except (KeyError, TypeError):
+        raise ValueError('%r is not a valid %s' % (name, kind))
+    if missing_package:
+        raise ValueError('The %s %s requires the %s package' % (name, kind, missing_package))
+    return cls()
+
+
+_serializers_by_id = dict((cls.id, cls()) for cls, _ in SERIALIZERS.values())
+_compressors_by_id = dict((cls.id, cls()) for cls, _ in COMPRESSORS.values())
+
+
+class Codec(object):
+    """
+    Encodes values to bytes with a serializer, compressing the ones larger
+    than ``threshold`` bytes (when it makes them smaller).
+
+    The encoded values start with a header byte recording the serializer
+    (high nibble) and the compressor (low nibble, 0 if none) used, so that
+    they can be decoded whatever the current settings.
+    """
+
+    def __init__(self, serializer='pickle', compression=None, threshold=1024):
+        if isinstance(serializer, string_types):
+            serializer = _get(SERIALIZERS, 'serializer', serializer)
+        self.serializer = serializer
+        self.compressor = _get(COMPRESSORS, 'compression', compression) if compression else None
+        self.threshold = threshold
+        _serializers_by_id.setdefault(serializer.id, serializer)
+
+    def dumps(self, value):
+        data = self.serializer.dumps(value)
+        compressor_id = 0
+        if self.compressor is not None and len(data) >= self.threshold:
+            compressed = self.compressor.compress(data)
+            if len(compressed) < len(data):
+                data, compressor_id = compressed, self.compressor.id
+        return bytes(bytearray([self.serializer.id << 4 | compressor_id])) + data
+
+    def loads(self, data):
+        """
+        Decodes ``data``.
+
+        :raises ValueError: If it's not valid.
+        """
+        header = bytearray(data[:1])
+        if not header:
+            raise ValueError('Empty payload')
+        try:
+            serializer = _serializers_by_id[header[0] >> 4]
+            data = data[1:]
+            if header[0] & 0x0f:
+                data = _compressors_by_id[header[0] & 0x0f].decompress(data)
+            return serializer.loads(data)
+        except Exception as e:
+            raise ValueError('Invalid payload: %s' % e)
+
+
+def get_codec(serializer=None, compression=None, threshold=1024):
+    """
+    Returns the :class:`Codec` for the given options, or ``None`` if values
+    are stored as is (left to the cache backend to pickle).
+
+    :param serializer: ``'pickle'``, ``'json'``, ``'msgpack'`` or an object
+        with ``dumps``/``loads`` methods and a unique ``id`` (from 8 to 15).
+    :param compression: ``'zlib'``, ``'lz4'``, ``'zstd'`` or ``None``.
+    """
+    if serializer is None and compression is None:
+        return None
+    return Codec(serializer or 'pickle', compression, threshold)
@@ -0,0 +1,17 @@
+from __future__ import unicode_literals
+from django.dispatch import Signal
+
+
+__all__ = ['cache_hit', 'cache_miss', 'cache_set']
+
+#: Sent when a result is found; the sender is the :class:`CachedFunction`,
+#: the arguments are ``key`` (the cache key, ``None`` for memo hits without
+#: cache) and ``source`` (``'memo'``, ``'request'`` or ``'cache'``).
+cache_hit = Signal()
+
+#: Sent when a result has to be computed; the arguments are ``key``.
+cache_miss = Signal()
+
+#: Sent when a result is stored in the cache; the arguments are ``key``,
+#: ``timeout`` and ``duration`` (the computation time, in seconds).
+cache_set = Signal()
@@ -0,0 +1,114 @@
+from __future__ import unicode_literals
+import pickle
+import random
+from django.conf import settings
+from cached_result.compat import binary_type
+from cached_result.registry import get_cached_functions
+
+
+__all__ = ['Stats', 'stats', 'reset_stats']
+
+
+class Stats(object):
+    """
+    The counters of a :class:`CachedFunction` (shared with its bound
+    wrappers). They're updated without locking, so they may miss a few
+    concurrent updates.
+
+    Counts and computation times are always recorded. Backend latencies and
+    value sizes are only measured for a sample of the calls, with the
+    probability ``settings.CACHED_RESULT_STATS_SAMPLE_RATE`` (0.01 by
+    default); sizes are free (thus always measured) for serialized values.
+    The values larger than ``max_size`` are counted by outcome.
+    """
+
+    __slots__ = ('memo_hits', 'request_hits', 'hits', 'misses', 'sets', 'computes', 'compute_time',
+                 'backend_time', 'backend_samples', 'size', 'size_samples', 'oversize_skipped',
+                 'oversize_chunked', 'oversize_compressed', 'sample_rate')
+
+    def __init__(self):
+        self.sample_rate = None  # read on first use, settings may not be configured yet
+        self.reset()
+
+    def reset(self):
+        self.memo_hits = 0
+        self.request_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.computes = 0
+        self.compute_time = 0.0
+        self.backend_time = 0.0
+        self.backend_samples = 0
+        self.size = 0
+        self.size_samples = 0
+        self.oversize_skipped = 0
+        self.oversize_chunked = 0
+        self.oversize_compressed = 0
+
+    def sample(self):
+        """
+        Returns whether the current call should be measured.
+        """
+        if self.sample_rate is None:
+            self.sample_rate = getattr(settings, 'CACHED_RESULT_STATS_SAMPLE_RATE', 0.01)
+        return self.sample_rate and random.random() < self.sample_rate
+
+    def add_compute_time(self, duration, count=1):
+        self.compute_time += duration
+        self.computes += count
+
+    def add_backend_time(self, duration):
+        self.backend_time += duration
+        self.backend_samples += 1
+
+    def add_size(self, stored):
+        """
+        Records the size of ``stored`` (as pickled by the backend, unless
+        it's already serialized) if it's free or the call is sampled.
+        """
+        if isinstance(stored, binary_type):
+            size = len(stored)
+        elif self.sample():
+            size = len(pickle.dumps(stored, pickle.HIGHEST_PROTOCOL))
+        else:
+            return
+        self.size += size
+        self.size_samples += 1
+
+    def as_dict(self):
+        found = self.memo_hits + self.request_hits + self.hits
+        calls = found + self.misses
+        return {
+            'memo_hits': self.memo_hits,
+            'request_hits': self.request_hits,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': float(found) / calls if calls else None,
+            'sets': self.sets,
+            'computes': self.computes,
+            'compute_time': self.compute_time,
+            'avg_compute_time': self.compute_time / self.computes if self.computes else None,
+            'avg_backend_time': self.backend_time / self.backend_samples if self.backend_samples else None,
+            'avg_size': float(self.size) / self.size_samples if self.size_samples else None,
+            'oversize_skipped': self.oversize_skipped,
+            'oversize_chunked': self.oversize_chunked,
+            'oversize_compressed': self.oversize_compressed,
+        }
+
+
+def stats():
+    """
+    Returns the counters of every :class:`CachedFunction`, as a dict mapping
+    their names to dicts of their counters (see :meth:`Stats.as_dict`), e.g.
+    to find the ones which are never hit.
+    """
+    return dict((cached_function.name, cached_function.stats()) for cached_function in get_cached_functions())
+
+
+def reset_stats():
+    """
+    Resets the counters of every :class:`CachedFunction`.
+    """
+    for cached_function in get_cached_functions():
+        cached_function.reset_stats()
@@ -0,0 +1,94 @@
+from __future__ import unicode_literals
+import uuid
+from cached_result.backends import get_cache
+from cached_result.context import get_request_cache
+
+
+__all__ = ['invalidate_tags', 'get_tag_key', 'get_tag_versions']
+
+#: Prefix of the cache keys holding the current version of each tag.
+TAG_KEY_PREFIX = 'cached_result.tag.'
+
+# Bumped on every invalidation, so that memoized results of tagged
+# functions are dropped within this process.
+_generation = 0
+
+
+def get_tag_key(tag):
+    """
+    Returns the cache key holding the current version of ``tag``.
+    """
+    return TAG_KEY_PREFIX + tag
+
+
+def get_generation():
+    """
+    Returns the number of invalidations made by this process.
+    """
+    return _generation
+
+
+def new_version():
+    # Random rather than incremented, so that a version evicted from the
+    # cache can never come back and validate old values.
+    return uuid.uuid4().hex
+
+
+def get_all_tag_keys(tag_keys_list):
+    """
+    Returns the list of the distinct keys of ``tag_keys_list``, an iterable
+    of lists of tag keys.
+    """
+    return list(set(key for tag_keys in tag_keys_list for key in tag_keys))
+
+
+def group_tag_versions(tag_keys_list, versions):
+    """
+    Returns the tuple of the ``versions`` (a dict) of the tag keys of every
+    item of ``tag_keys_list``.
+    """
+    return [tuple(versions[key] for key in tag_keys) for tag_keys in tag_keys_list]
+
+
+def get_tag_versions(backend, tag_keys, versions=None):
+    """
+    Returns a dict of the current versions of ``tag_keys`` (which are looked
+    up in ``backend`` unless ``versions`` already holds them), creating the
+    missing ones.
+    """
+    if versions is None:
+        versions = backend.get_many(tag_keys)
+    versions = dict((key, versions[key]) for key in tag_keys if key in versions)
+    for key in tag_keys:
+        if key not in versions:
+            version = new_version()
+            if not backend.add(key, version, timeout=None):
+                version = backend.get(key)
+            versions[key] = version
+    return versions
+
+
+def invalidate_tags(*tags, **kwargs):
+    """
+    Invalidates all the cached results of the functions (and properties)
+    tagged with any of ``tags``, whatever their arguments, by giving these
+    tags new versions: it's a single ``set_many``, without any key scan.
+
+    Memoized results of tagged functions are dropped within the current
+    process only, as well as the request-scoped cache.
+
+    :param using: The alias of the cache holding the tag versions, i.e. the
+        one of the tagged functions (the shared tier for tiered ones);
+        defaults to ``'default'``.
+    """
+    global _generation
+    using = kwargs.pop('using', None) or 'default'
+    if kwargs:
+        raise TypeError('Unexpected keyword arguments: %s' % ', '.join(kwargs))
+
+    get_cache(using).set_many(dict((get_tag_key(tag), new_version()) for tag in tags), timeout=None)
+    _generation += 1
+
+    request_cache = get_request_cache()
+    if request_cache is not None:
+        request_cache.clear()
@@ -0,0 +1,154 @@
+from __future__ import unicode_literals
+import asyncio
+from time import sleep
+from django.core.cache import cache
+from django.test import TestCase
+from cached_result.decorators import cached_function
+
+
+class AsyncCachedFunctionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_coroutine_function(self):
+        from cached_result.decorators.async_cached_function import AsyncCachedFunction
+
+        hits = []
+
+        @cached_function(id='{0}')
+        async def func(value):
+            hits.append(1)
+            return value * 2
+
+        self.assertIsInstance(func, AsyncCachedFunction)
+
+        self.assertEqual(self.run_async(func(1)), 2)
+        self.assertEqual(self.run_async(func(1)), 2)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(cache.get(func.get_cache_key(1)), 2)
+
+        self.run_async(func.delete_cache(1))
+        self.assertIsNone(cache.get(func.get_cache_key(1)))
+        self.assertEqual(self.run_async(func(1)), 2)
+        self.assertEqual(len(hits), 2)
+
+        self.assertEqual(self.run_async(func.reset_cache(1)), 2)
+        self.assertEqual(len(hits), 3)
+
+        self.assertEqual(self.run_async(func.map([1, 2, 3])), [2, 4, 6])
+        self.assertEqual(len(hits), 5)
+
+    def test_lock_stale(self):
+        hits = []
+
+        @cached_function(lock='stale', timeout=0.1)  # 100 ms
+        async def func(value):
+            hits.append(1)
+            return value * len(hits)
+
+        self.assertEqual(self.run_async(func(1)), 1)
+        sleep(0.15)
+
+        key = func.get_cache_key(1)
+        cache.add('%s:lock' % key, 'another-worker')
+        self.assertEqual(self.run_async(func(1)), 1)
+
+        # the stale value isn't memoized
+        cache.delete('%s:lock' % key)
+        self.assertEqual(self.run_async(func(1)), 2)
+        self.assertEqual(len(hits), 2)
+
+    def test_warm(self):
+        from cached_result.warming import warm
+
+        hits = []
+
+        @cached_function(timeout=60, memoize=False)
+        async def func(value):
+            hits.append(value)
+            return value * 2
+
+        self.assertEqual(self.run_async(func.warm([(1,), (2,)])), 2)
+        self.assertEqual(self.run_async(func.warm([(1,), (2,)])), 0)
+        self.assertEqual(cache.get(func.get_cache_key(2)), 4)
+
+        self.assertEqual(warm(func, range(4)), 2)
+        self.assertEqual(warm(func, range(4), workers=2, chunk_size=2, force=True), 4)
+        self.assertEqual(sorted(hits), [0, 0, 1, 1, 2, 2, 3, 3])
+
+    def test_concurrent_awaits(self):
+        hits = []
+
+        class A(object):
+            @cached_function(id='{1}', memoize=False)
+            async def double(self, value):
+                hits.append(1)
+                await asyncio.sleep(0.05)
+                return value * 2
+
+        a = A()
+
+        async def gather():
+            return await asyncio.gather(*[a.double(1) for _ in range(5)] + [a.double(2)])
+
+        self.assertEqual(self.run_async(gather()), [2] * 5 + [4])
+        self.assertEqual(len(hits), 2)
+
+    def test_exceptions(self):
+        hits = []
+
+        @cached_function(memoize=False, cache_exceptions=KeyError)
+        async def func():
+            hits.append(1)
+            await asyncio.sleep(0.01)
+            raise KeyError('foo')
+
+        async def gather():
+            return await asyncio.gather(func(), func(), return_exceptions=True)
+
+        results = self.run_async(gather())
+        self.assertTrue(all(isinstance(result, KeyError) for result in results))
+        self.assertRaises(KeyError, self.run_async, func())
+        self.assertEqual(len(hits), 1)
+
+    def test_tags(self):
+        from cached_result.tags import invalidate_tags
+
+        hits = []
+
+        @cached_function(memoize=False, tags=['user:{0}'])
+        async def func(value):
+            hits.append(1)
+            return value * 2
+
+        self.assertEqual(self.run_async(func(1)), 2)
+        self.assertEqual(self.run_async(func(1)), 2)
+        self.assertEqual(len(hits), 1)
+
+        invalidate_tags('user:1')
+        self.assertEqual(self.run_async(func.map([1, 2])), [2, 4])
+        self.assertEqual(self.run_async(func.map([1, 2])), [2, 4])
+        self.assertEqual(len(hits), 3)
+
+    def test_refresh_every(self):
+        from cached_result.refresh import get_scheduler
+        self.addCleanup(get_scheduler().clear)
+        hits = []
+
+        @cached_function(timeout=10, refresh_every=0.05, memoize=False)
+        async def func():
+            hits.append(1)
+            return len(hits)
+
+        async def run():
+            await func()
+            for _ in range(100):
+                if len(hits) >= 3:
+                    break
+                await asyncio.sleep(0.01)
+            return await func()
+
+        self.assertGreaterEqual(self.run_async(run()), 3)
@@ -0,0 +1,90 @@
+from __future__ import unicode_literals
+from time import sleep
+from django.test import TestCase
+from cached_result.backends import TieredCache, get_cache
+from cached_result.decorators import cached_function
+
+
+class TieredCacheTestCase(TestCase):
+    def setUp(self):
+        self.local = get_cache('default')
+        self.shared = get_cache('other')
+        self.local.clear()
+        self.shared.clear()
+
+    def test_read_through(self):
+        tiered = TieredCache.from_tiers([('default', 10), 'other'])
+
+        self.shared.set('a', 1)
+        self.assertEqual(tiered.get('a'), 1)
+        self.assertEqual(self.local.get('a'), 1)  # copied into the local tier
+        self.assertIsNone(tiered.get('b'))
+
+        self.shared.set_many({'b': 2, 'c': 3})
+        self.assertEqual(tiered.get_many(['a', 'b', 'c', 'd']), {'a': 1, 'b': 2, 'c': 3})
+        self.assertEqual(self.local.get_many(['b', 'c']), {'b': 2, 'c': 3})
+
+    def test_write_all(self):
+        tiered = TieredCache.from_tiers([('default', 10), 'other'])
+
+        tiered.set('a', 1, timeout=60)
+        self.assertEqual((self.local.get('a'), self.shared.get('a')), (1, 1))
+        # the local copy expires after 10 seconds only
+        self.assertLess(self.local._expire_info[self.local.make_key('a')],
+                        self.shared._expire_info[self.shared.make_key('a')])
+
+        tiered.delete('a')
+        self.assertEqual((self.local.get('a'), self.shared.get('a')), (None, None))
+
+        self.assertTrue(tiered.add('lock', 1))
+        self.assertFalse(tiered.add('lock', 1))
+        self.assertIsNone(self.local.get('lock'))
+
+    def test_cached_function(self):
+        hits = []
+
+        @cached_function(memoize=False, using='other')
+        def other(value):
+            hits.append(1)
+            return value
+
+        self.assertEqual(other(1), 1)
+        self.assertEqual(other(1), 1)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(self.shared.get(other.get_cache_key(1)), 1)
+        self.assertIsNone(self.local.get(other.get_cache_key(1)))
+
+        @cached_function(memoize=False, timeout=60, tiers=['default', 'other'])
+        def tiered(value):
+            hits.append(1)
+            return value
+
+        self.assertEqual(tiered(1), 1)
+        key = tiered.get_cache_key(1)
+        self.assertEqual((self.local.get(key), self.shared.get(key)), (1, 1))
+        self.local.delete(key)
+        self.assertEqual(tiered(1), 1)
+        self.assertEqual(len(hits), 2)
+        self.assertEqual(self.local.get(key), 1)
+
+        self.assertRaises(ValueError, cached_function(using='other', tiers=['default']), lambda: None)
+
+    def test_promotion_timeout(self):
+        tiered = TieredCache.from_tiers(['default', 'other'])
+        self.shared.set('a', 1)
+        self.assertEqual(tiered.get_many(['a']), {'a': 1})
+        self.assertIsNone(self.local.get('a'))  # never copied without a timeout
+
+        hits = []
+
+        @cached_function(memoize=False, timeout=0.2, tiers=['default', 'other'])
+        def func():
+            hits.append(1)
+            return len(hits)
+
+        self.assertEqual(func(), 1)
+        self.local.delete(func.get_cache_key())
+        self.assertEqual(func(), 1)  # copied into the local tier
+        self.assertEqual(self.local.get(func.get_cache_key()), 1)
+        sleep(0.25)
+        self.assertEqual(func(), 2)
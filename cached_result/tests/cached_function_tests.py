@@ -1,8 +1,15 @@
 from __future__ import unicode_literals
+import copy
+import gc
+import threading
+import weakref
+import time
 from time import sleep
 from django.test import TestCase
 from django.core.cache import cache
 from cached_result.decorators import cached_function
+from cached_result.envelope import Envelope
+from cached_result.signals import cache_set
 
 
 class CachedFunctionTestCase(TestCase):
@@ -175,4 +182,471 @@ class CachedFunctionTestCase(TestCase):
         a.name.reset_cache()
 
         self.assertEqual(a.name(), 'Wade')
-        self.assertEqual(a.hits_count, 2)
\ No newline at end of file
+        self.assertEqual(a.hits_count, 2)
+
+    def test_maxsize(self):
+        hits = []
+
+        @cached_function(cache=False, maxsize=2)
+        def func(value):
+            hits.append(1)
+            return value * 2
+
+        func(1)
+        func(2)
+        func(3)  # evicts func(1)
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(len(func._cached_results), 2)
+
+        func(3)
+        self.assertEqual(len(hits), 3)
+
+        func(1)
+        self.assertEqual(len(hits), 4)
+
+    def test_memoization_timeout(self):
+        hits = []
+
+        @cached_function(cache=False, timeout=0.1)  # 100 ms
+        def func(value):
+            hits.append(1)
+            return value * 2
+
+        func(1)
+        func(1)
+        self.assertEqual(len(hits), 1)
+
+        sleep(0.15)
+
+        func(1)
+        self.assertEqual(len(hits), 2)
+
+    def test_lock_wait(self):
+        hits = []
+
+        @cached_function(lock='wait', memoize=False)
+        def func(value):
+            hits.append(1)
+            return value * 2
+
+        key = func.get_cache_key(1)
+        cache.add('%s:lock' % key, 'another-worker')
+
+        def fill():
+            sleep(0.1)
+            cache.set(key, 42)
+
+        thread = threading.Thread(target=fill)
+        thread.start()
+        self.assertEqual(func(1), 42)
+        thread.join()
+        self.assertEqual(len(hits), 0)
+
+    def test_lock_timeout(self):
+        hits = []
+
+        @cached_function(lock=True, lock_timeout=0.1, memoize=False)
+        def func(value):
+            hits.append(1)
+            return value * 2
+
+        cache.add('%s:lock' % func.get_cache_key(1), 'dead-worker')
+
+        self.assertEqual(func(1), 2)
+        self.assertEqual(len(hits), 1)
+
+    def test_lock_stale(self):
+        hits = []
+
+        @cached_function(lock='stale', timeout=0.1, memoize=False)  # 100 ms
+        def func(value):
+            hits.append(1)
+            return value * len(hits)
+
+        self.assertEqual(func(1), 1)
+
+        sleep(0.15)
+
+        key = func.get_cache_key(1)
+        cache.add('%s:lock' % key, 'another-worker')
+
+        self.assertEqual(func(1), 1)
+        self.assertEqual(len(hits), 1)
+
+        cache.delete('%s:lock' % key)
+        self.assertEqual(func(1), 2)
+        self.assertEqual(len(hits), 2)
+
+    def test_lock_stale_memoized(self):
+        hits = []
+
+        @cached_function(lock='stale', timeout=0.1)  # 100 ms
+        def func(value):
+            hits.append(1)
+            return value * len(hits)
+
+        self.assertEqual(func(1), 1)
+        sleep(0.15)
+
+        key = func.get_cache_key(1)
+        cache.add('%s:lock' % key, 'another-worker')
+        self.assertEqual(func(1), 1)
+
+        # the stale value isn't memoized
+        cache.delete('%s:lock' % key)
+        self.assertEqual(func(1), 2)
+        self.assertEqual(len(hits), 2)
+
+    def test_lock_single_flight(self):
+        hits = []
+        results = []
+
+        @cached_function(lock=True, memoize=False)
+        def func(value):
+            hits.append(1)
+            sleep(0.1)
+            return value * 2
+
+        threads = [threading.Thread(target=lambda: results.append(func(1))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [2] * 5)
+        self.assertEqual(len(hits), 1)
+
+    def _wait_for(self, condition, timeout=1):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            sleep(0.01)
+
+    def test_stale_ttl(self):
+        hits = []
+
+        @cached_function(timeout=0.1, stale_ttl=10, memoize=False)  # 100 ms
+        def func(value):
+            hits.append(1)
+            return value * len(hits)
+
+        self.assertEqual(func(1), 1)
+
+        sleep(0.15)
+
+        # the stale value is returned while it's recomputed in the background
+        self.assertEqual(func(1), 1)
+        self._wait_for(lambda: len(hits) == 2)
+        self.assertEqual(len(hits), 2)
+        self._wait_for(lambda: func(1) == 2)
+        self.assertEqual(func(1), 2)
+        self.assertEqual(len(hits), 2)
+
+    def test_early_recompute(self):
+        hits = []
+
+        @cached_function(timeout=60, early_recompute=True, memoize=False)
+        def func(value):
+            hits.append(1)
+            return value * 2
+
+        self.assertEqual(func(1), 2)
+        self.assertEqual(func(1), 2)
+        self.assertEqual(len(hits), 1)
+
+        # about to expire and very expensive to compute
+        cache.set(func.get_cache_key(1), Envelope(-1, time.time() + 1, delta=1e6))
+
+        self.assertEqual(func(1), -1)
+        self._wait_for(lambda: len(hits) == 2)
+        self.assertEqual(len(hits), 2)
+        self._wait_for(lambda: func(1) == 2)
+        self.assertEqual(func(1), 2)
+
+    def test_stale_ttl_requires_timeout(self):
+        self.assertRaises(ValueError, cached_function(stale_ttl=10), lambda: None)
+        self.assertRaises(ValueError, cached_function(early_recompute=True), lambda: None)
+        self.assertRaises(ValueError, cached_function(jitter='10%'), lambda: None)
+
+    def test_version(self):
+        def func(x):
+            return x
+
+        plain = cached_function(func)
+        versioned = cached_function(version=2)(func)
+        derived = cached_function(version=True)(func)
+        self.assertEqual(len({plain.get_cache_key(1), versioned.get_cache_key(1), derived.get_cache_key(1)}), 3)
+        self.assertEqual(cached_function(version=True)(func).get_cache_key(1), derived.get_cache_key(1))
+
+        template = cached_function(key='item_{0}', version='2', hash_algorithm=None)(func)
+        self.assertEqual(template.get_cache_key(1), 'item_1@2')
+        callable_key = cached_function(key=lambda x: 'item_%s' % x, version=3, hash_algorithm=None)(func)
+        self.assertEqual(callable_key.get_cache_key(1), 'item_1@3')
+        generated = cached_function(version='{x}', hash_algorithm=None)(lambda: 1)
+        self.assertTrue(generated.get_cache_key().endswith('@{x}'))
+
+    def _record_timeouts(self, fn):
+        timeouts = []
+
+        def receiver(sender, key, timeout, **kwargs):
+            timeouts.append(timeout)
+
+        cache_set.connect(receiver, sender=fn)
+        self.addCleanup(cache_set.disconnect, receiver, sender=fn)
+        return timeouts
+
+    def test_jitter(self):
+        @cached_function(timeout=100, memoize=False, jitter='10%')
+        def func(x):
+            return x
+
+        timeouts = self._record_timeouts(func)
+        for x in range(20):
+            func(x)
+        func.reset_cache(0)
+        self.assertTrue(all(100 <= timeout < 110 for timeout in timeouts))
+        self.assertEqual(timeouts[-1], timeouts[0])  # the same for the same key
+        self.assertGreater(len(set(timeouts)), 10)
+
+        @cached_function(timeout=100, memoize=False, jitter=5)
+        def func(x):
+            return x
+
+        timeouts = self._record_timeouts(func)
+        func.many([(x,) for x in range(20)])
+        self.assertTrue(all(100 <= timeout < 105 for timeout in timeouts))
+
+    def test_max_timeout(self):
+        @cached_function(timeout=10, memoize=False, max_timeout=100)
+        def func():
+            sleep(0.1)
+
+        timeouts = self._record_timeouts(func)
+        func()
+        for _ in range(9):
+            func()
+        func.reset_cache()
+        self.assertEqual(timeouts[0], 10)
+        self.assertTrue(18 <= timeouts[1] < 25)  # 10 * (1 + 9 hits * 0.1 s)
+
+        for _ in range(100):
+            func()
+        func.reset_cache()
+        func.reset_cache()
+        self.assertEqual(timeouts[2:], [100, 10])
+
+    def test_none_result(self):
+        hits = []
+
+        @cached_function(memoize=False)
+        def func(value):
+            hits.append(1)
+            return None
+
+        self.assertIsNone(func(1))
+        self.assertIsNone(func(1))
+        self.assertEqual(len(hits), 1)
+
+        func.delete_cache(1)
+        self.assertIsNone(func(1))
+        self.assertEqual(len(hits), 2)
+
+        @cached_function
+        def memoized(value):
+            return None
+
+        memoized(1)
+        memoized._cached_results.clear()
+        self.assertIsNone(memoized(1))  # memoized from the cache
+        self.assertIsNone(memoized(1))
+
+    def test_cache_exceptions(self):
+        hits = []
+
+        @cached_function(id='{0}', cache_exceptions=KeyError, exception_timeout=0.1)  # 100 ms
+        def func(value):
+            hits.append(1)
+            if value < 0:
+                raise KeyError(value)
+            if value == 0:
+                raise ValueError(value)
+            return value * 2
+
+        self.assertRaises(KeyError, func, -1)
+        self.assertRaises(KeyError, func, -1)
+        self.assertEqual(len(hits), 1)
+
+        # from the cache this time
+        func._cached_results.clear()
+        self.assertRaises(KeyError, func, -1)
+        self.assertEqual(len(hits), 1)
+
+        # other exceptions aren't cached
+        self.assertRaises(ValueError, func, 0)
+        self.assertRaises(ValueError, func, 0)
+        self.assertEqual(len(hits), 3)
+
+        sleep(0.15)
+
+        self.assertRaises(KeyError, func, -1)
+        self.assertEqual(len(hits), 4)
+
+    def test_many(self):
+        hits = []
+
+        @cached_function(id='{0}')
+        def func(value):
+            hits.append(value)
+            return value * 2
+
+        self.assertEqual(func(2), 4)
+        self.assertEqual(func.many([(1,), (2,), (3,), (1,)]), [2, 4, 6, 2])
+        self.assertEqual(sorted(hits), [1, 2, 3])
+
+        # everything has been cached and memoized
+        self.assertEqual(cache.get(func.get_cache_key(3)), 6)
+        self.assertEqual(func.map([1, 2, 3]), [2, 4, 6])
+        func._cached_results.clear()
+        self.assertEqual(func.map([3, 2, 1]), [6, 4, 2])
+        self.assertEqual(sorted(hits), [1, 2, 3])
+
+    def test_many_batch_fn(self):
+        batches = []
+
+        def batch(args_list):
+            batches.append(args_list)
+            return [value * 2 for value, in args_list]
+
+        class A(object):
+            @cached_function(id='{1}', batch_fn=lambda self, args_list: batch(args_list))
+            def double(self, value):
+                raise AssertionError('batch_fn should be used')
+
+        a = A()
+        self.assertEqual(a.double.map([1, 2]), [2, 4])
+        self.assertEqual(a.double.map([1, 2, 3, 4]), [2, 4, 6, 8])
+        self.assertEqual(batches, [[(1,), (2,)], [(3,), (4,)]])
+
+    def test_args_hashing(self):
+        hits = []
+
+        @cached_function(memoize=False)
+        def func(value, factor=2):
+            hits.append(1)
+            return value * factor
+
+        self.assertEqual(func(1), 2)
+        self.assertEqual(func(2), 4)
+        self.assertEqual(func(2, factor=3), 6)
+        self.assertEqual(len(hits), 3)
+
+        self.assertEqual(func(1), 2)
+        self.assertEqual(func(2, factor=3), 6)
+        self.assertEqual(len(hits), 3)
+
+        class A(object):
+            def __init__(self, name):
+                self.name = name
+
+            @cached_function(memoize=False)
+            def greet(self, greeting):
+                return '%s, %s' % (greeting, self.name)
+
+        # the bound object isn't part of the key
+        self.assertEqual(A('Wade').greet.get_cache_key('Hi'), A('Vadym').greet.get_cache_key('Hi'))
+        self.assertNotEqual(A('Wade').greet.get_cache_key('Hi'), A('Wade').greet.get_cache_key('Hello'))
+
+    def test_key_cache(self):
+        @cached_function(key='func-{0}', key_cache=10, hash_algorithm='blake2b')
+        def func(value):
+            return value * 2
+
+        key = func.get_cache_key(1)
+        self.assertEqual(len(func._key_cache), 1)
+        self.assertEqual(func.get_cache_key(1), key)
+        self.assertNotEqual(func.get_cache_key(True), key)
+        self.assertEqual(len(func._key_cache), 2)
+
+        # not plain values
+        func.get_cache_key((1,))
+        self.assertEqual(len(func._key_cache), 2)
+
+    def test_memoization_key(self):
+        hits = []
+
+        @cached_function(cache=False)
+        def func(values, **kwargs):
+            hits.append(1)
+            return sum(values)
+
+        self.assertEqual(func([1, 2], x=1, y=2), 3)
+        self.assertEqual(func([1, 2], y=2, x=1), 3)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(func([1, 3]), 4)
+        self.assertEqual(len(hits), 2)
+
+        class Named(object):
+            def __init__(self, name):
+                self.name = name
+
+            def __repr__(self):
+                return '<Named>'  # used to make the memoization keys collide
+
+            @cached_function(cache=False)
+            def upper(self):
+                return self.name.upper()
+
+        self.assertEqual(Named('foo').upper(), 'FOO')
+        self.assertEqual(Named('bar').upper(), 'BAR')
+
+        @cached_function(cache=False, memoization_key=lambda values: len(values))
+        def by_length(values):
+            hits.append(1)
+            return len(values)
+
+        self.assertEqual(by_length([1, 2]), 2)
+        self.assertEqual(by_length([3, 4]), 2)
+        self.assertEqual(len(hits), 3)
+
+    def test_per_instance_memo(self):
+        class A(object):
+            def __init__(self, value):
+                self.value = value
+                self.hits_count = 0
+
+            @cached_function(cache=False)
+            def double(self, x=1):
+                self.hits_count += 1
+                return self.value * 2 * x
+
+        a, b = A(1), A(2)
+        self.assertIs(a.double, a.double)  # the bound wrapper is reused
+        self.assertIsNot(a.double._cached_results, b.double._cached_results)
+
+        self.assertEqual(a.double(), 2)
+        self.assertEqual(a.double(), 2)
+        self.assertEqual(b.double(), 4)
+        self.assertEqual((a.hits_count, b.hits_count), (1, 1))
+        self.assertEqual(len(A.double._cached_results), 0)
+
+        # the class-level API reaches the instance's memo
+        self.assertEqual(A.double(a, 3), 6)
+        self.assertEqual(a.double(3), 6)
+        self.assertEqual(a.hits_count, 2)
+        A.double.delete_cache(a, 3)
+        self.assertEqual(a.double(3), 6)
+        self.assertEqual(a.hits_count, 3)
+
+        # copies don't share the memo with the original
+        c = copy.copy(a)
+        c.value = 5
+        self.assertEqual(c.double(), 10)
+        self.assertEqual(a.double(), 2)
+        self.assertEqual(copy.deepcopy(a).double(), 2)
+
+        # the memoized results are freed with the instance, without the
+        # cyclic GC
+        ref = weakref.ref(a)
+        gc.disable()
+        self.addCleanup(gc.enable)
+        del a, c
+        self.assertIsNone(ref())
@@ -1,6 +1,10 @@
 from __future__ import unicode_literals
+import gc
+import weakref
+from django.core.cache import cache
 from django.test import TestCase
 from cached_result.decorators import cached_property
+from cached_result.tests.models import Customer
 
 
 class CachedFunctionTest(TestCase):
@@ -71,4 +75,45 @@ class CachedFunctionTest(TestCase):
         def del_read_only():
             del obj.read_only
 
-        self.assertRaises(AttributeError, del_read_only)
\ No newline at end of file
+        self.assertRaises(AttributeError, del_read_only)
+
+    def test_per_instance_memo(self):
+        class A(object):
+            hits_count = 0
+
+            def __init__(self, value):
+                self.value = value
+
+            @cached_property(cache=False)
+            def double(self):
+                A.hits_count += 1
+                return self.value * 2
+
+        a, b = A(1), A(2)
+        self.assertEqual((a.double, b.double), (2, 4))
+        self.assertEqual((a.double, b.double), (2, 4))
+        self.assertEqual(A.hits_count, 2)
+
+        A.double.delete_cache(a)
+        self.assertEqual((a.double, b.double), (2, 4))
+        self.assertEqual(A.hits_count, 3)
+
+        # the memoized results are freed with the instance, without the
+        # cyclic GC
+        ref = weakref.ref(a)
+        gc.disable()
+        self.addCleanup(gc.enable)
+        del a
+        self.assertIsNone(ref())
+
+    def test_unsaved_instance(self):
+        cache.clear()
+        customer = Customer(name='Wade Wilson')
+        self.assertEqual(customer.initials, 'WW')  # computed without caching
+        self.assertEqual(Customer.initials.reset_cache(customer), 'WW')
+        Customer.initials.delete_cache(customer)
+        self.assertEqual(Customer.initials.prefetch([customer]), 0)
+
+        customer.save()
+        self.assertEqual(Customer.objects.get(pk=customer.pk).initials, 'WW')
+        self.assertEqual(cache.get(Customer.initials.get_cache_key(customer)), 'WW')
@@ -0,0 +1,83 @@
+from __future__ import unicode_literals
+from django.core.cache import cache
+from django.db.models.signals import post_init
+from django.test import TestCase
+from cached_result.decorators import ModelRows, cached_queryset
+from cached_result.tests.models import Customer, Order, Product
+
+
+@cached_queryset(timeout=60)
+def get_orders(customer_id):
+    return Order.objects.filter(customer_id=customer_id).order_by('id')
+
+
+@cached_queryset(timeout=60, as_rows=True, memoize=False)
+def get_products():
+    return Product.objects.order_by('price')
+
+
+@cached_queryset(fields=['status'], memoize=False)
+def get_statuses():
+    return Order.objects
+
+
+class CachedQuerySetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(name='Wade')
+        self.orders = [Order.objects.create(customer=self.customer, status=status) for status in ('new', 'paid')]
+        get_orders.delete_cache(self.customer.pk)
+
+    def test_instances(self):
+        with self.assertNumQueries(1):
+            orders = get_orders(self.customer.pk)
+        self.assertIsInstance(orders, ModelRows)
+        self.assertEqual(list(orders), self.orders)
+        self.assertEqual(orders[1].status, 'paid')
+        self.assertIs(orders[0], orders[0])
+        self.assertEqual(orders[:1], self.orders[:1])
+
+        # the rows are cached, not the instances
+        label, db, fields, rows = cache.get(get_orders.get_cache_key(self.customer.pk))
+        self.assertEqual((label, db), ('tests.order', 'default'))
+        self.assertEqual(rows[0], (self.orders[0].pk, self.customer.pk, 'new'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(get_orders(self.customer.pk)), self.orders)
+            self.assertEqual(list(get_orders.many([(self.customer.pk,)])[0]), self.orders)
+
+        # the instances are built for each call
+        orders = get_orders(self.customer.pk)
+        orders[0].status = 'cancelled'
+        self.assertEqual(get_orders(self.customer.pk)[0].status, 'new')
+        self.assertFalse(orders[1]._state.adding)
+
+    def test_init_signals(self):
+        initialized = []
+
+        def receiver(instance, **kwargs):
+            initialized.append(instance.pk)
+
+        post_init.connect(receiver, sender=Order)
+        self.addCleanup(post_init.disconnect, receiver, sender=Order)
+        self.assertEqual(list(get_orders(self.customer.pk)), self.orders)
+        self.assertEqual(initialized, [order.pk for order in self.orders])
+
+    def test_rows(self):
+        Product.objects.create(name='Pen', price=2)
+        Product.objects.create(name='Book', price=10)
+        get_products()
+        with self.assertNumQueries(0):
+            products = get_products()
+        self.assertEqual([product.name for product in products], ['Pen', 'Book'])
+        self.assertEqual(products[1].price, 10)
+
+    def test_fields(self):
+        get_statuses()
+        order = get_statuses()[0]
+        self.assertEqual(order.get_deferred_fields(), set(['customer_id']))
+        self.assertEqual((order.pk, order.status), (self.orders[0].pk, 'new'))
+
+    def test_invalid(self):
+        func = cached_queryset(lambda: list(Customer.objects.all()))
+        self.assertRaises(TypeError, func)
@@ -0,0 +1,127 @@
+from __future__ import unicode_literals
+import random
+import sys
+import threading
+from time import sleep
+from django.core.cache import cache
+from django.test import TestCase
+from cached_result.decorators import cached_function, cached_property
+
+
+def run_threads(target, count=10):
+    """
+    Runs ``target(i)`` in ``count`` threads started at once; returns the
+    exceptions they raised.
+    """
+    start = threading.Event()
+    errors = []
+
+    def run(i):
+        start.wait()
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class ConcurrencyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_single_flight(self):
+        hits = []
+
+        def slow(x):
+            hits.append(x)
+            sleep(0.05)
+            return x * 2
+
+        for options in ({'memoize': False}, {'cache': False}):
+            del hits[:]
+            func = cached_function(**options)(slow)
+            results = []
+            self.assertEqual(run_threads(lambda i: results.append(func(1))), [])
+            self.assertEqual(results, [2] * 10)
+            self.assertEqual(len(hits), 1)
+
+        del hits[:]
+        func = cached_function(cache=False, single_flight=False)(slow)
+        run_threads(lambda i: func(1))
+        self.assertGreater(len(hits), 1)
+
+    def test_single_flight_per_instance(self):
+        class Foo(object):
+            def __init__(self, x):
+                self.x = x
+
+            @cached_function(cache=False)
+            def bar(self):
+                sleep(0.05)
+                return self.x
+
+            @cached_property(cache=False)
+            def baz(self):
+                sleep(0.05)
+                return self.x
+
+        foos = [Foo(i) for i in range(10)]
+        results = {}
+
+        def read(i):
+            results[i] = (foos[i].bar(), foos[i].baz)
+
+        self.assertEqual(run_threads(read), [])
+        self.assertEqual(results, dict((i, (i, i)) for i in range(10)))
+
+    def test_recursion(self):
+        calls = []
+
+        @cached_function(memoize=False)
+        def func(x):
+            calls.append(x)
+            if len(calls) == 1:
+                return func(x) + 1
+            return x
+
+        self.assertEqual(func(1), 2)
+
+    def test_stress(self):
+        if hasattr(sys, 'setswitchinterval'):  # switch threads more often
+            self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+            sys.setswitchinterval(1e-5)
+
+        for memo_store in ('lru', 'lfu'):
+            @cached_function(cache=False, maxsize=8, memo_store=memo_store)
+            def double(x):
+                return x * 2
+
+            class Foo(object):
+                @cached_function(cache=False, maxsize=4, memo_store=memo_store)
+                def triple(self, x):
+                    return x * 3
+
+                @cached_property
+                def prop(self):
+                    return 1
+
+            foo = Foo()
+
+            def hammer(i):
+                rand = random.Random(i)
+                for _ in range(2000):
+                    x = rand.randint(0, 31)
+                    if double(x) != x * 2 or foo.triple(x) != x * 3 or foo.prop != 1:
+                        raise AssertionError('Wrong result for %d' % x)
+                    if x == 0:
+                        double.delete_cache(x)
+
+            self.assertEqual(run_threads(hammer, 16), [])
+            self.assertLessEqual(len(double._cached_results), 8)
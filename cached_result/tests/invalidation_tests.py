@@ -0,0 +1,119 @@
+from __future__ import unicode_literals
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from cached_result.tests.models import Customer, Label, Order, OrderLine, Product, Ticket
+
+
+class InvalidationTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(name='Wade')
+        self.apple = Product.objects.create(name='apple', price=2)
+        self.pear = Product.objects.create(name='pear', price=3)
+        self.order = Order.objects.create(customer=self.customer)
+        self.line = OrderLine.objects.create(order=self.order, product=self.apple, quantity=2)
+
+    def reload(self):
+        return Order.objects.get(pk=self.order.pk)
+
+    def test_reverse_foreign_key(self):
+        self.assertEqual(self.reload().total, 4)
+        OrderLine.objects.create(order=self.order, product=self.pear, quantity=1)
+        self.assertEqual(self.reload().total, 7)
+
+        self.line.quantity = 3
+        self.line.save()
+        self.assertEqual(self.reload().total, 9)
+
+        self.line.delete()
+        self.assertEqual(self.reload().total, 3)
+
+        # moving a line to another order invalidates both of them
+        other = Order.objects.create(customer=self.customer)
+        self.assertEqual(other.total, 0)
+        line = self.reload().lines.get()
+        line.order = other
+        line.save()
+        self.assertEqual((self.reload().total, Order.objects.get(pk=other.pk).total), (0, 3))
+
+    def test_memoized(self):
+        order = self.reload()
+        self.assertEqual(order.quantity, 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(order.quantity, 2)
+
+        self.line.quantity = 3
+        self.line.save()
+        self.assertEqual(order.quantity, 3)
+        OrderLine.objects.create(order=self.order, product=self.pear, quantity=1)
+        self.assertEqual(order.quantity, 4)
+
+    def test_nested_field(self):
+        self.assertEqual(self.reload().total, 4)
+        self.apple.price = 5
+        self.apple.save()
+        self.assertEqual(self.reload().total, 10)
+
+        # saves which can't have changed the price don't invalidate it
+        Product.objects.filter(pk=self.apple.pk).update(price=1)
+        self.apple.name = 'green apple'
+        self.apple.save(update_fields=['name'])
+        self.assertEqual(self.reload().total, 10)
+
+    def test_own_fields(self):
+        self.assertEqual(self.reload().title, 'Wade (new)')
+        self.customer.name = 'Wilson'
+        self.customer.save()
+        self.assertEqual(self.reload().title, 'Wilson (new)')
+
+        order = self.reload()
+        order.status = 'paid'
+        order.save()
+        self.assertEqual(self.reload().title, 'Wilson (paid)')
+
+    def test_abstract_model(self):
+        ticket = Ticket.objects.create()
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).status_display, 'NEW')
+        ticket.status = 'done'
+        ticket.save()
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).status_display, 'DONE')
+
+    def test_many_to_many(self):
+        red, blue = Label.objects.create(name='red'), Label.objects.create(name='blue')
+        self.assertEqual(self.reload().label_names, [])
+
+        self.order.labels.add(red, blue)
+        self.assertEqual(self.reload().label_names, ['blue', 'red'])
+        self.order.labels.remove(blue)
+        self.assertEqual(self.reload().label_names, ['red'])
+
+        red.name = 'crimson'
+        red.save()
+        self.assertEqual(self.reload().label_names, ['crimson'])
+
+        red.order_set.clear()
+        self.assertEqual(self.reload().label_names, [])
+
+    def test_model(self):
+        other = Order.objects.create(customer=self.customer)
+        self.assertEqual((self.reload().product_count, other.product_count), (2, 2))
+        Product.objects.create(name='plum', price=1)
+        self.assertEqual((self.reload().product_count, Order.objects.get(pk=other.pk).product_count), (3, 3))
+
+    def test_transaction(self):
+        self.assertEqual(self.reload().total, 4)
+        with transaction.atomic():
+            self.line.quantity = 3
+            self.line.save()
+            self.assertEqual(self.reload().total, 4)  # invalidated on commit
+        self.assertEqual(self.reload().total, 6)
+
+        try:
+            with transaction.atomic():
+                self.line.quantity = 4
+                self.line.save()
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(self.reload().total, 6)
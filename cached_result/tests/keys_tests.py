@@ -0,0 +1,142 @@
+from __future__ import unicode_literals
+import datetime
+import hashlib
+import os
+import subprocess
+import sys
+from django.test import TestCase
+import cached_result
+from cached_result.keys import (compile_key_template, get_code_version, get_hash_algorithm, hash_args,
+                                make_memoization_key, serialize_args)
+
+
+class KeysTestCase(TestCase):
+    def test_canonical(self):
+        self.assertEqual(serialize_args((1, 'a'), {'x': 1, 'y': [2, 3]}),
+                         serialize_args((1, 'a'), {'y': [2, 3], 'x': 1}))
+        self.assertEqual(serialize_args(({'a': 1, 'b': 2},), {}), serialize_args(({'b': 2, 'a': 1},), {}))
+        self.assertEqual(serialize_args(({1, 2, 3},), {}), serialize_args(({3, 2, 1},), {}))
+        self.assertEqual(hash_args((1,), {'x': 'y'}), hash_args((1,), {'x': 'y'}))
+
+    def test_no_collisions(self):
+        values = [
+            1, '1', 1.0, True, None, b'1', (1,), [1], {1: None}, {1}, ('1',),
+            ('a', 'b'), ('a,b',), ('ab',), datetime.date(2014, 1, 1), '2014-01-01',
+        ]
+        keys = set(serialize_args((value,), {}) for value in values)
+        self.assertEqual(len(keys), len(values))
+
+        self.assertNotEqual(serialize_args((1, 2), {}), serialize_args((1,), {'x': 2}))
+        self.assertNotEqual(serialize_args((), {'x': 1, 'y': 2}), serialize_args((), {'x': 2, 'y': 1}))
+
+    def test_unsupported(self):
+        class A(object):
+            pass
+
+        class B(object):
+            def __init__(self, user):
+                self.user = user
+
+            def __repr__(self):
+                return '<B>'
+
+        class C(B):
+            def __cache_key__(self):
+                return self.user
+
+        self.assertRaises(TypeError, serialize_args, (A(),), {})
+        # distinct objects with the same repr must not share a key
+        self.assertRaises(TypeError, serialize_args, (B('wade'),), {})
+        self.assertEqual(serialize_args((C('wade'),), {}), serialize_args((C('wade'),), {}))
+        self.assertNotEqual(serialize_args((C('wade'),), {}), serialize_args((C('luke'),), {}))
+        self.assertNotEqual(serialize_args((C('wade'),), {}), serialize_args(('wade',), {}))
+
+    def test_compile_key_template(self):
+        class A(object):
+            name = 'Wade'
+            data = {'x': [1, 2]}
+
+        templates = [
+            ('plain', (), {}),
+            ('bar_{1}', (0, 5), {}),
+            ('{0.name}', (A(),), {}),
+            ('test-key-{0.name}', (A(),), {}),
+            ('{0.data[x][1]}-{key!r:>6}', (A(),), {'key': 'v'}),
+            ('{}.{}', (1, 2), {}),
+            ('{0:{1}}', (3, '>4'), {}),
+            ('{{literal}}{0}', (1,), {}),
+        ]
+        for template, args, kwargs in templates:
+            self.assertEqual(compile_key_template(template)(*args, **kwargs), template.format(*args, **kwargs))
+
+        self.assertRaises(IndexError, compile_key_template('{1}'), 0)
+
+    def test_hash_algorithm(self):
+        self.assertIsNone(get_hash_algorithm(None))
+        self.assertEqual(len(get_hash_algorithm('blake2b')(b'foo').hexdigest()), 32)
+        self.assertEqual(get_hash_algorithm('sha1')(b'foo').hexdigest(), hashlib.sha1(b'foo').hexdigest())
+        self.assertRaises(ValueError, get_hash_algorithm, 'foo')
+
+    def test_memoization_key(self):
+        self.assertEqual(make_memoization_key((1,), {}), 1)
+        self.assertEqual(make_memoization_key((1, 'a'), {'x': 1, 'y': 2}),
+                         make_memoization_key((1, 'a'), {'y': 2, 'x': 1}))
+        self.assertNotEqual(make_memoization_key((1, 2), {}), make_memoization_key((1,), {'x': 2}))
+
+        key = make_memoization_key(([1, 2], {'a': {3}}), {'x': []})
+        self.assertEqual(hash(key), hash(make_memoization_key(([1, 2], {'a': {3}}), {'x': []})))
+        self.assertEqual(key, make_memoization_key(([1, 2], {'a': {3}}), {'x': []}))
+        self.assertNotEqual(key, make_memoization_key(((1, 2), {'a': {3}}), {'x': []}))
+
+    def test_code_version(self):
+        def first(x):
+            """doc"""
+            return [i * 2 for i in x]
+
+        def same(x):
+            # another comment
+            return [i * 2 for i in x]
+
+        def changed(x):
+            return [i * 3 for i in x]
+
+        def renamed(x):
+            return [j * 2 for j in map(int, x)]
+
+        version = get_code_version(first)
+        self.assertEqual(len(version), 8)
+        self.assertEqual(get_code_version(same), version)
+        self.assertNotEqual(get_code_version(changed), version)
+        self.assertNotEqual(get_code_version(renamed), version)
+        self.assertRaises(ValueError, get_code_version, len)
+
+    def test_code_version_defaults(self):
+        def first(x, limit=10):
+            return x[:limit]
+
+        def changed(x, limit=20):
+            return x[:limit]
+
+        self.assertNotEqual(get_code_version(changed), get_code_version(first))
+
+        def first(x, *args, **kwargs):
+            return x
+        first.__kwdefaults__ = {'limit': 10}
+
+        def changed(x, *args, **kwargs):
+            return x
+        changed.__kwdefaults__ = {'limit': 20}
+
+        self.assertNotEqual(get_code_version(changed), get_code_version(first))
+
+    def test_code_version_hash_seed(self):
+        code = ('from cached_result.keys import get_code_version\n'
+                'def f(x, default=object()):\n'
+                '    return x in {"alpha", "beta", "gamma", "delta", "epsilon"}\n'
+                'print(get_code_version(f))\n')
+        root = os.path.dirname(os.path.dirname(cached_result.__file__))
+        versions = set()
+        for seed in range(6):
+            env = dict(os.environ, PYTHONHASHSEED=str(seed))
+            versions.add(subprocess.check_output([sys.executable, '-c', code], env=env, cwd=root))
+        self.assertEqual(len(versions), 1)
@@ -0,0 +1,90 @@
+from __future__ import unicode_literals
+from time import sleep
+from django.test import TestCase
+from cached_result.memo import LRUMemoStore, LFUMemoStore, get_memo_store
+
+
+class MemoStoreTestCase(TestCase):
+    def test_lru_eviction(self):
+        store = LRUMemoStore(maxsize=2)
+        store.set('a', 1)
+        store.set('b', 2)
+        self.assertEqual(store.get('a'), 1)  # 'b' is now the least recently used
+
+        store.set('c', 3)
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get('b'))
+        self.assertEqual(store.get('a'), 1)
+        self.assertEqual(store.get('c'), 3)
+
+    def test_lfu_eviction(self):
+        store = LFUMemoStore(maxsize=2)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.get('a')
+        store.get('b')
+
+        store.set('c', 3)
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get('b'))
+        self.assertEqual(store.get('a'), 1)
+
+        # 'c' is the least frequently used now
+        store.set('d', 4)
+        self.assertNotIn('c', store)
+        self.assertIn('a', store)
+        self.assertIn('d', store)
+
+    def test_timeout(self):
+        for store_class in (LRUMemoStore, LFUMemoStore):
+            store = store_class(timeout=0.1)  # 100 ms
+            store.set('a', 1)
+            store.set('b', 2, timeout=None)
+            self.assertEqual(store.get('a'), 1)
+
+            sleep(0.15)
+
+            self.assertIsNone(store.get('a'))
+            self.assertEqual(store.get('b'), 2)
+
+    def test_max_bytes(self):
+        for store_class in (LRUMemoStore, LFUMemoStore):
+            store = store_class(max_bytes=100, sizeof=len)
+            store.set('a', 'x' * 40)
+            store.set('b', 'x' * 40)
+            store.get('a')
+            store.set('c', 'x' * 30)  # evicts 'b'
+            self.assertNotIn('b', store)
+            self.assertEqual(store.size, 70)
+
+            store.set('a', 'x' * 60)
+            self.assertEqual(store.size, 90)
+            store.set('d', 'x' * 101)  # never admitted
+            self.assertNotIn('d', store)
+            self.assertEqual(len(store), 2)
+
+            store.delete('a')
+            self.assertEqual(store.size, 30)
+            store.clear()
+            self.assertEqual(store.size, 0)
+
+    def test_none_values(self):
+        store = LRUMemoStore()
+        store.set('a', None)
+        self.assertIn('a', store)
+        self.assertEqual(store.get('a', 'default'), None)
+        self.assertEqual(store.get('b', 'default'), 'default')
+
+    def test_get_memo_store(self):
+        self.assertIsInstance(get_memo_store(), LRUMemoStore)
+        self.assertIsInstance(get_memo_store('lfu'), LFUMemoStore)
+        self.assertEqual(get_memo_store(LFUMemoStore, maxsize=3).maxsize, 3)
+
+        store = LRUMemoStore()
+        self.assertIs(get_memo_store(store), store)
+
+        self.assertRaises(ValueError, get_memo_store, 'foo')
+        self.assertRaises(ValueError, LRUMemoStore, maxsize=0)
+        self.assertRaises(ValueError, LRUMemoStore, max_bytes=0)
+        self.assertEqual(get_memo_store(max_bytes=1000).max_bytes, 1000)
@@ -0,0 +1,54 @@
+from __future__ import unicode_literals
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from cached_result.context import get_request_cache, request_cache
+from cached_result.decorators import cached_function
+from cached_result.middleware import RequestCacheMiddleware
+
+
+class RequestCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_request_cache(self):
+        @cached_function(id='{0}', memoize=False)
+        def func(value):
+            return value * 2
+
+        with request_cache():
+            self.assertEqual(func(1), 2)
+
+            # served by the request cache, without hitting Django's cache
+            cache.set(func.get_cache_key(1), 42)
+            self.assertEqual(func(1), 2)
+
+            func.delete_cache(1)
+            self.assertEqual(func(1), 2)
+            self.assertEqual(func.many([(1,), (2,)]), [2, 4])
+
+        self.assertIsNone(get_request_cache())
+        cache.set(func.get_cache_key(1), 42)
+        self.assertEqual(func(1), 42)
+
+    def test_middleware(self):
+        hits = []
+
+        @cached_function(id='{0}', memoize=False)
+        def func(value):
+            hits.append(1)
+            return value * 2
+
+        def view(request):
+            self.assertIsNotNone(get_request_cache())
+            func(1)
+            cache.delete(func.get_cache_key(1))
+            func(1)
+            return HttpResponse()
+
+        middleware = RequestCacheMiddleware(view)
+        middleware(RequestFactory().get('/'))
+
+        self.assertEqual(len(hits), 1)
+        self.assertIsNone(get_request_cache())
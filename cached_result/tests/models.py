@@ -0,0 +1,67 @@
+"""Models used by the tests."""
+from django.db import models
+from cached_result.decorators import cached_property
+
+
+class Customer(models.Model):
+    name = models.CharField(max_length=100)
+
+    @cached_property
+    def initials(self):
+        return ''.join(word[0] for word in self.name.split())
+
+
+class Product(models.Model):
+    name = models.CharField(max_length=100)
+    price = models.IntegerField()
+
+
+class Label(models.Model):
+    name = models.CharField(max_length=100)
+
+
+class Order(models.Model):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, default='new')
+    labels = models.ManyToManyField(Label)
+
+    @cached_property(memoize=False, depends_on=['lines__quantity', 'lines__product__price'])
+    def total(self):
+        return sum(line.quantity * line.product.price for line in self.lines.all())
+
+    @cached_property(depends_on=['lines__quantity'])
+    def quantity(self):
+        return sum(line.quantity for line in self.lines.all())
+
+    @cached_property(memoize=False, depends_on=['customer__name', 'status'])
+    def title(self):
+        return '%s (%s)' % (self.customer.name, self.status)
+
+    @cached_property(memoize=False, depends_on=['labels__name'])
+    def label_names(self):
+        return sorted(label.name for label in self.labels.all())
+
+    @cached_property(memoize=False, depends_on=[Product])
+    def product_count(self):
+        return Product.objects.count()
+
+
+class OrderLine(models.Model):
+    order = models.ForeignKey(Order, related_name='lines', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=1)
+
+
+class BaseTicket(models.Model):
+    status = models.CharField(max_length=20, default='new')
+
+    class Meta:
+        abstract = True
+
+    @cached_property(memoize=False, depends_on=['status'])
+    def status_display(self):
+        return self.status.upper()
+
+
+class Ticket(BaseTicket):
+    pass
@@ -0,0 +1,67 @@
+from __future__ import unicode_literals
+from django.core.cache import cache
+from django.test import TestCase
+from cached_result.context import request_cache
+from cached_result.decorators import cached_function, cached_property
+from cached_result.prefetch import prefetch_cached
+from cached_result.tests.models import Customer, Order
+
+
+class Item(object):
+    def __init__(self, pk):
+        self.pk = pk
+
+    @cached_property(key='item_{0.pk}_price')
+    def price(self):
+        return self.pk * 10
+
+    @cached_function(key='item_{0.pk}_label', tags=['items'])
+    def label(self):
+        return 'item %d' % self.pk
+
+    def name(self):
+        return 'item'
+
+
+class PrefetchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        Item.price.reset_stats()
+        Item.label.reset_stats()
+
+    def test_prefetch(self):
+        for pk in range(3):
+            Item(pk).price
+            Item(pk).label()
+        Item.price.reset_stats()
+        Item.label.reset_stats()
+
+        items = prefetch_cached((Item(pk) for pk in range(5)), 'price', 'label')
+        self.assertEqual(len(items), 5)
+        self.assertEqual(Item.price.stats()['hits'], 3)
+        self.assertEqual(Item.label.stats()['hits'], 3)
+
+        self.assertEqual([item.price for item in items], [0, 10, 20, 30, 40])
+        self.assertEqual([item.label() for item in items], ['item %d' % pk for pk in range(5)])
+        for wrapper in (Item.price, Item.label):
+            stats = wrapper.stats()
+            self.assertEqual((stats['memo_hits'], stats['hits'], stats['misses']), (3, 3, 2))
+
+        # already memoized values aren't fetched again
+        prefetch_cached(items, 'price')
+        self.assertEqual(Item.price.stats()['hits'], 3)
+
+    def test_request_cache(self):
+        customer = Customer.objects.create(name='Wade')
+        for _ in range(3):
+            Order.objects.create(customer=customer).title
+
+        Order.title.reset_stats()
+        with request_cache():
+            orders = prefetch_cached(Order.objects.all(), 'title')
+            self.assertEqual([order.title for order in orders], ['Wade (new)'] * 3)
+        stats = Order.title.stats()
+        self.assertEqual((stats['hits'], stats['request_hits'], stats['misses']), (3, 3, 0))
+
+    def test_invalid_name(self):
+        self.assertRaises(ValueError, prefetch_cached, [Item(1)], 'name')
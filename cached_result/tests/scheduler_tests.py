@@ -0,0 +1,87 @@
+from __future__ import unicode_literals
+import os
+from time import sleep
+from django.core.cache import cache
+from django.test import TestCase
+from cached_result.decorators import cached_function
+from cached_result.refresh import Scheduler, get_scheduler
+from cached_result.utils import now
+
+
+class SchedulerTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_scheduler().clear()
+        self.addCleanup(get_scheduler().clear)
+
+    def _wait_for(self, condition, timeout=2):
+        deadline = now() + timeout
+        while not condition():
+            if now() > deadline:
+                self.fail('Timed out')
+            sleep(0.01)
+
+    def test_refresh(self):
+        hits = []
+
+        @cached_function(timeout=10, refresh_every=0.05)
+        def func(x):
+            hits.append(x)
+            return len(hits)
+
+        self.assertEqual(func(1), 1)
+        self.assertEqual(len(get_scheduler()), 1)
+        self._wait_for(lambda: len(hits) >= 3)
+        self.assertEqual(hits, [1] * len(hits))
+        self.assertGreaterEqual(cache.get(func.get_cache_key(1)), 3)
+        # the memoized result expires with each refresh
+        self._wait_for(lambda: func(1) >= 3)
+
+    def test_idle(self):
+        hits = []
+
+        @cached_function(timeout=10, refresh_every=0.05, refresh_idle=0.15)
+        def func():
+            hits.append(1)
+
+        func()
+        self._wait_for(lambda: len(get_scheduler()) == 0)
+        count = len(hits)
+        sleep(0.15)
+        self.assertEqual(len(hits), count)
+
+    def test_lease(self):
+        hits = []
+
+        @cached_function(timeout=10, refresh_every=0.05)
+        def func():
+            hits.append(1)
+
+        # another process holds the lease
+        cache.add('%s:refresh:lock' % func.get_cache_key(), 'token', 10)
+        func()
+        sleep(0.2)
+        self.assertEqual(len(hits), 1)
+
+    def test_fork(self):
+        hits = []
+
+        @cached_function(timeout=10, refresh_every=0.05, refresh_idle=0.5)
+        def func():
+            hits.append(1)
+
+        scheduler = Scheduler()
+        self.addCleanup(scheduler.clear)
+        key = func.get_cache_key()
+        scheduler.touch(func, key, (), {})
+        # as in a process forked since: the entries without the thread
+        scheduler._pid = -1
+        scheduler.touch(func, key, (), {})
+        self.assertEqual(scheduler._pid, os.getpid())
+        self.assertEqual(len(scheduler), 1)
+        self._wait_for(lambda: len(hits) >= 2)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, cached_function(refresh_every=10), lambda: None)
+        self.assertRaises(ValueError, cached_function(timeout=10, refresh_every=10), lambda: None)
+        self.assertRaises(ValueError, cached_function(timeout=10, refresh_every=1, cache=False), lambda: None)
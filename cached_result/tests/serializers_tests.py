@@ -0,0 +1,108 @@
+from __future__ import unicode_literals
+import pickle
+from django.core.cache import cache
+from django.test import TestCase
+from cached_result.decorators import cached_function
+from cached_result.serializers import Codec, get_codec, msgpack
+
+
+class CodecTestCase(TestCase):
+    def test_roundtrip(self):
+        value = {'rows': [[i, 'row %d' % i] for i in range(100)]}
+        for codec in [Codec(), Codec('json'), Codec('pickle', 'zlib'), Codec('json', 'zlib', threshold=0)]:
+            self.assertEqual(codec.loads(codec.dumps(value)), value)
+
+    def test_compression(self):
+        codec = Codec('pickle', 'zlib', threshold=100)
+        small, large = codec.dumps('x' * 10), codec.dumps('x' * 1000)
+        self.assertEqual(bytearray(small[:1])[0], 0x10)  # pickle, uncompressed
+        self.assertEqual(bytearray(large[:1])[0], 0x11)  # pickle, zlib
+        self.assertTrue(len(large) < 100)
+
+        # the header tells how to decode a value, whatever the codec
+        self.assertEqual(Codec('json').loads(large), 'x' * 1000)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, Codec().loads, b'')
+        self.assertRaises(ValueError, Codec().loads, b'\xff\x00')
+        self.assertRaises(ValueError, Codec, 'yaml')
+        self.assertRaises(ValueError, Codec, 'pickle', 'rar')
+        if msgpack is None:
+            self.assertRaises(ValueError, Codec, 'msgpack')
+        self.assertIsNone(get_codec())
+
+
+class SerializedCachedFunctionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_serialized(self):
+        hits = []
+
+        @cached_function(memoize=False, serializer='json', compression='zlib', compression_threshold=100)
+        def report(size):
+            hits.append(1)
+            return [{'id': i, 'name': 'item %d' % i} for i in range(size)] if size else None
+
+        for size in (0, 2, 1000):
+            self.assertEqual(report(size), report(size))
+        self.assertEqual(len(hits), 3)
+
+        stored = cache.get(report.get_cache_key(1000))
+        self.assertIsInstance(stored, bytes)
+        self.assertTrue(len(stored) * 4 < len(pickle.dumps(report(1000), pickle.HIGHEST_PROTOCOL)))
+
+        # undecodable values are recomputed
+        cache.set(report.get_cache_key(2), b'garbage')
+        self.assertEqual(report(2), [{'id': 0, 'name': 'item 0'}, {'id': 1, 'name': 'item 1'}])
+        self.assertEqual(len(hits), 4)
+
+
+class OversizeTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_skip(self):
+        hits = []
+
+        @cached_function(max_size=1000, memoize=False)
+        def items(size):
+            hits.append(size)
+            return list(range(size))
+
+        self.assertEqual(items(10), items(10))
+        self.assertIsInstance(cache.get(items.get_cache_key(10)), bytes)
+        self.assertEqual(items(1000), items(1000))
+        self.assertIsNone(cache.get(items.get_cache_key(1000)))
+        self.assertEqual(hits, [10, 1000, 1000])
+        self.assertEqual(items.stats()['oversize_skipped'], 2)
+
+    def test_chunk(self):
+        @cached_function(max_size=1000, oversize='chunk', memoize=False, tags=['items'])
+        def items(size):
+            return list(range(size))
+
+        self.assertEqual(items(1000), list(range(1000)))
+        chunks = cache.get(items.get_cache_key(1000)).value
+        self.assertGreater(chunks.count, 1)
+        self.assertEqual(items(1000), list(range(1000)))
+        self.assertEqual(items.stats()['hits'], 1)
+        self.assertEqual(items.many([(1000,), (10,)]), [list(range(1000)), list(range(10))])
+        self.assertEqual(items.stats()['oversize_chunked'], 1)
+
+        # a missing chunk makes the value missing
+        cache.delete(chunks.get_keys()[-1])
+        self.assertEqual(items(1000), list(range(1000)))
+        self.assertEqual(items.stats()['misses'], 3)
+
+    def test_compress(self):
+        @cached_function(max_size=1000, oversize='compress', memoize=False)
+        def text(size):
+            return 'x' * size
+
+        self.assertEqual(text(5000), text(5000))
+        self.assertLessEqual(len(cache.get(text.get_cache_key(5000))), 1000)
+        self.assertEqual(text.stats()['oversize_compressed'], 1)
+        self.assertEqual(text.stats()['hits'], 1)
+
+        self.assertRaises(ValueError, cached_function(oversize='split'), lambda: None)
@@ -0,0 +1,120 @@
+from __future__ import unicode_literals
+import os
+import subprocess
+import sys
+from django.core.cache import cache
+from django.test import TestCase
+import cached_result
+from cached_result.context import request_cache
+from cached_result.decorators import cached_function, cached_property
+from cached_result.registry import get_cached_function
+from cached_result.signals import cache_hit, cache_miss, cache_set
+from cached_result.stats import stats, reset_stats
+
+
+@cached_function
+def double(x):
+    return x * 2
+
+
+class StatsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_stats()
+
+    def test_counters(self):
+        @cached_function(memoize=False)
+        def square(x):
+            return x * x
+
+        square(2)
+        square(2)
+        square(3)
+        with request_cache():
+            square(2)
+            square(2)
+        self.assertEqual(square.many([(2,), (4,)]), [4, 16])
+
+        counters = square.stats()
+        self.assertEqual(counters['memo_hits'], 0)
+        self.assertEqual(counters['request_hits'], 1)
+        self.assertEqual(counters['hits'], 3)
+        self.assertEqual(counters['misses'], 3)
+        self.assertEqual(counters['sets'], 3)
+        self.assertEqual(counters['computes'], 3)
+        self.assertEqual(counters['hit_ratio'], 4 / 7.0)
+
+        square.reset_stats()
+        self.assertEqual(square.stats()['misses'], 0)
+
+    def test_memo_hits(self):
+        class Foo(object):
+            @cached_function(cache=False)
+            def bar(self):
+                return 1
+
+        foo = Foo()
+        foo.bar()
+        foo.bar()
+        Foo().bar()
+        counters = Foo.bar.stats()
+        self.assertEqual(counters['memo_hits'], 1)
+        self.assertEqual(counters['misses'], 2)
+
+    def test_unconfigured_settings(self):
+        # decorating doesn't need the settings
+        code = ('from cached_result.decorators import cached_function\n'
+                'cached_function(timeout=60)(lambda x: x)\n')
+        env = dict((name, value) for name, value in os.environ.items() if name != 'DJANGO_SETTINGS_MODULE')
+        root = os.path.dirname(os.path.dirname(cached_result.__file__))
+        subprocess.check_output([sys.executable, '-c', code], env=env, cwd=root, stderr=subprocess.STDOUT)
+
+    def test_registry(self):
+        double(1)
+        name = '%s.double' % __name__
+        self.assertIs(get_cached_function(name), double)
+        self.assertEqual(stats()[name]['misses'], 1)
+        reset_stats()
+        self.assertEqual(stats()[name]['misses'], 0)
+        self.assertRaises(KeyError, get_cached_function, name + '_')
+
+    def test_signals(self):
+        received = []
+
+        def receiver(signal, sender, **kwargs):
+            received.append((signal, kwargs.get('source'), kwargs.get('timeout')))
+
+        @cached_function(memoize=False, timeout=60)
+        def triple(x):
+            return x * 3
+
+        for signal in (cache_hit, cache_miss, cache_set):
+            signal.connect(receiver, sender=triple)
+            self.addCleanup(signal.disconnect, receiver, sender=triple)
+
+        triple(1)
+        triple(1)
+        self.assertEqual(received, [(cache_miss, None, None), (cache_set, None, 60), (cache_hit, 'cache', None)])
+
+    def test_memo_hit_signals(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs['source'])
+
+        class Foo(object):
+            @cached_function(cache=False)
+            def bar(self):
+                return 1
+
+            @cached_property(cache=False)
+            def baz(self):
+                return 2
+
+        cache_hit.connect(receiver)
+        self.addCleanup(cache_hit.disconnect, receiver)
+        foo = Foo()
+        for _ in range(3):
+            foo.bar()
+            foo.baz
+        self.assertEqual(received, ['memo'] * 4)
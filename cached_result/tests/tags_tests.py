@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+from django.core.cache import cache
+from django.test import TestCase
+from cached_result.decorators import cached_function, cached_property
+from cached_result.tags import get_tag_key, invalidate_tags
+
+
+class TagsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidate_tags(self):
+        hits = []
+
+        @cached_function(memoize=False, tags=['scores', 'user:{0}'])
+        def score(user_id, game):
+            hits.append(1)
+            return len(hits)
+
+        self.assertEqual(score(1, 'chess'), 1)
+        self.assertEqual(score(1, 'go'), 2)
+        self.assertEqual(score(2, 'chess'), 3)
+        self.assertEqual(score(1, 'chess'), 1)
+        self.assertEqual(len(hits), 3)
+
+        invalidate_tags('user:1')
+        self.assertEqual(score(1, 'chess'), 4)
+        self.assertEqual(score(1, 'go'), 5)
+        self.assertEqual(score(2, 'chess'), 3)
+
+        invalidate_tags('scores')
+        self.assertEqual(score.many([(1, 'chess'), (2, 'chess'), (2, 'chess')]), [6, 7, 7])
+        self.assertEqual(score.many([(1, 'chess'), (2, 'chess')]), [6, 7])
+        self.assertEqual(len(hits), 7)
+
+    def test_evicted_version(self):
+        hits = []
+
+        @cached_function(memoize=False, timeout=60, tags=['scores'])
+        def score():
+            hits.append(1)
+            return len(hits)
+
+        self.assertEqual(score(), 1)
+        cache.delete(get_tag_key('scores'))
+        self.assertEqual(score(), 2)
+        self.assertEqual(score(), 2)
+
+    def test_memoized_property(self):
+        class User(object):
+            hits_count = 0
+
+            @cached_property(tags=['users'])
+            def name(self):
+                self.hits_count += 1
+                return 'user %d' % self.hits_count
+
+        user = User()
+        self.assertEqual(user.name, 'user 1')
+        self.assertEqual(user.name, 'user 1')
+        invalidate_tags('users')
+        self.assertEqual(user.name, 'user 2')
+        self.assertEqual(user.name, 'user 2')
+
+    def test_memoized(self):
+        class User(object):
+            def __init__(self, pk):
+                self.pk = pk
+                self.hits_count = 0
+
+            @cached_function(tags=['user:{0.pk}'])
+            def name(self):
+                self.hits_count += 1
+                return 'user %d' % self.pk
+
+        user = User(1)
+        self.assertEqual(user.name(), 'user 1')
+        self.assertEqual(user.name(), 'user 1')
+        self.assertEqual(user.hits_count, 1)
+
+        # memoized results are dropped within the process
+        invalidate_tags('user:1')
+        self.assertEqual(user.name(), 'user 1')
+        self.assertEqual(user.hits_count, 2)
@@ -18,6 +18,16 @@ DATABASES = {
 
 ROOT_URLCONF = 'cached_result.tests.urls'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'other': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'other',
+    },
+}
+
 COVERAGE_REPORT_HTML_OUTPUT_DIR = os.path.join(
     os.path.join(APP_ROOT, 'tests/coverage'))
 COVERAGE_MODULE_EXCLUDES = [
@@ -31,6 +41,7 @@ EXTERNAL_APPS = [
 
 INTERNAL_APPS = [
     'cached_result',
+    'cached_result.tests',
 ]
 
 INSTALLED_APPS = EXTERNAL_APPS + INTERNAL_APPS
@@ -0,0 +1,66 @@
+from __future__ import unicode_literals
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from cached_result.compat import PY2
+from cached_result.decorators import cached_function
+from cached_result.tests.models import Customer, Order
+from cached_result.utils import now
+from cached_result.warming import warm
+
+if PY2:
+    from StringIO import StringIO
+else:
+    from io import StringIO
+
+
+hits = []
+
+
+@cached_function(timeout=60)
+def square(x):
+    hits.append(x)
+    return x * x
+
+
+def numbers():
+    return range(10)
+
+
+class WarmingTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        del hits[:]
+
+    def test_warm(self):
+        self.assertEqual(warm(square, (i for i in range(10)), chunk_size=3), 10)
+        self.assertEqual(sorted(hits), list(range(10)))
+        self.assertEqual(cache.get(square.get_cache_key(3)), 9)
+
+        # cached results are skipped unless forced
+        cache.delete(square.get_cache_key(3))
+        self.assertEqual(warm(square, range(10)), 1)
+        self.assertEqual(warm(square, range(10), force=True), 10)
+        self.assertEqual(len(hits), 21)
+
+    def test_threads(self):
+        self.assertEqual(warm(square, [(i,) for i in range(50)], workers=4, chunk_size=5), 50)
+        self.assertEqual(sorted(hits), list(range(50)))
+
+    def test_rate(self):
+        started = now()
+        warm(square, range(10), chunk_size=2, rate=50)
+        self.assertGreaterEqual(now() - started, 0.15)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('warm_cached_results', '%s.square' % __name__, args_path='%s.numbers' % __name__, stdout=out)
+        self.assertEqual(out.getvalue(), '10 result(s) of %s.square computed\n' % __name__)
+        self.assertEqual(len(hits), 10)
+
+        customer = Customer.objects.create(name='Wade')
+        orders = [Order.objects.create(customer=customer) for _ in range(3)]
+        call_command('warm_cached_results', 'cached_result.tests.models.Order.title', queryset='tests.Order',
+                     workers=2, stdout=out)
+        for order in orders:
+            self.assertEqual(cache.get(Order.title.get_cache_key(order)).value, 'Wade (new)')
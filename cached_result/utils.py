@@ -0,0 +1,9 @@
+from __future__ import unicode_literals
+import time
+
+
+#: Sentinel used to tell a missing entry apart from a stored ``None``.
+MISSING = object()
+
+#: Monotonic clock (when available) used for in-process expiration.
+now = getattr(time, 'monotonic', time.time)
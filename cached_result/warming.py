@@ -0,0 +1,138 @@
+from __future__ import unicode_literals
+import inspect
+import itertools
+import threading
+import time
+from django.db import connections
+from cached_result.compat import string_types
+from cached_result.registry import get_cached_function
+from cached_result.utils import now
+
+try:
+    from concurrent import futures
+except ImportError:  # Python 2 without the futures package
+    futures = None
+
+try:
+    from asgiref.sync import async_to_sync
+except ImportError:  # Django < 3.0
+    async_to_sync = None
+
+
+__all__ = ['warm']
+
+
+class RateLimiter(object):
+    """
+    Spaces out the computations so that at most ``rate`` of them are made
+    per second, on average.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_time = now()
+        self.lock = threading.Lock()
+
+    def wait(self, count=1):
+        with self.lock:
+            delay = self.next_time - now()
+            self.next_time = max(self.next_time, now()) + count * self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = [args if isinstance(args, tuple) else (args,) for args in itertools.islice(iterator, size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _warm_chunk(cached_function, chunk, force, close_connections=False):
+    warm_chunk = cached_function.warm
+    if inspect.iscoroutinefunction(warm_chunk):  # an AsyncCachedFunction
+        if async_to_sync is None:
+            raise ValueError('Warming coroutine functions requires the asgiref package')
+        warm_chunk = async_to_sync(warm_chunk)
+    try:
+        return warm_chunk(chunk, force=force)
+    finally:
+        if close_connections:
+            for connection in connections.all():
+                connection.close()
+
+
+def _warm_chunk_by_name(name, chunk, force):
+    # in a worker process: the function has to be looked up again
+    return _warm_chunk(get_cached_function(name), chunk, force, close_connections=True)
+
+
+def warm(cached_function, args_list, workers=1, processes=False, chunk_size=100, rate=None, force=False):
+    """
+    Computes and caches the results of ``cached_function`` for every item of
+    ``args_list`` (argument tuples, other items being single arguments),
+    chunk by chunk, each chunk being stored with a ``set_many``; results
+    already cached are skipped unless ``force`` (see
+    :meth:`CachedFunction.warm`).
+
+    :param cached_function: A :class:`CachedFunction` or its name (see
+        :func:`~cached_result.registry.get_cached_function`); coroutine
+        functions are run to completion in each worker.
+    :param args_list: Any iterable, e.g. a generator or a queryset (whose
+        instances are then passed as the first argument of a method or a
+        property). It's consumed lazily.
+    :param workers: The number of chunks computed in parallel.
+    :param processes: Whether the workers are processes rather than threads
+        (which share the GIL); the functions must then be importable and the
+        cache shared between processes.
+    :param rate: The maximum number of results computed per second, to
+        spare the database.
+    :returns: The number of results computed.
+    """
+    if isinstance(cached_function, string_types):
+        cached_function = get_cached_function(cached_function)
+    if hasattr(args_list, 'iterator'):  # a queryset, not to be loaded at once
+        args_list = args_list.iterator()
+    limiter = RateLimiter(rate) if rate else None
+    chunks = _chunks(args_list, chunk_size)
+
+    if workers <= 1:
+        count = 0
+        for chunk in chunks:
+            if limiter is not None:
+                limiter.wait(len(chunk))
+            count += _warm_chunk(cached_function, chunk, force)
+        return count
+
+    if futures is None:
+        raise ValueError('Parallel warming requires the futures package on Python 2')
+
+    if processes:
+        # the connections mustn't be shared with forked workers
+        for connection in connections.all():
+            connection.close()
+        executor = futures.ProcessPoolExecutor(workers)
+
+        def submit(chunk):
+            return executor.submit(_warm_chunk_by_name, cached_function.name, chunk, force)
+    else:
+        executor = futures.ThreadPoolExecutor(workers)
+
+        def submit(chunk):
+            return executor.submit(_warm_chunk, cached_function, chunk, force, True)
+
+    count = 0
+    pending = set()
+    with executor:
+        for chunk in chunks:
+            # bounds the number of chunks held in memory
+            if len(pending) >= workers * 2:
+                done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                count += sum(future.result() for future in done)
+            if limiter is not None:
+                limiter.wait(len(chunk))
+            pending.add(submit(chunk))
+        count += sum(future.result() for future in futures.as_completed(pending))
+    return count